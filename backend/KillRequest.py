@@ -0,0 +1,11 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from .proccess_handler import MAX_KILL_GRACE
+
+
+class KillRequest(BaseModel):
+    pids: List[int] = []
+    group_by: Optional[str] = None
+    # Compared as text, the ppid grouping converts it to a number.
+    group: Optional[str] = None
+    grace: float = Field(3.0, ge=0, le=MAX_KILL_GRACE)
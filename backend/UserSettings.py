@@ -7,5 +7,9 @@ class UserSettings(BaseModel):
     disk_threshold: int = 80
     network_threshold: int = 1000000
     gpu_threshold: int = 80
+    steal_threshold: int = 10
+    iowait_threshold: int = 20
+    pressure_threshold: int = 10
+    major_fault_threshold: int = 1000
     check_interval: int = 10
     theme: str = "Catpuccin"
@@ -0,0 +1,7 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class WatchRequest(BaseModel):
+    pid: Optional[int] = None
+    pattern: Optional[str] = None
@@ -1,6 +1,22 @@
 import psutil
 import os
+import time
 import uptime
+import numpy as np
+
+# Fields of the per-core breakdown reported by compute_cpu_stats, each as
+# the percentage of the elapsed time the core spent in that mode.
+BREAKDOWN_FIELDS = (
+    "user",
+    "nice",
+    "system",
+    "idle",
+    "iowait",
+    "irq",
+    "softirq",
+    "steal",
+    "guest",
+)
 
 
 class CPU:
@@ -72,6 +88,76 @@ class CPU:
         """
         return psutil.cpu_times()._asdict()
 
+    @staticmethod
+    def get_per_cpu_times():
+        """
+        Returns the cumulative per-core CPU times as a (cores, fields) array
+        together with the field names of its columns.
+        """
+        times = psutil.cpu_times(percpu=True)
+        return np.array(times, dtype=np.float64), times[0]._fields
+
+    @staticmethod
+    def compute_cpu_stats(previous, current, fields):
+        """
+        Derives overall usage, per-core usage and the BREAKDOWN_FIELDS
+        breakdown from one delta between two get_per_cpu_times arrays.
+        Fields the platform does not report are zero.
+        """
+        if previous is None or previous.shape != current.shape:
+            # No usable baseline (first reading or CPU hotplug).
+            previous = current
+        delta = np.clip(current - previous, 0.0, None)
+        column = {name: i for i, name in enumerate(fields)}
+        # guest time is already accounted for in user/nice on Linux.
+        counted = [i for name, i in column.items() if name not in ("guest", "guest_nice")]
+        idle_columns = [column[name] for name in ("idle", "iowait") if name in column]
+
+        total = delta[:, counted].sum(axis=1)
+        busy = np.clip(total - delta[:, idle_columns].sum(axis=1), 0.0, None)
+        safe_total = np.where(total > 0, total, 1.0)
+        per_cpu_usage = np.where(total > 0, busy / safe_total * 100, 0.0)
+
+        # Gather every reported field of every core in one indexing step.
+        present = [j for j, name in enumerate(BREAKDOWN_FIELDS) if name in column]
+        breakdown_columns = np.zeros((delta.shape[0], len(BREAKDOWN_FIELDS)))
+        breakdown_columns[:, present] = delta[
+            :, [column[BREAKDOWN_FIELDS[j]] for j in present]
+        ]
+        per_cpu_breakdown = breakdown_columns / safe_total[:, None] * 100
+
+        overall_total = total.sum()
+        if overall_total > 0:
+            usage = busy.sum() / overall_total * 100
+            breakdown = breakdown_columns.sum(axis=0) / overall_total * 100
+        else:
+            usage = 0.0
+            breakdown = np.zeros(len(BREAKDOWN_FIELDS))
+
+        per_cpu_usage = np.round(per_cpu_usage, 1).tolist()
+        return {
+            "usage": round(float(usage), 1),
+            "per_cpu_usage": per_cpu_usage,
+            "core_utilization": per_cpu_usage,
+            "breakdown": dict(
+                zip(BREAKDOWN_FIELDS, np.round(breakdown, 1).tolist())
+            ),
+            "per_cpu_breakdown": dict(
+                zip(BREAKDOWN_FIELDS, np.round(per_cpu_breakdown, 1).T.tolist())
+            ),
+        }
+
+    @staticmethod
+    def get_cpu_stats(interval=1):
+        """
+        Returns usage, per-core usage and the time breakdown measured over a
+        single interval.
+        """
+        previous, fields = CPU.get_per_cpu_times()
+        time.sleep(interval)
+        current, fields = CPU.get_per_cpu_times()
+        return CPU.compute_cpu_stats(previous, current, fields)
+
     @staticmethod
     def get_uptime():
         """
@@ -84,6 +170,9 @@ def main():
     print("Overall CPU usage:")
     print(CPU.get_cpu_usage())
 
+    print("\nCPU stats from one per-core sample:")
+    print(CPU.get_cpu_stats())
+
     print("\nPer-core CPU usage:")
     print(CPU.get_per_cpu_usage())
 
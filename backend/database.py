@@ -21,12 +21,31 @@ class Database:
                 network_threshold INTEGER DEFAULT 1000000,
                 gpu_threshold INTEGER DEFAULT 80,
                 check_interval INTEGER DEFAULT 10,
-                theme TEXT DEFAULT 'Catpuccin'
+                theme TEXT DEFAULT 'Catpuccin',
+                steal_threshold INTEGER DEFAULT 10,
+                iowait_threshold INTEGER DEFAULT 20,
+                pressure_threshold INTEGER DEFAULT 10,
+                major_fault_threshold INTEGER DEFAULT 1000
             )
         """
         )
         self.connection.commit()
 
+        # Add the columns introduced after the table was first created.
+        self.cursor.execute("PRAGMA table_info(user_settings)")
+        columns = {row[1] for row in self.cursor.fetchall()}
+        for column, default in (
+            ("steal_threshold", 10),
+            ("iowait_threshold", 20),
+            ("pressure_threshold", 10),
+            ("major_fault_threshold", 1000),
+        ):
+            if column not in columns:
+                self.cursor.execute(
+                    f"ALTER TABLE user_settings ADD COLUMN {column} INTEGER DEFAULT {default}"
+                )
+        self.connection.commit()
+
         # Ensure a default entry exists if the table is empty
         self.cursor.execute("SELECT COUNT(*) FROM user_settings")
         if self.cursor.fetchone()[0] == 0:
@@ -40,17 +59,26 @@ class Database:
 
     def get_thresholds(self) -> UserSettings:
         """Retrieve current settings from the database."""
-        self.cursor.execute("SELECT * FROM user_settings WHERE id = 1")
+        self.cursor.execute(
+            """
+            SELECT cpu_threshold, memory_threshold, disk_threshold, network_threshold, gpu_threshold, check_interval, theme, steal_threshold, iowait_threshold, pressure_threshold, major_fault_threshold
+            FROM user_settings WHERE id = 1
+        """
+        )
         result = self.cursor.fetchone()
         if result:
             return UserSettings(
-                cpu_threshold=result[1],
-                memory_threshold=result[2],
-                disk_threshold=result[3],
-                network_threshold=result[4],
-                gpu_threshold=result[5],
-                check_interval=result[6],
-                theme=result[7],
+                cpu_threshold=result[0],
+                memory_threshold=result[1],
+                disk_threshold=result[2],
+                network_threshold=result[3],
+                gpu_threshold=result[4],
+                check_interval=result[5],
+                theme=result[6],
+                steal_threshold=result[7],
+                iowait_threshold=result[8],
+                pressure_threshold=result[9],
+                major_fault_threshold=result[10],
             )
         return None
 
@@ -58,8 +86,8 @@ class Database:
         """Update user settings in the database using a UserSettings instance."""
         self.cursor.execute(
             """
-            INSERT OR REPLACE INTO user_settings (id, cpu_threshold, memory_threshold, disk_threshold, network_threshold, gpu_threshold, check_interval, theme)
-            VALUES (1, ?, ?, ?, ?, ?, ?, ?)
+            INSERT OR REPLACE INTO user_settings (id, cpu_threshold, memory_threshold, disk_threshold, network_threshold, gpu_threshold, check_interval, theme, steal_threshold, iowait_threshold, pressure_threshold, major_fault_threshold)
+            VALUES (1, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
             (
                 settings.cpu_threshold,
@@ -69,6 +97,10 @@ class Database:
                 settings.gpu_threshold,
                 settings.check_interval,
                 settings.theme,
+                settings.steal_threshold,
+                settings.iowait_threshold,
+                settings.pressure_threshold,
+                settings.major_fault_threshold,
             ),
         )
         self.connection.commit()
@@ -58,6 +58,21 @@ class Disk:
         io_counters_per_disk = psutil.disk_io_counters(perdisk=True)
         return {disk: io._asdict() for disk, io in io_counters_per_disk.items()}
 
+    @staticmethod
+    def compute_active_time_percentage(previous, current, elapsed):
+        """
+        Returns the disk active time percentage between two
+        get_disk_io_counters readings taken elapsed seconds apart.
+        """
+        interval_duration_ms = elapsed * 1000
+        if interval_duration_ms <= 0:
+            return 0.0
+        read_time_diff = current["read_time"] - previous["read_time"]
+        write_time_diff = current["write_time"] - previous["write_time"]
+        active_time_diff = read_time_diff + write_time_diff
+        active_time_percentage = (active_time_diff / interval_duration_ms) * 100
+        return round(active_time_percentage, 2)
+
     @staticmethod
     def get_disk_active_time_percentage(interval=1):
         # Take the initial reading
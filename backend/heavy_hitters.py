@@ -0,0 +1,178 @@
+import threading
+
+# Metrics tracked per process: CPU seconds, bytes of RSS growth and bytes
+# of disk I/O, each the delta of one process table refresh.
+TOP_METRICS = ("cpu", "rss_growth", "io")
+# Window name, bucket length in seconds, buckets per window. Each tier is
+# built by merging the closed buckets of the tier before it.
+TOP_WINDOWS = (("5m", 30, 10), ("1h", 300, 12), ("24h", 3600, 24))
+
+
+class SpaceSaving:
+    """
+    Weighted Space-Saving summary: at most capacity keys, each with an
+    estimated total that overestimates the true one by at most error.
+    """
+
+    def __init__(self, capacity=64) -> None:
+        self.capacity = capacity
+        # key -> [count, error]
+        self.counters = {}
+
+    def minimum(self):
+        if len(self.counters) < self.capacity:
+            return 0.0
+        return min(count for count, error in self.counters.values())
+
+    def add(self, key, weight):
+        counter = self.counters.get(key)
+        if counter is not None:
+            counter[0] += weight
+            return
+        if len(self.counters) < self.capacity:
+            self.counters[key] = [weight, 0.0]
+            return
+        # Replace the smallest key, inheriting its count as the error.
+        smallest = min(self.counters, key=lambda k: self.counters[k][0])
+        count = self.counters.pop(smallest)[0]
+        self.counters[key] = [count + weight, count]
+
+    @staticmethod
+    def merge(summaries, capacity):
+        """
+        Combines summaries of disjoint periods into one of capacity keys.
+        A key missing from a full summary may have been evicted from it, so
+        that summary's minimum is added to both its count and its error.
+        """
+        minimums = [s.minimum() for s in summaries]
+        totals = {}
+        for summary in summaries:
+            for key, (count, error) in summary.counters.items():
+                total = totals.setdefault(key, [0.0, 0.0])
+                total[0] += count
+                total[1] += error
+        for key, total in totals.items():
+            for summary, minimum in zip(summaries, minimums):
+                if minimum and key not in summary.counters:
+                    total[0] += minimum
+                    total[1] += minimum
+        merged = SpaceSaving(capacity)
+        top = sorted(totals.items(), key=lambda item: item[1][0], reverse=True)
+        merged.counters = dict(top[:capacity])
+        return merged
+
+    def top(self, k):
+        ranked = sorted(self.counters.items(), key=lambda item: item[1][0], reverse=True)
+        return ranked[:k]
+
+
+class WindowTier:
+    """
+    The buckets of one window. The current bucket is open; closed buckets
+    are kept until they fall out of the window.
+    """
+
+    def __init__(self, name, length, count, capacity) -> None:
+        self.name = name
+        self.length = length
+        self.count = count
+        self.capacity = capacity
+        self.start = None
+        self.current = {m: SpaceSaving(capacity) for m in TOP_METRICS}
+        self.closed = []
+
+    def roll(self, now):
+        """
+        Closes the current bucket if now is past its end and returns the
+        closed bucket, or None.
+        """
+        start = now - now % self.length
+        if self.start is None:
+            self.start = start
+            return None
+        if start == self.start:
+            return None
+        bucket = self.current
+        self.closed.append((self.start, bucket))
+        # Keep the buckets that, with the current one, span the window.
+        oldest = start - self.length * (self.count - 1)
+        self.closed = [(s, b) for s, b in self.closed if s >= oldest]
+        self.current = {m: SpaceSaving(self.capacity) for m in TOP_METRICS}
+        self.start = start
+        return bucket
+
+    def buckets(self, metric):
+        return [b[metric] for s, b in self.closed] + [self.current[metric]]
+
+
+class HeavyHitters:
+    """
+    Bounded-memory top-K of processes by CPU time, RSS growth and disk I/O
+    over the TOP_WINDOWS windows. Every refresh only touches the processes
+    that used some of a resource, and no per-process history is kept.
+    """
+
+    def __init__(self, capacity=64) -> None:
+        self.capacity = capacity
+        self.tiers = [
+            WindowTier(name, length, count, capacity)
+            for name, length, count in TOP_WINDOWS
+        ]
+        self.lock = threading.Lock()
+
+    def observe(self, now, entries):
+        """
+        Adds the deltas of one refresh. now is in seconds.
+        """
+        with self.lock:
+            for i, tier in enumerate(self.tiers):
+                bucket = tier.roll(now)
+                if bucket is not None and i + 1 < len(self.tiers):
+                    # Fold the finished bucket into the next, coarser window.
+                    upper = self.tiers[i + 1]
+                    for metric in TOP_METRICS:
+                        upper.current[metric] = SpaceSaving.merge(
+                            [upper.current[metric], bucket[metric]], self.capacity
+                        )
+            current = self.tiers[0].current
+            cpu = current["cpu"]
+            rss = current["rss_growth"]
+            io = current["io"]
+            for entry in entries:
+                key = (entry.pid, entry.create_time, entry.name)
+                if entry.cpu_delta > 0:
+                    cpu.add(key, entry.cpu_delta)
+                if entry.rss_growth > 0:
+                    rss.add(key, entry.rss_growth)
+                if entry.io_delta > 0:
+                    io.add(key, entry.io_delta)
+
+    def top(self, metric, window, k=10):
+        """
+        Returns the k heaviest processes of metric over window, each with
+        the estimated value and how much it may overestimate. Raises
+        ValueError for an unknown metric or window.
+        """
+        if metric not in TOP_METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+        names = [name for name, length, count in TOP_WINDOWS]
+        if window not in names:
+            raise ValueError(f"Unknown window: {window}")
+        index = names.index(window)
+        with self.lock:
+            # The open buckets of the finer windows have not been folded
+            # into this one yet.
+            buckets = self.tiers[index].buckets(metric) + [
+                tier.current[metric] for tier in self.tiers[:index]
+            ]
+            summary = SpaceSaving.merge(buckets, self.capacity)
+        return [
+            {
+                "pid": pid,
+                "name": name,
+                "start_time": create_time,
+                "value": count,
+                "error": error,
+            }
+            for (pid, create_time, name), (count, error) in summary.top(k)
+        ]
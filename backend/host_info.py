@@ -0,0 +1,202 @@
+import select
+import socket
+import threading
+from .cpu_handler import CPU
+from .disk_handler import Disk
+from .network_handler import Network
+
+# rtnetlink multicast groups for link and address changes.
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV6_IFADDR = 0x100
+
+
+class Watcher:
+    """
+    Tracks a source of host information. The generation is bumped every
+    time the source is seen to change.
+    """
+
+    def __init__(self) -> None:
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def changed(self):
+        return False
+
+    def poll(self):
+        with self.lock:
+            if self.changed():
+                self.generation += 1
+            return self.generation
+
+
+class SignatureWatcher(Watcher):
+    """
+    Watches a cheap signature of the source, such as the contents of a
+    small sysfs file.
+    """
+
+    def __init__(self, signature) -> None:
+        super().__init__()
+        self.signature = signature
+        self.last = self.read()
+
+    def read(self):
+        try:
+            return self.signature()
+        except OSError:
+            return None
+
+    def changed(self):
+        current = self.read()
+        if current == self.last:
+            return False
+        self.last = current
+        return True
+
+
+class MountWatcher(Watcher):
+    """
+    Watches the mount table. The kernel flags /proc/self/mounts with
+    POLLPRI | POLLERR whenever a filesystem is mounted or unmounted.
+    """
+
+    def __init__(self, path="/proc/self/mounts") -> None:
+        super().__init__()
+        try:
+            self.file = open(path)
+            self.poller = select.poll()
+            self.poller.register(self.file, select.POLLPRI | select.POLLERR)
+        except (OSError, AttributeError):
+            self.poller = None
+
+    def changed(self):
+        if self.poller is None:
+            # No change notification available, always reload.
+            return True
+        if not self.poller.poll(0):
+            return False
+        # Reading the table acknowledges the event.
+        self.file.seek(0)
+        self.file.read()
+        return True
+
+
+class NetlinkWatcher(Watcher):
+    """
+    Watches network interfaces and their addresses through rtnetlink
+    notifications, falling back to the interface list where netlink is not
+    available.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.fallback = None
+        try:
+            self.sock = socket.socket(
+                socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE
+            )
+            self.sock.bind(
+                (0, RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV6_IFADDR)
+            )
+            self.sock.setblocking(False)
+        except (OSError, AttributeError):
+            self.sock = None
+            self.fallback = SignatureWatcher(lambda: tuple(socket.if_nameindex()))
+
+    def changed(self):
+        if self.sock is None:
+            return self.fallback.changed()
+        changed = False
+        while True:
+            try:
+                self.sock.recv(65536)
+            except BlockingIOError:
+                break
+            except OSError:
+                # ENOBUFS: events were dropped, assume something changed.
+                changed = True
+                break
+            changed = True
+        return changed
+
+
+class CachedValue:
+    """
+    A value loaded once and reloaded only after one of its watchers reports
+    a change. Background values are reloaded on a separate thread while the
+    previous value keeps being served, so a slow loader never blocks get().
+    """
+
+    def __init__(self, loader, watchers=(), background=False) -> None:
+        self.loader = loader
+        self.watchers = watchers
+        self.background = background
+        self.value = None
+        self.generation = None
+        self.refreshing = False
+        self.lock = threading.Lock()
+
+    def load(self, generation):
+        try:
+            value = self.loader()
+        except Exception as e:
+            print(f"Host info refresh failed: {e}")
+            value = self.value
+        with self.lock:
+            self.value = value
+            self.generation = generation
+            self.refreshing = False
+
+    def get(self):
+        with self.lock:
+            generation = tuple(w.poll() for w in self.watchers)
+            if generation == self.generation or self.refreshing:
+                return self.value
+            if self.background:
+                self.refreshing = True
+                threading.Thread(
+                    target=self.load, args=(generation,), daemon=True
+                ).start()
+                return self.value
+        self.load(generation)
+        return self.value
+
+
+class HostInfo:
+    """
+    Host information that rarely changes, invalidated by change
+    notifications instead of being recomputed per request.
+    """
+
+    def __init__(self) -> None:
+        cpus = SignatureWatcher(lambda: read_file("/sys/devices/system/cpu/online"))
+        mounts = MountWatcher()
+        links = NetlinkWatcher()
+        hostname = SignatureWatcher(socket.gethostname)
+        self.cpu_count = CachedValue(CPU.get_cpu_count, (cpus,))
+        self.disk_partitions = CachedValue(Disk.get_disk_partitions, (mounts,))
+        self.connection_type = CachedValue(
+            Network.get_primary_connection_type, (links,)
+        )
+        # Both go through the resolver, which can stall for seconds.
+        self.ipv4 = CachedValue(
+            Network.get_primary_ipv4, (links, hostname), background=True
+        )
+        self.ipv6 = CachedValue(
+            Network.get_primary_ipv6, (links, hostname), background=True
+        )
+
+    def start(self):
+        """
+        Starts resolving the addresses so they are ready for the first
+        request.
+        """
+        self.ipv4.get()
+        self.ipv6.get()
+
+
+def read_file(path):
+    with open(path) as f:
+        return f.read()
@@ -0,0 +1,347 @@
+import asyncio
+import mmap
+import os
+import struct
+import threading
+import time
+import numpy as np
+
+# Fixed-width record layout of every segment file.
+RECORD = np.dtype([("time", "<f8"), ("value", "<f8")])
+MAGIC = b"SYSMSEG1"
+# Magic followed by the number of records written so far.
+HEADER = struct.Struct("<8sQ")
+
+
+class Segment:
+    """
+    One append-only segment file: a header followed by preallocated
+    fixed-width records, memory-mapped for both writing and reading.
+    """
+
+    def __init__(self, path, capacity=None):
+        self.path = path
+        if capacity is not None and not os.path.exists(path):
+            with open(path, "wb") as f:
+                # The header goes first so a crash never leaves a file that
+                # is long enough to map but has no header.
+                f.write(HEADER.pack(MAGIC, 0))
+                f.flush()
+                # Sparse on Linux, only written records take disk space.
+                f.truncate(HEADER.size + capacity * RECORD.itemsize)
+        with open(path, "r+b") as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise ValueError(f"{path} is truncated")
+            self.map = mmap.mmap(f.fileno(), 0)
+        magic, self.count = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a metrics segment")
+        self.capacity = (len(self.map) - HEADER.size) // RECORD.itemsize
+        if self.count > self.capacity:
+            raise ValueError(f"{path} counts more records than it holds")
+        self.records = np.frombuffer(
+            self.map, dtype=RECORD, count=self.capacity, offset=HEADER.size
+        )
+
+    @property
+    def full(self):
+        return self.count >= self.capacity
+
+    def append(self, timestamp, value):
+        self.records[self.count] = (timestamp, value)
+        # The count is published after the record so readers never see a
+        # half-written one, even after a crash.
+        self.count += 1
+        HEADER.pack_into(self.map, 0, MAGIC, self.count)
+
+    def extend(self, records):
+        """
+        Appends as many records as fit and returns how many were written.
+        """
+        n = min(len(records), self.capacity - self.count)
+        self.records[self.count: self.count + n] = records[:n]
+        self.count += n
+        HEADER.pack_into(self.map, 0, MAGIC, self.count)
+        return n
+
+    def view(self, since=None, until=None):
+        """
+        Returns a zero-copy slice of the mapped records in [since, until].
+        """
+        records = self.records[: self.count]
+        times = records["time"]
+        lo = 0 if since is None else np.searchsorted(times, since, side="left")
+        hi = len(records) if until is None else np.searchsorted(times, until, side="right")
+        return records[lo:hi]
+
+    def first(self):
+        return self.records["time"][0] if self.count else None
+
+    def last(self):
+        return self.records["time"][self.count - 1] if self.count else None
+
+
+class SegmentLog:
+    """
+    Time-ordered list of segments in one directory. Appends go to the newest
+    segment and roll over to a fresh file once it is full.
+    """
+
+    def __init__(self, directory, capacity):
+        self.directory = directory
+        self.capacity = capacity
+        os.makedirs(directory, exist_ok=True)
+        self.segments = []
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".seg"):
+                self.load(os.path.join(directory, name))
+
+    def load(self, path):
+        """
+        Opens an existing segment. One that cannot be read, such as a file
+        left empty by a crash while it was created, is renamed to .bad so
+        the rest of the history still loads.
+        """
+        try:
+            self.segments.append(Segment(path))
+        except (OSError, ValueError) as e:
+            print(f"Skipping unreadable metrics segment {path}: {e}")
+            try:
+                os.replace(path, path + ".bad")
+            except OSError:
+                pass
+
+    def roll(self, timestamp):
+        millis = int(timestamp * 1000)
+        # Small segments can fill up within one millisecond, names must
+        # still be unique and sort in order.
+        while os.path.exists(os.path.join(self.directory, f"{millis:016d}.seg")):
+            millis += 1
+        path = os.path.join(self.directory, f"{millis:016d}.seg")
+        segment = Segment(path, self.capacity)
+        self.segments.append(segment)
+        return segment
+
+    def append(self, timestamp, value):
+        """
+        Appends one record and returns True when a new segment was started.
+        """
+        rolled = not self.segments or self.segments[-1].full
+        segment = self.roll(timestamp) if rolled else self.segments[-1]
+        segment.append(timestamp, value)
+        return rolled
+
+    def extend(self, records):
+        while len(records):
+            if not self.segments or self.segments[-1].full:
+                self.roll(records["time"][0])
+            records = records[self.segments[-1].extend(records):]
+
+    def sealed(self):
+        """
+        Returns every segment except the one being appended to.
+        """
+        return self.segments[:-1]
+
+    def drop(self, segment):
+        # The mapping stays valid for readers still holding views, it is
+        # released once they are gone.
+        self.segments.remove(segment)
+        os.remove(segment.path)
+
+    def read(self, since=None, until=None):
+        views = []
+        for segment in list(self.segments):
+            last = segment.last()
+            if last is None or (since is not None and last < since):
+                continue
+            first = segment.first()
+            if until is not None and first > until:
+                break
+            views.append(segment.view(since, until))
+        return views
+
+
+class MetricStore:
+    """
+    Persistent metrics history on disk.
+
+    Each metric gets a raw log of per-tick records and a compacted log.
+    Raw segments older than compact_after are downsampled to resolution
+    second averages into the compacted log and deleted. Compacted segments
+    hold compact_after seconds of averages each and are deleted whole once
+    their newest record is older than retention, so up to retention plus
+    compact_after seconds are kept.
+
+    Metric names become directory names and must not contain path
+    separators or "..".
+    """
+
+    def __init__(
+        self,
+        directory="metrics",
+        capacity=86400,
+        compact_after=86400,
+        resolution=60,
+        retention=8 * 7 * 86400,
+    ) -> None:
+        self.directory = directory
+        self.capacity = capacity
+        self.compact_after = compact_after
+        self.resolution = resolution
+        self.retention = retention
+        self.logs = {}
+        # Metrics skipped by record() because of their name.
+        self.rejected = set()
+        self.lock = threading.Lock()
+        # Serializes compactions, which run outside the store lock.
+        self.compacting = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        for metric in sorted(os.listdir(directory)):
+            path = os.path.join(directory, metric)
+            if os.path.isdir(path) and self.valid_name(metric):
+                self.open(metric)
+
+    @staticmethod
+    def valid_name(metric):
+        return (
+            metric not in ("", ".")
+            and ".." not in metric
+            and not any(sep and sep in metric for sep in (os.sep, os.altsep))
+        )
+
+    def open(self, metric):
+        """
+        Opens the logs of a metric, creating them if needed. Raises
+        ValueError for a name that is not a plain directory name.
+        """
+        if not self.valid_name(metric):
+            raise ValueError(f"Invalid metric name: {metric!r}")
+        path = os.path.join(self.directory, metric)
+        logs = (
+            SegmentLog(
+                os.path.join(path, "compacted"),
+                max(int(self.compact_after // self.resolution), 1),
+            ),
+            SegmentLog(os.path.join(path, "raw"), self.capacity),
+        )
+        self.logs[metric] = logs
+        return logs
+
+    def record(self, snapshot):
+        """
+        Appends every numeric reading of a snapshot to its raw log and
+        returns the metrics that started a new segment.
+        """
+        rolled = []
+        with self.lock:
+            for metric, value in snapshot.metrics().items():
+                logs = self.logs.get(metric)
+                if logs is None:
+                    if not self.valid_name(metric):
+                        if metric not in self.rejected:
+                            self.rejected.add(metric)
+                            print(f"Not storing metric with invalid name {metric!r}")
+                        continue
+                    logs = self.open(metric)
+                if logs[1].append(snapshot.time, value):
+                    rolled.append(metric)
+        return rolled
+
+    async def on_snapshot(self, snapshot):
+        rolled = self.record(snapshot)
+        if rolled:
+            # Every metric rolls over on the same tick. Compaction reads and
+            # writes whole segments, so it runs in an executor and is not
+            # awaited, keeping the sampler's listeners on schedule.
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(None, self.compact_all, rolled, snapshot.time)
+            future.add_done_callback(self.compacted)
+
+    @staticmethod
+    def compacted(future):
+        if not future.cancelled() and future.exception() is not None:
+            print(f"Metrics compaction failed: {future.exception()}")
+
+    def compact_all(self, metrics, now=None):
+        for metric in metrics:
+            self.compact(metric, now)
+
+    def compact(self, metric, now=None):
+        """
+        Downsamples old raw segments of a metric and drops expired ones.
+        Sealed segments are no longer appended to, so they are downsampled
+        without holding the store lock; it is only taken to swap them for
+        the compacted records.
+        """
+        now = time.time() if now is None else now
+        with self.compacting:
+            with self.lock:
+                compacted, raw = self.logs[metric]
+                old = [
+                    segment
+                    for segment in raw.sealed()
+                    if not segment.count or segment.last() < now - self.compact_after
+                ]
+            for segment in old:
+                records = self.downsample(segment.view()) if segment.count else None
+                with self.lock:
+                    if records is not None:
+                        compacted.extend(records)
+                    raw.drop(segment)
+            with self.lock:
+                for segment in compacted.sealed():
+                    if not segment.count or segment.last() < now - self.retention:
+                        compacted.drop(segment)
+
+    def downsample(self, records):
+        """
+        Averages records into buckets of resolution seconds.
+        """
+        buckets = np.floor(records["time"] / self.resolution) * self.resolution
+        starts, index, counts = np.unique(
+            buckets, return_index=True, return_counts=True
+        )
+        result = np.empty(len(starts), dtype=RECORD)
+        result["time"] = starts
+        result["value"] = np.add.reduceat(records["value"], index) / counts
+        return result
+
+    def metrics(self):
+        with self.lock:
+            return sorted(self.logs)
+
+    def read(self, metric, since=None, until=None):
+        """
+        Returns zero-copy views of the stored records of a metric in
+        [since, until], oldest first.
+        """
+        compacted, raw = self.read_logs(metric, since, until)
+        return compacted + raw
+
+    def read_logs(self, metric, since=None, until=None):
+        """
+        Like read, but returns the views of the compacted averages and of the
+        raw records separately.
+        """
+        with self.lock:
+            compacted, raw = self.logs[metric]
+            return compacted.read(since, until), raw.read(since, until)
+
+    def query(self, metric, since=None, until=None, max_points=None):
+        """
+        Returns the stored samples of a metric, thinned to at most
+        max_points by taking every n-th record.
+        """
+        views = self.read(metric, since, until)
+        total = sum(len(view) for view in views)
+        step = 1
+        if max_points and total > max_points:
+            step = -(-total // max_points)
+        timestamps = []
+        values = []
+        for view in views:
+            view = view[::step]
+            timestamps.extend(view["time"].tolist())
+            values.extend(view["value"].tolist())
+        return {"metric": metric, "timestamps": timestamps, "values": values}
@@ -77,6 +77,20 @@ class Network:
         monitored_traffic = {"sent": sent_per_second, "recv": recv_per_second}
         return monitored_traffic
 
+    @staticmethod
+    def compute_throughput(previous, current, elapsed):
+        """
+        Returns the bytes per second sent and received between two
+        get_bandwidth_usage readings taken elapsed seconds apart.
+        """
+        if elapsed <= 0:
+            return {"sent": 0.0, "recv": 0.0}
+        sent_per_second = (current["bytes_sent"] - previous["bytes_sent"]) / elapsed
+        recv_per_second = (
+            current["bytes_received"] - previous["bytes_received"]
+        ) / elapsed
+        return {"sent": sent_per_second, "recv": recv_per_second}
+
     @staticmethod
     def get_primary_ipv4():
         hostname = socket.gethostname()
@@ -3,15 +3,27 @@ from .cpu_handler import CPU
 from .mem_handler import Memory
 from .disk_handler import Disk
 from .network_handler import Network
+from .pressure_handler import Pressure
+
+# Alert title of every /proc/pressure resource.
+PRESSURE_TITLES = {"cpu": "CPU", "memory": "Memory", "io": "I/O"}
 
 
 class NotificationService:
-    def __init__(self) -> None:
+    def __init__(self, sampler=None) -> None:
+        self.sampler = sampler
         self.cpu_threshold = 80
         self.memory_threshold = 80
         self.disk_threshold = 80
         self.network_threshold = 1000000
         self.gpu_threshold = 80
+        # Percentages of CPU time, the signs of a starved or I/O-bound VM.
+        self.steal_threshold = 10
+        self.iowait_threshold = 20
+        # Percentage of the last 10s some task stalled on a resource, and
+        # major page faults per second.
+        self.pressure_threshold = 10
+        self.major_fault_threshold = 1000
         self.check_interval = 10
         self.task = None
         self.listeners = []
@@ -32,6 +44,10 @@ class NotificationService:
                 self.network_threshold,
                 self.gpu_threshold,
                 self.check_interval,
+                steal_threshold=self.steal_threshold,
+                iowait_threshold=self.iowait_threshold,
+                pressure_threshold=self.pressure_threshold,
+                major_fault_threshold=self.major_fault_threshold,
             )
             await asyncio.sleep(self.check_interval)
 
@@ -43,37 +59,97 @@ class NotificationService:
         network_threshold=1000000,
         gpu_threshold=80,
         check_interval=10,
+        steal_threshold=10,
+        iowait_threshold=20,
+        pressure_threshold=10,
+        major_fault_threshold=1000,
     ):
-        cpu_usage = CPU.get_cpu_usage()
-        memory_usage = Memory.get_memory_percent()
-        disk_usage = Disk.get_disk_usage("/")["percent"]
-        net_io = Network.get_bandwidth_usage()
-        network_usage = (
-            net_io["bytes_sent"] + net_io["bytes_received"]
-        ) / check_interval
+        if self.sampler is not None:
+            # Reuse the shared sampler readings instead of blocking the loop.
+            snapshot = self.sampler.current()
+            cpu_usage = snapshot.reading("cpu.usage")
+            cpu_breakdown = snapshot.reading("cpu.breakdown")
+            memory_usage = snapshot.reading("memory.percent")
+            disk_usage = snapshot.reading("disk.usage.percent")
+            net_io = snapshot.reading("net")
+            pressure = snapshot.reading("pressure")
+            vmstat = snapshot.reading("vmstat")
+        else:
+            cpu_stats = CPU.get_cpu_stats()
+            cpu_usage = cpu_stats["usage"]
+            cpu_breakdown = cpu_stats["breakdown"]
+            memory_usage = Memory.get_memory_percent()
+            disk_usage = Disk.get_disk_usage("/")["percent"]
+            net_io = Network.get_bandwidth_usage()
+            pressure = Pressure.get_pressure()
+            vmstat = Pressure.get_vmstat_rates()
+        if net_io and "bytes_sent" in net_io:
+            network_usage = (
+                net_io["bytes_sent"] + net_io["bytes_received"]
+            ) / check_interval
+        else:
+            network_usage = None
 
         # Debugging: Print fetched values
         print(f"CPU Usage: {cpu_usage}")
         print(f"Memory Usage: {memory_usage}")
         print(f"Disk Usage: {disk_usage}")
-        print(f"Network Usage: {Network.bytes_convert(network_usage)}")
+        if network_usage is not None:
+            print(f"Network Usage: {Network.bytes_convert(network_usage)}")
 
+        # Readings the sampler could not take are None and not checked.
         # Check CPU usage
-        if cpu_usage > cpu_threshold:
+        if cpu_usage is not None and cpu_usage > cpu_threshold:
             await self.notify_listeners(
                 "CPU Usage Alert", f"CPU usage is at {cpu_usage}%"
             )
             print(f"CPU usage is above threshold: {cpu_usage}%")
 
+        # Check CPU steal time
+        breakdown = cpu_breakdown or {}
+        steal = breakdown.get("steal")
+        if steal is not None and steal > steal_threshold:
+            await self.notify_listeners(
+                "CPU Steal Alert", f"CPU steal time is at {steal}%"
+            )
+            print(f"CPU steal time is above threshold: {steal}%")
+
+        # Check CPU iowait
+        iowait = breakdown.get("iowait")
+        if iowait is not None and iowait > iowait_threshold:
+            await self.notify_listeners(
+                "CPU IOWait Alert", f"CPU iowait is at {iowait}%"
+            )
+            print(f"CPU iowait is above threshold: {iowait}%")
+
         # Check Memory usage
-        if memory_usage > memory_threshold:
+        if memory_usage is not None and memory_usage > memory_threshold:
             await self.notify_listeners(
                 "Memory Usage Alert", f"Memory usage is at {memory_usage:.2f}%"
             )
             print(f"Memory usage is above threshold: {memory_usage:.2f}%")
 
+        # Check tasks stalling on CPU, memory and I/O
+        if pressure is not None:
+            for resource, title in PRESSURE_TITLES.items():
+                stall = pressure[resource]["some"]["avg10"]
+                if stall > pressure_threshold:
+                    await self.notify_listeners(
+                        f"{title} Pressure Alert",
+                        f"Tasks stalled on {resource} {stall}% of the last 10s",
+                    )
+                    print(f"{resource} pressure is above threshold: {stall}%")
+
+        # Check major page faults
+        major_faults = (vmstat or {}).get("pgmajfault")
+        if major_faults is not None and major_faults > major_fault_threshold:
+            await self.notify_listeners(
+                "Major Fault Alert", f"Major page faults at {major_faults:.0f}/s"
+            )
+            print(f"Major page faults are above threshold: {major_faults:.0f}/s")
+
         # Check Disk usage
-        if disk_usage > disk_threshold:
+        if disk_usage is not None and disk_usage > disk_threshold:
             await self.notify_listeners(
                 "Disk Usage Alert", f"Disk usage is at {disk_usage}%"
             )
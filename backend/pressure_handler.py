@@ -0,0 +1,110 @@
+import time
+
+# Resources with a /proc/pressure file.
+PSI_RESOURCES = ("cpu", "memory", "io")
+# /proc/vmstat counters converted to per-second rates: page faults, major
+# faults, pages swapped in and out, and pages scanned by kswapd and by
+# direct reclaim.
+VMSTAT_COUNTERS = (
+    "pgfault",
+    "pgmajfault",
+    "pswpin",
+    "pswpout",
+    "pgscan_kswapd",
+    "pgscan_direct",
+)
+# Kernels before 4.8 count pgscan per memory zone, e.g. pgscan_kswapd_normal.
+VMSTAT_ZONES = ("dma", "dma32", "normal", "high", "movable", "device")
+
+
+class Pressure:
+
+    @staticmethod
+    def parse_pressure(text):
+        """
+        Parses one /proc/pressure file into its "some" and "full" lines,
+        each with the avg10/avg60/avg300 percentages and the total stall
+        time in microseconds.
+        """
+        result = {}
+        for line in text.splitlines():
+            kind, *fields = line.split()
+            values = {}
+            for field in fields:
+                key, _, value = field.partition("=")
+                values[key] = int(value) if key == "total" else float(value)
+            result[kind] = values
+        return result
+
+    @staticmethod
+    def get_pressure(root="/proc"):
+        """
+        Returns the Pressure Stall Information of cpu, memory and io, or
+        None if the kernel does not provide it.
+        """
+        pressure = {}
+        for resource in PSI_RESOURCES:
+            try:
+                with open(f"{root}/pressure/{resource}") as f:
+                    pressure[resource] = Pressure.parse_pressure(f.read())
+            except OSError:
+                # Missing without CONFIG_PSI, EOPNOTSUPP when booted psi=0.
+                return None
+        return pressure
+
+    @staticmethod
+    def get_vmstat_counters(root="/proc"):
+        """
+        Returns the cumulative VMSTAT_COUNTERS, zone counters summed up, or
+        None where there is no /proc/vmstat.
+        """
+        counters = dict.fromkeys(VMSTAT_COUNTERS, 0)
+        try:
+            f = open(f"{root}/vmstat", "rb")
+        except OSError:
+            return None
+        with f:
+            for line in f:
+                key, _, value = line.decode().partition(" ")
+                name, _, zone = key.rpartition("_")
+                if key in counters:
+                    counters[key] += int(value)
+                elif zone in VMSTAT_ZONES and name in counters:
+                    counters[name] += int(value)
+        return counters
+
+    @staticmethod
+    def compute_vmstat_rates(previous, current, elapsed):
+        """
+        Returns the per-second rate of every counter between two
+        get_vmstat_counters readings taken elapsed seconds apart.
+        """
+        if previous is None or current is None or elapsed <= 0:
+            return dict.fromkeys(VMSTAT_COUNTERS, 0.0)
+        return {
+            key: max(current[key] - previous[key], 0) / elapsed
+            for key in VMSTAT_COUNTERS
+        }
+
+    @staticmethod
+    def get_vmstat_rates(interval=1):
+        """
+        Returns the vmstat rates measured over a single interval, all zero
+        where there is no /proc/vmstat.
+        """
+        previous = Pressure.get_vmstat_counters()
+        time.sleep(interval)
+        current = Pressure.get_vmstat_counters()
+        return Pressure.compute_vmstat_rates(previous, current, interval)
+
+
+def main():
+    print("Pressure stall information:")
+    print(Pressure.get_pressure())
+
+    print("\nvmstat rates:")
+    print(Pressure.get_vmstat_rates())
+
+
+if __name__ == "__main__":
+    main()
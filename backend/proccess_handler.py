@@ -1,9 +1,87 @@
+import asyncio
+import functools
+import heapq
+import os
+import pwd
+import threading
+import time
+import uuid
 import psutil
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from .heavy_hitters import HeavyHitters
+from .process_index import ProcessIndex
+from .process_watch import ProcessWatchList
+from .procfs import (
+    ProcfsScanner,
+    count_fds,
+    read_cgroup,
+    read_cmdline,
+    read_smaps_rollup,
+)
+
+# Sort keys accepted by ProcessTable.list, mapped to the entry attribute.
+PROCESS_SORT_KEYS = {
+    "pid": lambda entry: entry.pid,
+    "name": lambda entry: (entry.name or "").lower(),
+    "status": lambda entry: entry.status or "",
+    "cpu": lambda entry: entry.cpu_usage,
+    "memory": lambda entry: entry.rss,
+    "start_time": lambda entry: entry.create_time,
+}
+# Columns kept up to date by every refresh.
+PROCESS_COLUMNS = {
+    "pid": lambda entry: entry.pid,
+    "name": lambda entry: entry.name,
+    "status": lambda entry: entry.status,
+    "cpu_usage": lambda entry: entry.cpu_usage,
+    "memory_usage": lambda entry: entry.rss,
+    "rss": lambda entry: entry.rss,
+    "start_time": lambda entry: entry.create_time,
+    "ppid": lambda entry: entry.ppid,
+    "num_threads": lambda entry: entry.num_threads,
+    "user": lambda entry: entry.user,
+}
+# Columns only read from the process when a caller asks for them.
+EXPENSIVE_PROCESS_COLUMNS = {
+    "cmdline": lambda proc: proc.cmdline(),
+    "username": lambda proc: proc.username(),
+    "num_fds": lambda proc: proc.num_fds(),
+    "io_counters": lambda proc: proc.io_counters()._asdict(),
+}
+# Columns from smaps_rollup, collected in the background by MemoryDetails.
+MEMORY_COLUMNS = ("uss", "pss", "swap")
+DEFAULT_PROCESS_FIELDS = (
+    "pid",
+    "name",
+    "status",
+    "cpu_usage",
+    "memory_usage",
+    "start_time",
+)
+# How long killed processes get to exit after SIGKILL.
+KILL_TIMEOUT = 1.0
+# Longest grace period a kill job accepts, in seconds.
+MAX_KILL_GRACE = 60.0
+# How often kill jobs check whether their processes exited.
+KILL_POLL_INTERVAL = 0.1
+# Kill job results:
+# pending - not signalled yet
+# terminating - SIGTERM sent, waiting for the grace period
+# terminated - exited within the grace period
+# killing - SIGKILL sent
+# killed - exited after SIGKILL
+# running - still running after SIGKILL
+# not_found, access_denied, refused - not signalled
+# recycled - not signalled, the pid now belongs to another process
+# Attributes ProcessTable.groups can aggregate by.
+PROCESS_GROUP_KEYS = ("name", "user", "cgroup", "ppid")
 
 
 class Process:
 
+    @staticmethod
     def bytes_to_human(bytes_size):
         """
         Converts bytes to a human-readable format (KB, MB, GB).
@@ -17,79 +95,802 @@ class Process:
         return f"{size:.2f} {units[unit]}"
 
     @staticmethod
-    def list_all_processes():
+    def parse_fields(fields):
         """
-        Lists all running processes with their details.
+        Splits a comma separated column list, defaulting to
+        DEFAULT_PROCESS_FIELDS. Raises ValueError for unknown columns.
         """
-        processes = []
-        for proc in psutil.process_iter(
-            ["pid", "name", "status", "cpu_percent", "memory_info", "create_time"]
-        ):
-            try:
-                # Fetch information about each process
-                process_info = {
-                    "pid": proc.info["pid"],
-                    "name": proc.info["name"],
-                    "status": proc.info["status"],
-                    "cpu_usage": proc.info["cpu_percent"],
-                    "memory_usage": Process.bytes_to_human(
-                        proc.info["memory_info"].rss
-                    ),
-                    "start_time": datetime.fromtimestamp(
-                        proc.info["create_time"]
-                    ).strftime("%Y-%m-%d %H:%M:%S"),
-                }
-                processes.append(process_info)
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue  # Handle processes that have exited or are not accessible
-        return processes
+        if not fields:
+            return DEFAULT_PROCESS_FIELDS
+        parsed = []
+        for field in fields.split(","):
+            field = field.strip()
+            if field and field not in parsed:
+                parsed.append(field)
+        unknown = [
+            f
+            for f in parsed
+            if f not in PROCESS_COLUMNS
+            and f not in EXPENSIVE_PROCESS_COLUMNS
+            and f not in MEMORY_COLUMNS
+        ]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return tuple(parsed)
 
     @staticmethod
-    def get_process_info(pid):
+    def format_row(entry, human=False, fields=DEFAULT_PROCESS_FIELDS, memory=None):
+        """
+        Returns the requested columns of a process table entry. Memory is in
+        bytes and the start time in epoch seconds unless human is set.
+        Expensive columns are read from the process now, USS, PSS and swap
+        come from the memory cache and are None until collected.
+        """
+        row = {}
+        expensive = []
+        for field in fields:
+            column = PROCESS_COLUMNS.get(field)
+            if column is not None:
+                row[field] = column(entry)
+            elif field in MEMORY_COLUMNS:
+                row[field] = None
+            else:
+                expensive.append(field)
+        if memory is not None and any(f in MEMORY_COLUMNS for f in fields):
+            details = memory.lookup(entry)
+            if details is not None:
+                for field in MEMORY_COLUMNS:
+                    if field in row:
+                        row[field] = details[field]
+        if human:
+            for field in ("memory_usage",) + MEMORY_COLUMNS:
+                if row.get(field) is not None:
+                    row[field] = Process.bytes_to_human(row[field])
+            if "start_time" in row:
+                row["start_time"] = datetime.fromtimestamp(
+                    entry.create_time
+                ).strftime("%Y-%m-%d %H:%M:%S")
+        if expensive:
+            row.update(entry.read_columns(expensive))
+        return row
+
+
+class ProcessEntry:
+    """
+    A process tracked across samples, identified by (pid, create_time) so a
+    recycled pid is never mistaken for the process that used it before.
+    """
+
+    def __init__(self, pid, create_time, proc=None) -> None:
+        self.proc = proc
+        self.pid = pid
+        self.create_time = create_time
+        self.name = None
+        self.status = None
+        self.rss = 0
+        self.ppid = None
+        self.num_threads = 0
+        self.uid = None
+        self.cgroup = None
+        self.io = None
+        self.cpu_time = None
+        self.cpu_usage = 0.0
+        # Usage since the previous update, fed to the heavy hitters.
+        self.cpu_delta = 0.0
+        self.rss_growth = 0
+        self.io_delta = 0
+
+    @property
+    def key(self):
+        return (self.pid, self.create_time)
+
+    @property
+    def user(self):
+        return username(self.uid)
+
+    def group_keys(self):
+        return (self.name, self.user, self.cgroup, self.ppid)
+
+    def account(self, cpu_time, rss, io, elapsed):
         """
-        Retrieves and returns key process information.
+        Derives CPU% and the usage deltas from the counters of the previous
+        update.
         """
-        process = psutil.Process(pid)
+        if self.cpu_time is not None:
+            self.cpu_delta = max(0.0, cpu_time - self.cpu_time)
+            self.rss_growth = max(0, rss - self.rss)
+            self.io_delta = 0
+            if io is not None and self.io is not None:
+                self.io_delta = max(0, io - self.io)
+            if elapsed > 0:
+                self.cpu_usage = round(self.cpu_delta / elapsed * 100, 1)
+        self.cpu_time = cpu_time
+        self.rss = rss
+        self.io = io
+
+    def update(self, elapsed):
+        """
+        Reads the process counters through psutil.
+        """
+        if self.proc is None:
+            self.proc = psutil.Process(self.pid)
+        with self.proc.oneshot():
+            times = self.proc.cpu_times()
+            self.name = self.proc.name()
+            self.status = self.proc.status()
+            rss = self.proc.memory_info().rss
+            self.ppid = self.proc.ppid()
+            self.num_threads = self.proc.num_threads()
+            self.uid = self.proc.uids().real
+            try:
+                counters = self.proc.io_counters()
+                io = counters.read_bytes + counters.write_bytes
+            except (psutil.AccessDenied, AttributeError):
+                io = None
+        self.account(times.user + times.system, rss, io, elapsed)
+
+    def read_columns(self, columns):
+        """
+        Reads expensive columns straight from the process. Columns that are
+        not accessible, or of a process that exited, are None.
+        """
+        values = dict.fromkeys(columns)
         try:
-            process_info = {
-                "pid": process.pid,
-                "name": process.name(),
-                "status": process.status(),
-                "cpu_usage": process.cpu_percent(interval=1.0),
-                "memory_usage": Process.bytes_to_human(process.memory_info().rss),
-                "start_time": datetime.fromtimestamp(process.create_time()).strftime(
-                    "%Y-%m-%d %H:%M:%S"
-                ),
-            }
-            return process_info
+            if self.proc is None:
+                proc = psutil.Process(self.pid)
+                if proc.create_time() != self.create_time:
+                    # The pid now belongs to another process.
+                    return values
+                self.proc = proc
+            with self.proc.oneshot():
+                for column in columns:
+                    try:
+                        values[column] = EXPENSIVE_PROCESS_COLUMNS[column](self.proc)
+                    except psutil.AccessDenied:
+                        pass
         except psutil.NoSuchProcess:
+            pass
+        return values
+
+    def apply(self, sample, elapsed):
+        """
+        Takes the counters from a procfs scanner sample.
+        """
+        self.name = sample.name
+        self.status = sample.status
+        self.ppid = sample.ppid
+        self.num_threads = sample.num_threads
+        self.uid = sample.uid
+        self.account(sample.cpu_time, sample.rss, sample.io, elapsed)
+
+
+class MemoryDetails:
+    """
+    USS, PSS and swap of processes from smaps_rollup, which the kernel has
+    to walk every mapping for. Reads run on a small worker pool and are
+    cached for ttl seconds. Lookups never wait: they return the cached
+    value, stale or None, and queue a refresh when it is out of date, so
+    only processes that are actually viewed are read.
+    """
+
+    def __init__(self, root="/proc", workers=2, ttl=10.0, size=4096) -> None:
+        self.root = root
+        self.ttl = ttl
+        self.size = size
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="smaps"
+        )
+        # (pid, create_time) -> (monotonic time read, values or None)
+        self.cache = OrderedDict()
+        self.pending = set()
+        self.lock = threading.Lock()
+
+    def read(self, pid):
+        try:
+            return read_smaps_rollup(pid, self.root)
+        except OSError:
+            pass
+        # No smaps_rollup (old kernel, other platform): psutil's full scan.
+        try:
+            info = psutil.Process(pid).memory_full_info()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
             return None
+        return {
+            "uss": info.uss,
+            "pss": getattr(info, "pss", None),
+            "swap": getattr(info, "swap", None),
+        }
+
+    def collect(self, key):
+        values = self.read(key[0])
+        with self.lock:
+            self.pending.discard(key)
+            self.cache[key] = (time.monotonic(), values)
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.size:
+                self.cache.popitem(last=False)
+
+    def lookup(self, entry):
+        """
+        Returns the cached values of entry, or None if there are none yet.
+        """
+        key = entry.key
+        with self.lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache.move_to_end(key)
+            stale = cached is None or time.monotonic() - cached[0] >= self.ttl
+            if stale and key not in self.pending and len(self.pending) < self.size:
+                self.pending.add(key)
+                self.executor.submit(self.collect, key)
+        return cached[1] if cached is not None else None
+
+
+@functools.lru_cache(maxsize=1024)
+def username(uid):
+    """
+    Returns the login name of uid, or the uid itself if it has none.
+    """
+    if uid is None:
+        return None
+    try:
+        return pwd.getpwuid(uid).pw_name
+    except KeyError:
+        return str(uid)
+
+
+class ProcessGroups:
+    """
+    Membership of the process table in every PROCESS_GROUP_KEYS grouping.
+
+    Processes are only moved between groups when they start, exit or
+    change one of their keys, so aggregating never regroups the table.
+    """
+
+    def __init__(self) -> None:
+        # by -> group -> {pid: entry}
+        self.members = {by: {} for by in PROCESS_GROUP_KEYS}
+        # pid -> (entry, group keys) currently filed
+        self.filed = {}
+        self.lock = threading.Lock()
+
+    def remove(self, pid):
+        entry, keys = self.filed.pop(pid)
+        for by, key in zip(PROCESS_GROUP_KEYS, keys):
+            group = self.members[by][key]
+            del group[pid]
+            if not group:
+                del self.members[by][key]
+
+    def add(self, entry, keys):
+        for by, key in zip(PROCESS_GROUP_KEYS, keys):
+            self.members[by].setdefault(key, {})[entry.pid] = entry
+        self.filed[entry.pid] = (entry, keys)
+
+    def sync(self, rows):
+        """
+        Brings membership in line with rows, {pid: entry}.
+        """
+        with self.lock:
+            for pid in self.filed.keys() - rows.keys():
+                self.remove(pid)
+            for pid, entry in rows.items():
+                keys = entry.group_keys()
+                filed = self.filed.get(pid)
+                if filed is not None:
+                    if filed[0] is entry and filed[1] == keys:
+                        continue
+                    self.remove(pid)
+                self.add(entry, keys)
+
+    def pids(self, by, group):
+        """
+        Returns {pid: create_time} of the members of one group. group is
+        matched as a string, and as a number for the ppid grouping. Raises
+        ValueError for an unknown grouping.
+        """
+        if by not in PROCESS_GROUP_KEYS:
+            raise ValueError(f"Unknown grouping: {by}")
+        if by == "ppid":
+            try:
+                group = int(group)
+            except (TypeError, ValueError):
+                return {}
+        with self.lock:
+            members = self.members[by].get(group, {})
+            return {pid: entry.create_time for pid, entry in members.items()}
+
+    def totals(self, by):
+        """
+        Returns the process count, CPU%, RSS and thread count of every
+        group of the by grouping, busiest first. Raises ValueError for an
+        unknown grouping.
+        """
+        if by not in PROCESS_GROUP_KEYS:
+            raise ValueError(f"Unknown grouping: {by}")
+        totals = []
+        with self.lock:
+            for key, group in self.members[by].items():
+                entries = group.values()
+                totals.append(
+                    {
+                        "group": key,
+                        "count": len(group),
+                        "cpu_usage": round(sum(e.cpu_usage for e in entries), 1),
+                        "rss": sum(e.rss for e in entries),
+                        "num_threads": sum(e.num_threads for e in entries),
+                        "pids": sorted(group),
+                    }
+                )
+        totals.sort(key=lambda group: group["cpu_usage"], reverse=True)
+        return totals
+
+
+class ProcessTable:
+    """
+    Long-lived table of running processes, refreshed once per sampler tick.
+
+    Process handles are kept between refreshes, so CPU% is the delta of
+    cumulative CPU time over the tick instead of a blocking measurement.
+    Requests read the last published rows and never touch psutil. With a
+    procfs scanner the whole table is read in one pass over /proc, and
+    psutil is only used for processes the scanner could not read.
+
+    Every refresh publishes a new version of the table and notifies the
+    listeners with the records added, removed and changed since the
+    previous one, keyed by (pid, create_time).
+    """
+
+    def __init__(self, scanner=None) -> None:
+        self.scanner = scanner
+        self.entries = {}
+        self.rows = {}
+        self.timestamp = None
+        self.refreshing = threading.Lock()
+        self.update_task = None
+        self.groups = ProcessGroups()
+        self.index = ProcessIndex()
+        self.heavy_hitters = HeavyHitters()
+        self.memory = MemoryDetails(self.procfs_root())
+        self.watch = ProcessWatchList()
+        # (seq, {key: record}) of the last refresh, replaced as one value so
+        # readers never see a seq with the records of another version.
+        self.published = (0, {})
+        self.listeners = []
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    async def notify_listeners(self, delta):
+        for i in list(self.listeners):
+            try:
+                await i(delta)
+            except Exception as e:
+                print(f"Process table listener failed: {e}")
+
+    def track(self, pid):
+        """
+        Starts tracking pid. Its CPU% is known from the next refresh on.
+        """
+        proc = psutil.Process(pid)
+        entry = self.entries[pid] = ProcessEntry(pid, proc.create_time(), proc)
+        entry.update(0)
+        entry.cgroup = read_cgroup(pid, self.procfs_root())
+        return entry
+
+    def procfs_root(self):
+        if self.scanner is not None:
+            return self.scanner.root
+        return psutil.PROCFS_PATH
+
+    def evict(self, alive):
+        """
+        Drops the entries of processes that are no longer in alive.
+        """
+        for pid in self.entries.keys() - alive:
+            del self.entries[pid]
+
+    def refresh(self):
+        """
+        Updates every tracked process, starts tracking new ones and evicts
+        those that exited. Returns the delta against the previous version,
+        or None if a refresh was already running.
+        """
+        if not self.refreshing.acquire(blocking=False):
+            # The previous refresh is still running, skip this tick.
+            return None
+        try:
+            now = time.monotonic()
+            elapsed = now - self.timestamp if self.timestamp is not None else 0
+            if self.scanner is not None:
+                samples = self.scanner.scan()
+            else:
+                samples = dict.fromkeys(psutil.pids())
+            self.evict(samples.keys())
+            rows = {}
+            for pid, sample in samples.items():
+                try:
+                    entry = self.entries.get(pid)
+                    if sample is not None:
+                        if entry is None or entry.create_time != sample.create_time:
+                            entry = ProcessEntry(pid, sample.create_time)
+                            entry.cgroup = read_cgroup(pid, self.scanner.root)
+                            self.entries[pid] = entry
+                        entry.apply(sample, elapsed)
+                    elif entry is None:
+                        entry = self.track(pid)
+                    else:
+                        previous = entry.cpu_time
+                        entry.update(elapsed)
+                        if entry.cpu_time < previous:
+                            # CPU time went backwards: the pid was recycled.
+                            del self.entries[pid]
+                            entry = self.track(pid)
+                    rows[pid] = entry
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    # Exited (or became inaccessible) since pids() was read.
+                    self.entries.pop(pid, None)
+            self.timestamp = now
+            self.rows = rows
+            self.groups.sync(rows)
+            self.heavy_hitters.observe(now, rows.values())
+            self.watch.record(now, rows, self.read_fds)
+            delta = self.publish(rows)
+            self.reindex(delta)
+            return delta
+        finally:
+            self.refreshing.release()
+
+    def publish(self, rows):
+        """
+        Stores the records of rows as the next version of the table and
+        returns what changed since the previous one.
+        """
+        seq, previous = self.published
+        records = {entry.key: Process.format_row(entry) for entry in rows.values()}
+        added = []
+        changed = []
+        for key, record in records.items():
+            old = previous.get(key)
+            if old is None:
+                added.append(record)
+            elif old != record:
+                changed.append(record)
+        removed = [list(key) for key in previous.keys() - records.keys()]
+        self.published = (seq + 1, records)
+        return {
+            "seq": seq + 1,
+            "base": seq,
+            "added": added,
+            "removed": removed,
+            "changed": changed,
+        }
+
+    def ready(self):
+        """
+        Makes sure the table has been filled at least once, waiting for a
+        refresh already in flight instead of reading an empty table.
+        """
+        if self.timestamp is None:
+            with self.refreshing:
+                pass
+            if self.timestamp is None:
+                self.refresh()
+
+    def read_cmdline(self, entry):
+        if self.scanner is not None:
+            return read_cmdline(entry.pid, self.scanner.root)
+        try:
+            return " ".join(entry.proc.cmdline())
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return None
+
+    def read_fds(self, entry):
+        if self.scanner is not None:
+            return count_fds(entry.pid, self.scanner.root)
+        try:
+            return (entry.proc or psutil.Process(entry.pid)).num_fds()
+        except (psutil.NoSuchProcess, psutil.AccessDenied, AttributeError):
+            return None
+
+    def reindex(self, delta):
+        """
+        Updates the search index with the processes that started, exited
+        or changed their name (exec) in delta.
+        """
+        for pid, create_time in delta["removed"]:
+            self.index.remove(pid)
+        for record in delta["added"]:
+            entry = self.rows[record["pid"]]
+            self.index.add(entry.pid, entry.name, self.read_cmdline(entry))
+        for record in delta["changed"]:
+            if record["name"] != self.index.name_of(record["pid"]):
+                entry = self.rows[record["pid"]]
+                self.index.add(entry.pid, entry.name, self.read_cmdline(entry))
+
+    def search(self, name=None, cmdline=None, limit=None, human=False, fields=None):
+        """
+        Returns the processes whose name starts with name and whose command
+        line contains cmdline, ordered by pid. Raises ValueError for an
+        unknown column.
+        """
+        fields = Process.parse_fields(fields)
+        self.ready()
+        rows = self.rows
+        pids = sorted(pid for pid in self.index.search(name, cmdline) if pid in rows)
+        return [
+            Process.format_row(rows[pid], human, fields, self.memory)
+            for pid in pids[:limit]
+        ]
+
+    async def on_snapshot(self, snapshot):
+        if self.refreshing.locked():
+            # The previous refresh is still running, skip this tick.
+            return
+        # Not awaited, a slow scan must not delay the sampler's next tick.
+        self.update_task = asyncio.create_task(self.update())
+
+    async def update(self):
+        """
+        Refreshes the table on an executor thread and notifies the table
+        listeners of the delta.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            delta = await loop.run_in_executor(None, self.refresh)
+            if delta is not None:
+                await self.notify_listeners(delta)
+        except Exception as e:
+            print(f"Process table refresh failed: {e}")
+
+    def list(
+        self,
+        sort=None,
+        order="desc",
+        limit=None,
+        offset=0,
+        name=None,
+        human=False,
+        fields=None,
+    ):
+        """
+        Returns the details of the processes seen by the last refresh,
+        optionally filtered by a case-insensitive name substring, sorted
+        and paginated. With a limit only the top offset + limit entries are
+        selected, without sorting the whole table. fields is a comma
+        separated column list, expensive columns are read only for the
+        returned rows. Raises ValueError for an unknown sort key, order or
+        column.
+        """
+        fields = Process.parse_fields(fields)
+        if sort is not None and sort not in PROCESS_SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        if order not in ("asc", "desc"):
+            raise ValueError(f"Unknown order: {order}")
+        self.ready()
+        entries = list(self.rows.values())
+        if name:
+            name = name.lower()
+            entries = [e for e in entries if e.name and name in e.name.lower()]
+        if sort is not None:
+            key = PROCESS_SORT_KEYS[sort]
+            if limit is not None:
+                select = heapq.nlargest if order == "desc" else heapq.nsmallest
+                entries = select(offset + limit, entries, key=key)
+            else:
+                entries.sort(key=key, reverse=order == "desc")
+        end = offset + limit if limit is not None else None
+        return [
+            Process.format_row(entry, human, fields, self.memory)
+            for entry in entries[offset:end]
+        ]
+
+    def get(self, pid, human=False, fields=None):
+        """
+        Returns the details of pid, or None if no such process exists. A
+        process started since the last refresh reports 0.0 CPU% until the
+        next one. Raises ValueError for an unknown column.
+        """
+        fields = Process.parse_fields(fields)
+        entry = self.rows.get(pid)
+        if entry is None:
+            try:
+                proc = psutil.Process(pid)
+                entry = ProcessEntry(pid, proc.create_time(), proc)
+                entry.update(0)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                return None
+        return Process.format_row(entry, human, fields, self.memory)
+
+
+class KillJob:
+    """
+    A bulk termination: SIGTERM to every pid, SIGKILL to those still
+    running after the grace period. Results are updated as processes exit.
+    """
+
+    def __init__(self, pids, grace, create_times=None) -> None:
+        self.id = uuid.uuid4().hex
+        self.grace = grace
+        self.results = dict.fromkeys(pids, "pending")
+        # pid -> create time the process must still have to be signalled.
+        self.create_times = create_times or {}
+        self.done = False
+        # Set and replaced on every change, see wait.
+        self.event = asyncio.Event()
+
+    def set(self, pid, result):
+        self.results[pid] = result
+        self.notify()
+
+    def finish(self):
+        self.done = True
+        self.notify()
+
+    def notify(self):
+        self.event.set()
+        self.event = asyncio.Event()
+
+    async def wait(self):
+        """
+        Waits for the next change of the job.
+        """
+        if not self.done:
+            await self.event.wait()
+
+    def to_dict(self):
+        return {
+            "job": self.id,
+            "grace": self.grace,
+            "done": self.done,
+            "results": {str(pid): result for pid, result in self.results.items()},
+        }
+
+
+class ProcessKiller:
+    """
+    Runs kill jobs on the event loop. Signals are sent in bulk and the
+    exits of all processes of a job are polled at once from the loop, so
+    neither request handlers nor executor threads wait while processes
+    shut down.
+    """
+
+    def __init__(self, history=100) -> None:
+        self.history = history
+        self.jobs = OrderedDict()
+
+    def start(self, pids, grace=3.0, create_times=None):
+        """
+        Starts terminating pids and returns the job tracking it. Must be
+        called from the event loop. Pids with a create time in create_times,
+        {pid: create_time}, are only signalled if they still belong to that
+        process. Raises ValueError if grace is outside [0, MAX_KILL_GRACE].
+        """
+        if not 0 <= grace <= MAX_KILL_GRACE:
+            raise ValueError(f"grace must be between 0 and {MAX_KILL_GRACE:g} seconds")
+        job = KillJob(list(dict.fromkeys(pids)), grace, create_times)
+        self.jobs[job.id] = job
+        finished = [i for i, j in self.jobs.items() if j.done]
+        for i in finished[: max(0, len(self.jobs) - self.history)]:
+            del self.jobs[i]
+        asyncio.get_running_loop().create_task(self.run(job))
+        return job
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
 
     @staticmethod
-    def kill_process(pid):
+    def signal(procs, send):
+        """
+        Sends a signal to every process, returning those it was sent to and
+        {pid: result} for those it could not be sent to.
+        """
+        sent = []
+        failed = {}
+        for proc in procs:
+            try:
+                send(proc)
+                sent.append(proc)
+            except psutil.NoSuchProcess:
+                failed[proc.pid] = "terminated"
+            except psutil.AccessDenied:
+                failed[proc.pid] = "access_denied"
+        return sent, failed
+
+    @staticmethod
+    def resolve(pids, create_times=None):
+        """
+        Returns the processes of pids and {pid: result} for those that will
+        not be signalled. A pid whose create time differs from the one in
+        create_times has been recycled since and is refused.
+        """
+        create_times = create_times or {}
+        procs = []
+        failed = {}
+        for pid in pids:
+            if pid == os.getpid():
+                failed[pid] = "refused"
+                continue
+            try:
+                proc = psutil.Process(pid)
+                expected = create_times.get(pid)
+                if expected is not None and abs(proc.create_time() - expected) > 0.01:
+                    failed[pid] = "recycled"
+                    continue
+                procs.append(proc)
+            except psutil.NoSuchProcess:
+                failed[pid] = "not_found"
+            except psutil.AccessDenied:
+                failed[pid] = "access_denied"
+        return procs, failed
+
+    @staticmethod
+    async def wait(procs, timeout, callback):
+        """
+        Checks procs every KILL_POLL_INTERVAL until they all exited or
+        timeout seconds passed. Returns (gone, alive) like psutil.wait_procs.
+        """
+        deadline = time.monotonic() + timeout
+        gone = []
+        alive = list(procs)
+        while True:
+            exited, alive = psutil.wait_procs(alive, 0, callback)
+            gone.extend(exited)
+            if not alive or time.monotonic() >= deadline:
+                return gone, alive
+            await asyncio.sleep(KILL_POLL_INTERVAL)
+
+    async def run(self, job):
+        loop = asyncio.get_running_loop()
+
+        def exited(result):
+            return lambda proc: job.set(proc.pid, result)
+
+        def terminate():
+            procs, failed = self.resolve(job.results, job.create_times)
+            procs, more = self.signal(procs, psutil.Process.terminate)
+            failed.update(more)
+            return procs, failed
+
         try:
-            process = psutil.Process(pid)
-            process.terminate()
-            process.wait(timeout=3)
-            return "Process terminated"
-        except psutil.NoSuchProcess:
-            return "No process found"
-        except psutil.TimeoutExpired:
-            return f"Process {pid} could not be terminated within the timeout."
+            procs, failed = await loop.run_in_executor(None, terminate)
+            for pid, result in failed.items():
+                job.set(pid, result)
+            for proc in procs:
+                job.set(proc.pid, "terminating")
+            gone, alive = await self.wait(procs, job.grace, exited("terminated"))
+            if alive:
+                alive, failed = self.signal(alive, psutil.Process.kill)
+                for pid, result in failed.items():
+                    job.set(pid, result)
+                for proc in alive:
+                    job.set(proc.pid, "killing")
+                gone, alive = await self.wait(alive, KILL_TIMEOUT, exited("killed"))
+                for proc in alive:
+                    job.set(proc.pid, "running")
         except Exception as e:
-            return f"Error terminating process {pid}: {e}"
+            print(f"Kill job {job.id} failed: {e}")
+        finally:
+            job.finish()
 
 
 def main():
-    all_processes = Process.list_all_processes()
-    for process in all_processes:
+    table = ProcessTable(ProcfsScanner() if ProcfsScanner.available() else None)
+    table.refresh()
+    time.sleep(1)
+    table.refresh()
+    for process in table.list(human=True):
         print(
             f"PID: {process['pid']}, Name: {process['name']}, Status: {process['status']}, "
             f"CPU: {process['cpu_usage']}%, Memory: {process['memory_usage']}, "
             f"Started: {process['start_time']}"
         )
 
-    process = Process.get_process_info(1)
+    process = table.get(1, human=True)
     print(
         f"PID: {process['pid']}, Name: {process['name']}, Status: {process['status']}, "
         f"CPU: {process['cpu_usage']}%, Memory: {process['memory_usage']}, "
@@ -0,0 +1,149 @@
+import threading
+
+# Length of the cmdline n-grams. Shorter queries fall back to a scan.
+NGRAM = 3
+
+
+class NameTrie:
+    """
+    Prefix trie over lowercased process names. Every node keeps the pids
+    of all names below it, so a prefix lookup is one walk down the trie.
+    """
+
+    def __init__(self) -> None:
+        self.root = ({}, set())
+
+    def add(self, pid, name):
+        children, pids = self.root
+        pids.add(pid)
+        for char in name.lower():
+            node = children.get(char)
+            if node is None:
+                node = children[char] = ({}, set())
+            children, pids = node
+            pids.add(pid)
+
+    def remove(self, pid, name):
+        path = [self.root]
+        for char in name.lower():
+            node = path[-1][0].get(char)
+            if node is None:
+                break
+            path.append(node)
+        for node in path:
+            node[1].discard(pid)
+        # Prune the nodes no name passes through anymore.
+        chars = name.lower()[:len(path) - 1]
+        for parent, char in zip(reversed(path[:-1]), reversed(chars)):
+            child = parent[0].get(char)
+            if child is not None and not child[1]:
+                del parent[0][char]
+
+    def find(self, prefix):
+        children, pids = self.root
+        for char in prefix.lower():
+            node = children.get(char)
+            if node is None:
+                return set()
+            children, pids = node
+        return pids
+
+
+class NgramIndex:
+    """
+    Substring index over lowercased command lines: every n-gram maps to
+    the pids whose command line contains it. Candidates from the n-grams
+    of a query are verified against the command line itself.
+    """
+
+    def __init__(self) -> None:
+        self.grams = {}
+        self.texts = {}
+
+    @staticmethod
+    def ngrams(text):
+        return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+    def add(self, pid, text):
+        text = text.lower()
+        self.texts[pid] = text
+        for gram in self.ngrams(text):
+            self.grams.setdefault(gram, set()).add(pid)
+
+    def remove(self, pid):
+        text = self.texts.pop(pid, None)
+        if text is None:
+            return
+        for gram in self.ngrams(text):
+            pids = self.grams[gram]
+            pids.discard(pid)
+            if not pids:
+                del self.grams[gram]
+
+    def find(self, query):
+        query = query.lower()
+        if len(query) < NGRAM:
+            return {pid for pid, text in self.texts.items() if query in text}
+        candidates = sorted(
+            (self.grams.get(gram, set()) for gram in self.ngrams(query)), key=len
+        )
+        pids = set(candidates[0])
+        for other in candidates[1:]:
+            pids &= other
+            if not pids:
+                break
+        return {pid for pid in pids if query in self.texts[pid]}
+
+
+class ProcessIndex:
+    """
+    Search index over the process table: a name prefix trie and a cmdline
+    n-gram index. It is only touched when processes start, exit or exec
+    into another program, never for the counters that change every tick.
+    """
+
+    def __init__(self) -> None:
+        self.names = NameTrie()
+        self.cmdlines = NgramIndex()
+        # pid -> name it is indexed under
+        self.indexed = {}
+        self.lock = threading.Lock()
+
+    def add(self, pid, name, cmdline):
+        with self.lock:
+            if pid in self.indexed:
+                self.discard(pid)
+            self.indexed[pid] = name or ""
+            self.names.add(pid, name or "")
+            if cmdline:
+                self.cmdlines.add(pid, cmdline)
+
+    def remove(self, pid):
+        with self.lock:
+            self.discard(pid)
+
+    def discard(self, pid):
+        name = self.indexed.pop(pid, None)
+        if name is not None:
+            self.names.remove(pid, name)
+            self.cmdlines.remove(pid)
+
+    def name_of(self, pid):
+        return self.indexed.get(pid)
+
+    def search(self, name=None, cmdline=None):
+        """
+        Returns the pids whose name starts with name and whose command line
+        contains cmdline, both case-insensitive. Criteria left out match
+        every process.
+        """
+        with self.lock:
+            pids = None
+            if name:
+                pids = set(self.names.find(name))
+            if cmdline:
+                found = self.cmdlines.find(cmdline)
+                pids = found if pids is None else pids & found
+            if pids is None:
+                pids = set(self.indexed)
+            return pids
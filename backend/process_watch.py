@@ -0,0 +1,186 @@
+import math
+import re
+import threading
+import time
+from fnmatch import translate
+from .timeseries import RingBuffer
+
+# Series recorded for every watched process.
+WATCH_METRICS = ("cpu_usage", "rss", "num_fds", "io_bytes")
+
+
+class ProcessHistory:
+    """
+    Ring buffers of the WATCH_METRICS of one process, identified by
+    (pid, create_time).
+    """
+
+    def __init__(self, entry, capacity) -> None:
+        self.pid = entry.pid
+        self.create_time = entry.create_time
+        self.name = entry.name
+        self.exited = False
+        self.buffers = {metric: RingBuffer(capacity) for metric in WATCH_METRICS}
+
+    def record(self, timestamp, values):
+        for metric, buffer in self.buffers.items():
+            value = values.get(metric)
+            buffer.append(timestamp, math.nan if value is None else value)
+
+    def query(self, since=None, until=None):
+        """
+        Returns the samples with since <= t <= until. Unreadable samples are
+        None.
+        """
+        result = {
+            "pid": self.pid,
+            "name": self.name,
+            "start_time": self.create_time,
+            "exited": self.exited,
+        }
+        for metric, buffer in self.buffers.items():
+            timestamps, values = buffer.query(since, until)
+            result["timestamps"] = timestamps.tolist()
+            result[metric] = [None if math.isnan(v) else v for v in values.tolist()]
+        return result
+
+
+class ProcessWatchList:
+    """
+    Processes pinned by pid or by a name glob, whose CPU%, RSS, fd count
+    and cumulative I/O bytes are recorded on every process table refresh.
+
+    At most limit processes have a history at a time, which bounds the
+    memory used. When full, the history of an exited process is given up
+    for a new one; if none has exited new matches are not recorded.
+
+    Like TimeSeriesStore, samples are recorded against monotonic
+    timestamps and history() takes and returns epoch seconds.
+    """
+
+    def __init__(self, limit=32, capacity=1800) -> None:
+        self.limit = limit
+        self.capacity = capacity
+        self.pids = set()
+        self.patterns = {}
+        # (pid, create_time) -> ProcessHistory
+        self.histories = {}
+        # Samples of matching processes not recorded because the list was full.
+        self.dropped = 0
+        self.lock = threading.Lock()
+        self.clock_offset = time.time() - time.monotonic()
+
+    def watch(self, pid=None, pattern=None):
+        with self.lock:
+            if pid is not None:
+                self.pids.add(pid)
+            if pattern is not None:
+                self.patterns[pattern] = re.compile(translate(pattern))
+
+    def unwatch(self, pid=None, pattern=None):
+        """
+        Removes a pin and the histories no other pin still covers.
+        """
+        with self.lock:
+            if pid is not None:
+                self.pids.discard(pid)
+            if pattern is not None:
+                self.patterns.pop(pattern, None)
+            for key, history in list(self.histories.items()):
+                if not self.matches(history.pid, history.name):
+                    del self.histories[key]
+
+    def matches(self, pid, name):
+        if pid in self.pids:
+            return True
+        return name is not None and any(
+            regex.match(name) for regex in self.patterns.values()
+        )
+
+    def watched(self, rows):
+        """
+        Returns the entries of rows, {pid: entry}, that should be recorded.
+        """
+        if not self.patterns:
+            return [rows[pid] for pid in self.pids if pid in rows]
+        return [e for e in rows.values() if self.matches(e.pid, e.name)]
+
+    def make_room(self):
+        if len(self.histories) < self.limit:
+            return True
+        for key, history in self.histories.items():
+            if history.exited:
+                del self.histories[key]
+                return True
+        return False
+
+    def record(self, timestamp, rows, read_fds):
+        """
+        Appends one sample, taken at the monotonic time timestamp, for every
+        watched process in rows. read_fds(entry) returns the fd count of a
+        process or None.
+        """
+        with self.lock:
+            if not self.pids and not self.patterns:
+                return
+            for key, history in self.histories.items():
+                entry = rows.get(history.pid)
+                history.exited = entry is None or entry.key != key
+            for entry in self.watched(rows):
+                key = entry.key
+                history = self.histories.get(key)
+                if history is None:
+                    if not self.make_room():
+                        self.dropped += 1
+                        continue
+                    history = self.histories[key] = ProcessHistory(
+                        entry, self.capacity
+                    )
+                history.name = entry.name
+                history.record(
+                    timestamp,
+                    {
+                        "cpu_usage": entry.cpu_usage,
+                        "rss": entry.rss,
+                        "num_fds": read_fds(entry),
+                        "io_bytes": entry.io,
+                    },
+                )
+
+    def history(self, pid, since=None, until=None):
+        """
+        Returns the recorded samples of pid between two epoch timestamps,
+        preferring the running process over an exited one that had the same
+        pid. None if pid has none.
+        """
+        if since is not None:
+            since -= self.clock_offset
+        if until is not None:
+            until -= self.clock_offset
+        with self.lock:
+            found = [h for h in self.histories.values() if h.pid == pid]
+            if not found:
+                return None
+            found.sort(key=lambda h: (not h.exited, h.create_time))
+            result = found[-1].query(since, until)
+        result["timestamps"] = [t + self.clock_offset for t in result["timestamps"]]
+        return result
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                "pids": sorted(self.pids),
+                "patterns": sorted(self.patterns),
+                "limit": self.limit,
+                "dropped": self.dropped,
+                "processes": [
+                    {
+                        "pid": h.pid,
+                        "name": h.name,
+                        "start_time": h.create_time,
+                        "exited": h.exited,
+                        "samples": len(h.buffers["cpu_usage"]),
+                    }
+                    for h in self.histories.values()
+                ],
+            }
@@ -0,0 +1,223 @@
+import os
+from collections import namedtuple
+
+# Process states of /proc/<pid>/stat, named like psutil does.
+PROC_STATUSES = {
+    "R": "running",
+    "S": "sleeping",
+    "D": "disk-sleep",
+    "T": "stopped",
+    "t": "tracing-stop",
+    "Z": "zombie",
+    "X": "dead",
+    "x": "dead",
+    "K": "wake-kill",
+    "W": "waking",
+    "I": "idle",
+    "P": "parked",
+}
+# The kernel truncates comm to this many characters.
+TASK_COMM_LEN = 15
+
+ProcSample = namedtuple(
+    "ProcSample",
+    [
+        "pid",
+        "name",
+        "status",
+        "cpu_time",
+        "rss",
+        "create_time",
+        "ppid",
+        "num_threads",
+        "uid",
+        "io",
+    ],
+)
+
+
+def read_cgroup(pid, root="/proc"):
+    """
+    Returns the cgroup path of pid: the unified (v2) hierarchy if mounted,
+    otherwise the first v1 hierarchy. None if it cannot be read.
+    """
+    try:
+        with open(f"{root}/{pid}/cgroup") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    paths = [line.split(":", 2) for line in lines if line.count(":") >= 2]
+    for hierarchy, controllers, path in paths:
+        if hierarchy == "0" and not controllers:
+            return path
+    return paths[0][2] if paths else None
+
+
+def read_cmdline(pid, root="/proc"):
+    """
+    Returns the command line of pid with its arguments joined by spaces,
+    empty for kernel threads. None if it cannot be read.
+    """
+    try:
+        with open(f"{root}/{pid}/cmdline", "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    return os.fsdecode(data.rstrip(b"\0").replace(b"\0", b" "))
+
+
+def count_fds(pid, root="/proc"):
+    """
+    Returns the number of open file descriptors of pid, None if they cannot
+    be listed.
+    """
+    try:
+        return len(os.listdir(f"{root}/{pid}/fd"))
+    except OSError:
+        return None
+
+
+def read_smaps_rollup(pid, root="/proc"):
+    """
+    Returns the USS, PSS and swap of pid in bytes from smaps_rollup.
+    Raises OSError if it cannot be read.
+    """
+    values = {}
+    with open(f"{root}/{pid}/smaps_rollup", "rb") as f:
+        for line in f:
+            key, _, rest = line.partition(b":")
+            if rest.endswith(b"kB\n"):
+                values[key] = int(rest.split()[0]) * 1024
+    return {
+        "uss": values.get(b"Private_Clean", 0)
+        + values.get(b"Private_Dirty", 0)
+        + values.get(b"Private_Hugetlb", 0),
+        "pss": values.get(b"Pss", 0),
+        "swap": values.get(b"Swap", 0),
+    }
+
+
+class ProcfsScanner:
+    """
+    Reads the process table straight from procfs: one scandir of the root,
+    then stat and statm of every pid read into a single reusable buffer and
+    parsed for just the fields the process table needs.
+    """
+
+    def __init__(self, root="/proc", io=True) -> None:
+        self.root = root
+        self.io = io
+        self.buffer = bytearray(4096)
+        self.clock_ticks = os.sysconf("SC_CLK_TCK")
+        self.page_size = os.sysconf("SC_PAGE_SIZE")
+        self.boot_time = self.read_boot_time()
+        # Untruncated names of processes whose comm hit TASK_COMM_LEN,
+        # keyed by (pid, start time) so cmdline is read once per process.
+        self.names = {}
+
+    @staticmethod
+    def available(root="/proc"):
+        return os.path.isfile(os.path.join(root, "stat"))
+
+    def read_boot_time(self):
+        with open(os.path.join(self.root, "stat"), "rb") as f:
+            for line in f:
+                if line.startswith(b"btime"):
+                    return float(line.split()[1])
+        raise ValueError("btime missing from stat")
+
+    def readinto(self, path):
+        """
+        Reads a small procfs file into the shared buffer and returns its
+        length.
+        """
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            return os.readv(fd, [self.buffer])
+        finally:
+            os.close(fd)
+
+    def long_name(self, pid, comm, start):
+        """
+        Returns the name psutil would report for a truncated comm: the
+        executable name from cmdline if it extends comm.
+        """
+        key = (pid, start)
+        name = self.names.get(key)
+        if name is None:
+            name = comm
+            try:
+                with open(f"{self.root}/{pid}/cmdline", "rb") as f:
+                    exe = os.path.basename(os.fsdecode(f.read().split(b"\0")[0]))
+                if exe.startswith(comm):
+                    name = exe
+            except OSError:
+                pass
+            self.names[key] = name
+        return name
+
+    def read_process(self, pid):
+        """
+        Reads one ProcSample from stat, statm and io, and the owner from the
+        ownership of the pid directory.
+        """
+        base = f"{self.root}/{pid}/"
+        buf = self.buffer
+        size = self.readinto(base + "stat")
+        # comm may contain spaces and parentheses, it ends at the last ')'.
+        close = buf.rfind(b")", 0, size)
+        open_ = buf.find(b"(", 0, close) + 1
+        comm = os.fsdecode(bytes(buf[open_:close]))
+        fields = buf[close + 2:size].split(None, 20)
+        status = PROC_STATUSES.get(chr(fields[0][0]), "?")
+        cpu_time = (int(fields[11]) + int(fields[12])) / self.clock_ticks
+        start = int(fields[19])
+        create_time = start / self.clock_ticks + self.boot_time
+        ppid = int(fields[1])
+        num_threads = int(fields[17])
+        size = self.readinto(base + "statm")
+        rss = int(buf[:size].split(None, 2)[1]) * self.page_size
+        uid = os.stat(base).st_uid
+        io = self.read_io(base) if self.io else None
+        if len(comm) >= TASK_COMM_LEN:
+            comm = self.long_name(pid, comm, start)
+        return ProcSample(
+            pid, comm, status, cpu_time, rss, create_time, ppid, num_threads, uid, io
+        )
+
+    def read_io(self, base):
+        """
+        Returns the bytes read and written from storage so far, or None if
+        the io file is not accessible (other users' processes unless root).
+        """
+        try:
+            size = self.readinto(base + "io")
+        except PermissionError:
+            return None
+        total = 0
+        for line in self.buffer[:size].splitlines():
+            if line.startswith((b"read_bytes", b"write_bytes")):
+                total += int(line.split()[1])
+        return total
+
+    def scan(self):
+        """
+        Returns {pid: ProcSample} for every process under the root. Processes
+        that exited during the scan are left out, those that could not be
+        read map to None so the caller can fall back to psutil.
+        """
+        samples = {}
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if not entry.name.isdigit():
+                    continue
+                pid = int(entry.name)
+                try:
+                    samples[pid] = self.read_process(pid)
+                except (FileNotFoundError, ProcessLookupError):
+                    continue
+                except (OSError, ValueError, IndexError):
+                    samples[pid] = None
+        if self.names:
+            self.names = {k: v for k, v in self.names.items() if k[0] in samples}
+        return samples
@@ -0,0 +1,133 @@
+import threading
+from collections import OrderedDict
+
+
+class Projection:
+    """
+    A validated list of dotted snapshot fields, compiled to key paths so
+    applying it to a snapshot is just a series of lookups.
+    """
+
+    def __init__(self, fields, paths) -> None:
+        self.fields = fields
+        self.paths = paths
+
+    def apply(self, snapshot):
+        """
+        Returns {field: value} for every field of the projection. Fields that
+        disappeared since compilation resolve to None.
+        """
+        values = {}
+        for field, path in zip(self.fields, self.paths):
+            value = snapshot.data
+            try:
+                for key in path:
+                    value = value[key]
+            except (KeyError, IndexError, TypeError):
+                value = None
+            values[field] = value
+        return values
+
+
+def compile_path(data, field):
+    """
+    Resolves a dotted field against snapshot data once and returns the key
+    path, with list indices already converted to ints. Raises KeyError when
+    the field does not exist.
+    """
+    path = []
+    value = data
+    for key in field.split("."):
+        if isinstance(value, dict) and key in value:
+            path.append(key)
+            value = value[key]
+        elif isinstance(value, (list, tuple)) and key.isdigit() and int(key) < len(value):
+            path.append(int(key))
+            value = value[int(key)]
+        else:
+            raise KeyError(field)
+    return tuple(path)
+
+
+def merge_schema(schema, data):
+    """
+    Returns schema with every path of data added. Sections and keys that
+    are None in data, because the sampler could not read them, keep the
+    value they had before.
+    """
+    if data is None:
+        return schema
+    if not isinstance(data, dict):
+        return data
+    merged = dict(schema) if isinstance(schema, dict) else {}
+    for key, value in data.items():
+        merged[key] = merge_schema(merged.get(key), value)
+    return merged
+
+
+class ProjectionCache:
+    """
+    Compiled projections keyed by their field list, so each distinct
+    projection is parsed and validated only once.
+
+    Fields are validated against every path seen in earlier snapshots, so
+    a field whose section failed to read on the current tick is still known
+    and resolves to None.
+    """
+
+    def __init__(self, size=256) -> None:
+        self.size = size
+        self.projections = OrderedDict()
+        self.lock = threading.Lock()
+        # Union of the snapshot data seen so far, replaced as one value.
+        self.schema = {}
+
+    def learn(self, snapshot):
+        """
+        Adds the paths of snapshot to the known fields.
+        """
+        self.schema = merge_schema(self.schema, snapshot.data)
+
+    async def on_snapshot(self, snapshot):
+        self.learn(snapshot)
+
+    @staticmethod
+    def parse(fields):
+        """
+        Splits a comma separated field list, dropping blanks and duplicates.
+        """
+        parsed = []
+        for field in fields.split(","):
+            field = field.strip()
+            if field and field not in parsed:
+                parsed.append(field)
+        return tuple(parsed)
+
+    def get(self, fields, snapshot):
+        """
+        Returns the compiled projection for a field list, validating it
+        against the known fields and snapshot on first use. Raises
+        ValueError for unknown fields.
+        """
+        key = self.parse(fields)
+        with self.lock:
+            projection = self.projections.get(key)
+            if projection is not None:
+                self.projections.move_to_end(key)
+                return projection
+        schema = merge_schema(self.schema, snapshot.data)
+        paths = []
+        unknown = []
+        for field in key:
+            try:
+                paths.append(compile_path(schema, field))
+            except KeyError:
+                unknown.append(field)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        projection = Projection(key, tuple(paths))
+        with self.lock:
+            self.projections[key] = projection
+            if len(self.projections) > self.size:
+                self.projections.popitem(last=False)
+        return projection
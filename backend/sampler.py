@@ -0,0 +1,329 @@
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from .cpu_handler import CPU
+from .mem_handler import Memory
+from .disk_handler import Disk
+from .network_handler import Network
+from .pressure_handler import Pressure
+from .sensors import SensorCollector
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    Every reading gathered during one sampler tick.
+
+    Snapshots are published whole and never modified afterwards, so readers
+    can share them across threads without locking.
+    """
+
+    seq: int
+    timestamp: float
+    time: float
+    data: dict
+
+    def get(self, path):
+        """
+        Resolves a dotted path such as "cpu.usage" against the snapshot data.
+        """
+        value = self.data
+        for key in path.split("."):
+            if isinstance(value, dict):
+                value = value[key]
+            elif isinstance(value, (list, tuple)):
+                value = value[int(key)]
+            else:
+                raise KeyError(path)
+        return value
+
+    def reading(self, path):
+        """
+        Returns the reading at path, None if the sampler could not take it
+        or the path does not exist.
+        """
+        try:
+            return self.get(path)
+        except (KeyError, IndexError, ValueError):
+            return None
+
+    def metrics(self):
+        """
+        Returns every numeric reading of the snapshot keyed by dotted path.
+        Per-core lists are left out.
+        """
+        metrics = {}
+        stack = [("", self.data)]
+        while stack:
+            prefix, values = stack.pop()
+            for key, value in values.items():
+                path = prefix + key
+                if isinstance(value, dict):
+                    stack.append((path + ".", value))
+                elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                    metrics[path] = float(value)
+        return metrics
+
+
+class Sampler:
+    def __init__(self, interval=1.0, host_info=None, sensors=None) -> None:
+        self.interval = interval
+        self.host_info = host_info
+        self.sensors = sensors
+        self.seq = 0
+        self.snapshot = None
+        self.task = None
+        self.listeners = []
+        self.lock = threading.Lock()
+        # Set and replaced after every background tick, see wait_for.
+        self.tick_event = None
+        # Last good value of every section, served while a reading fails,
+        # and the sections currently failing so each failure prints once.
+        self.last = {}
+        self.failing = set()
+        # Rates are computed against the counters of the previous tick, the
+        # first tick compares against the ones read here.
+        self.counters = self.read_counters()
+        self.counters_timestamp = time.monotonic()
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    async def notify_listeners(self, snapshot):
+        for i in list(self.listeners):
+            try:
+                await i(snapshot)
+            except Exception as e:
+                # One broken subscriber must not stop the sampler.
+                print(f"Sampler listener failed: {e}")
+
+    def read(self, section, reader, *args, keep_last=True):
+        """
+        Returns reader(*args). If it raises, only this section is lost: the
+        last good value is returned instead, or None without one or when
+        keep_last is False.
+        """
+        try:
+            value = reader(*args)
+        except Exception as e:
+            if section not in self.failing:
+                self.failing.add(section)
+                print(f"Sampler could not read {section}: {e}")
+            return self.last.get(section) if keep_last else None
+        self.failing.discard(section)
+        if keep_last:
+            self.last[section] = value
+        return value
+
+    def rate(self, section, compute, previous, current, *args):
+        """
+        Computes a rate from two counter readings, None if either is
+        missing.
+        """
+        if previous is None or current is None:
+            return None
+        return self.read(section, compute, previous, current, *args, keep_last=False)
+
+    def read_counters(self):
+        """
+        Reads the cumulative counters that rates are derived from. A counter
+        that cannot be read is None, never a stale value, so no rate is
+        derived from it.
+        """
+        cpu_times = self.read("cpu times", CPU.get_per_cpu_times, keep_last=False)
+        cpu_times, cpu_fields = cpu_times if cpu_times is not None else (None, None)
+        return {
+            "cpu_times": cpu_times,
+            "cpu_fields": cpu_fields,
+            "disk_io": self.read("disk io", Disk.get_disk_io_counters, keep_last=False),
+            "net_io": self.read("net io", Network.get_bandwidth_usage, keep_last=False),
+            "vmstat": self.read("vmstat", Pressure.get_vmstat_counters, keep_last=False),
+        }
+
+    def collect(self):
+        """
+        Gathers every CPU, memory, disk, network, pressure stall and, when a
+        collector is given, sensor reading without blocking.
+
+        Usage, throughput, disk active time and vmstat rates are computed
+        from the delta against the counters cached by the previous tick.
+        Every section is read on its own, so one failing reading never keeps
+        the others from being published.
+        """
+        counters = self.read_counters()
+        now = time.monotonic()
+        previous = self.counters
+        elapsed = now - self.counters_timestamp
+        self.counters = counters
+        self.counters_timestamp = now
+        cpu_times = counters["cpu_times"]
+        if cpu_times is not None:
+            # Without a previous reading this is the zero baseline.
+            stats = self.read(
+                "cpu",
+                CPU.compute_cpu_stats,
+                previous["cpu_times"],
+                cpu_times,
+                counters["cpu_fields"],
+            )
+            times = dict(zip(counters["cpu_fields"], cpu_times.sum(axis=0).tolist()))
+        else:
+            stats = self.last.get("cpu")
+            times = None
+        if self.host_info is not None:
+            cpu_count = self.read("cpu count", self.host_info.cpu_count.get)
+        else:
+            cpu_count = self.read("cpu count", CPU.get_cpu_count)
+        sensors = None
+        if self.sensors is not None:
+            sensors = self.read("sensors", self.sensors.read)
+        if sensors is not None:
+            temperature = SensorCollector.cpu_temperature(sensors)
+        else:
+            temperature = self.read("temperature", CPU.get_cpu_temperature)
+        # Copied, the stats are kept as the last good value of their section.
+        cpu = dict(stats or {})
+        cpu.update(
+            {
+                "frequency": self.read("cpu frequency", CPU.get_cpu_frequency),
+                "count": cpu_count,
+                "load_average": self.read("load average", CPU.get_load_average),
+                "temperature": temperature,
+                "times": times,
+                "uptime": self.read("uptime", CPU.get_uptime),
+            }
+        )
+        data = {
+            "cpu": cpu,
+            "memory": self.read("memory", Memory.get_virtual_memory),
+            "swap": self.read("swap", Memory.get_swap_memory),
+            "disk": {
+                "usage": self.read("disk usage", Disk.get_disk_usage, "/"),
+                "io_counters": counters["disk_io"],
+                "active_time": self.rate(
+                    "disk active time",
+                    Disk.compute_active_time_percentage,
+                    previous["disk_io"],
+                    counters["disk_io"],
+                    elapsed,
+                ),
+            },
+            "net": dict(
+                counters["net_io"] or {},
+                throughput=self.rate(
+                    "net throughput",
+                    Network.compute_throughput,
+                    previous["net_io"],
+                    counters["net_io"],
+                    elapsed,
+                ),
+            ),
+        }
+        pressure = self.read("pressure", Pressure.get_pressure)
+        if pressure is not None:
+            data["pressure"] = pressure
+        data["vmstat"] = self.rate(
+            "vmstat rates",
+            Pressure.compute_vmstat_rates,
+            previous["vmstat"],
+            counters["vmstat"],
+            elapsed,
+        )
+        if sensors is not None:
+            data["sensors"] = sensors
+        return data
+
+    def tick(self):
+        """
+        Collects one set of readings and publishes it as the current snapshot.
+        """
+        with self.lock:
+            data = self.collect()
+            self.seq += 1
+            snapshot = Snapshot(
+                seq=self.seq, timestamp=time.monotonic(), time=time.time(), data=data
+            )
+            self.snapshot = snapshot
+        return snapshot
+
+    def current(self):
+        """
+        Returns the latest snapshot, taking a first one if none exists yet.
+        """
+        snapshot = self.snapshot
+        if snapshot is None:
+            snapshot = self.tick()
+        return snapshot
+
+    async def wait_for(self, seq, timeout):
+        """
+        Waits until a snapshot newer than seq has been published or timeout
+        seconds have passed, then returns the latest snapshot. A seq past the
+        latest snapshot was handed out before a restart and returns at once.
+        """
+        if seq > self.seq:
+            return self.current()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self.seq <= seq:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            if self.tick_event is None:
+                self.tick_event = asyncio.Event()
+            try:
+                await asyncio.wait_for(self.tick_event.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        return self.current()
+
+    def wake_waiters(self):
+        if self.tick_event is not None:
+            self.tick_event.set()
+            self.tick_event = None
+
+    async def event_loop(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            # Collection touches procfs/sysfs, keep it off the event loop.
+            try:
+                snapshot = await loop.run_in_executor(None, self.tick)
+            except Exception as e:
+                print(f"Sampler tick failed: {e}")
+            else:
+                self.wake_waiters()
+                await self.notify_listeners(snapshot)
+            next_tick += self.interval
+            delay = next_tick - loop.time()
+            if delay < 0:
+                # Fell behind, skip the missed ticks instead of bursting.
+                next_tick = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    def start(self):
+        self.stop()
+        self.task = asyncio.create_task(self.event_loop())
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+
+
+def main():
+    sampler = Sampler()
+    time.sleep(1)
+    snapshot = sampler.tick()
+    print(f"Snapshot #{snapshot.seq}:")
+    for section, values in snapshot.data.items():
+        print(f"{section}: {values}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+import errno
+import os
+import re
+import threading
+from .host_info import SignatureWatcher
+
+# hwmon drivers of CPU packages. coretemp labels its inputs "Package id N"
+# (older kernels "Physical id N") and "Core N", k10temp reports one package
+# temperature per chip.
+CPU_CHIPS = ("coretemp", "k10temp", "zenpower")
+PACKAGE_LABELS = ("Tctl", "Tdie")
+PACKAGE_LABEL = re.compile(r"(?:Package|Physical) id (\d+)")
+CORE_LABEL = re.compile(r"Core (\d+)")
+TEMP_INPUT = re.compile(r"temp(\d+)_input")
+# Read errors meaning the device behind a sensor is gone. Others, such as
+# ENODATA from an unpopulated input, just leave that reading out.
+GONE = (errno.ENODEV, errno.ENXIO, errno.ENOENT)
+
+
+def read_text(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+class Sensor:
+    """
+    One sysfs value kept open for the lifetime of a discovery. scale
+    converts the raw reading, millidegrees for temperatures.
+    """
+
+    def __init__(self, path, scale=1, kind=None) -> None:
+        self.path = path
+        self.scale = scale
+        self.kind = kind
+        self.fd = os.open(path, os.O_RDONLY)
+
+    def close(self):
+        os.close(self.fd)
+
+
+class SensorCollector:
+    """
+    Reads every thermal zone, hwmon temperature input and thermal throttle
+    counter. The sensors are discovered once and their files kept open;
+    every read() is one pread of each into a shared buffer. Discovery is
+    run again only when the set of hwmon chips, thermal zones or online
+    CPUs changes, or when a sensor stops answering.
+    """
+
+    def __init__(self, root="/sys") -> None:
+        self.root = root
+        self.buffer = bytearray(64)
+        self.lock = threading.Lock()
+        self.devices = SignatureWatcher(self.signature)
+        self.generation = None
+        self.stale = False
+        self.zones = {}
+        self.packages = {}
+        self.cores = {}
+        self.chips = {}
+        self.core_throttle = {}
+        self.package_throttle = {}
+        # Throttle totals of the previous read, to report the new events.
+        self.throttle_counts = None
+
+    def signature(self):
+        return (
+            sorted(os.listdir(f"{self.root}/class/hwmon"))
+            if os.path.isdir(f"{self.root}/class/hwmon")
+            else None,
+            sorted(os.listdir(f"{self.root}/class/thermal"))
+            if os.path.isdir(f"{self.root}/class/thermal")
+            else None,
+            read_text(f"{self.root}/devices/system/cpu/online"),
+        )
+
+    def sensors(self):
+        yield from self.zones.values()
+        yield from self.packages.values()
+        for cores in self.cores.values():
+            yield from cores.values()
+        for chip in self.chips.values():
+            yield from chip["inputs"].values()
+        yield from self.core_throttle.values()
+        yield from self.package_throttle.values()
+
+    def close(self):
+        for sensor in self.sensors():
+            sensor.close()
+        self.zones = {}
+        self.packages = {}
+        self.cores = {}
+        self.chips = {}
+        self.core_throttle = {}
+        self.package_throttle = {}
+
+    @staticmethod
+    def open(sensors, key, path, scale=1, kind=None):
+        try:
+            sensors[key] = Sensor(path, scale, kind)
+        except OSError:
+            pass
+
+    def discover(self):
+        """
+        Opens every sensor under the root, closing the previous ones.
+        """
+        self.close()
+        thermal = f"{self.root}/class/thermal"
+        if os.path.isdir(thermal):
+            for name in sorted(os.listdir(thermal), key=self.natural_key):
+                if name.startswith("thermal_zone"):
+                    kind = read_text(f"{thermal}/{name}/type")
+                    self.open(self.zones, name, f"{thermal}/{name}/temp", 1000, kind)
+        hwmon = f"{self.root}/class/hwmon"
+        if os.path.isdir(hwmon):
+            for name in sorted(os.listdir(hwmon), key=self.natural_key):
+                self.discover_chip(f"{hwmon}/{name}", name)
+        self.discover_throttle()
+        self.throttle_counts = None
+        self.stale = False
+
+    @staticmethod
+    def natural_key(name):
+        return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
+
+    def discover_chip(self, path, name):
+        chip = read_text(f"{path}/name") or name
+        inputs = {}
+        labels = {}
+        for entry in os.listdir(path):
+            match = TEMP_INPUT.fullmatch(entry)
+            if match:
+                label = read_text(f"{path}/temp{match.group(1)}_label")
+                labels[entry] = label or f"temp{match.group(1)}"
+        if chip not in CPU_CHIPS:
+            for entry, label in labels.items():
+                self.open(inputs, label, f"{path}/{entry}", 1000)
+            if inputs:
+                self.chips[name] = {"name": chip, "inputs": inputs}
+            return
+        # k10temp has no package label, chips are numbered in order.
+        package = str(len(self.packages))
+        for label in labels.values():
+            match = PACKAGE_LABEL.fullmatch(label)
+            if match:
+                package = match.group(1)
+        cores = self.cores.setdefault(package, {})
+        for entry, label in labels.items():
+            match = CORE_LABEL.fullmatch(label)
+            if match:
+                self.open(cores, match.group(1), f"{path}/{entry}", 1000)
+            elif PACKAGE_LABEL.fullmatch(label) or label in PACKAGE_LABELS:
+                if package not in self.packages:
+                    self.open(self.packages, package, f"{path}/{entry}", 1000)
+            else:
+                self.open(inputs, label, f"{path}/{entry}", 1000)
+        if inputs:
+            self.chips[name] = {"name": chip, "inputs": inputs}
+
+    def discover_throttle(self):
+        """
+        Opens one core counter per physical core and one package counter per
+        package; the sibling threads of a core share them.
+        """
+        cpus = f"{self.root}/devices/system/cpu"
+        if not os.path.isdir(cpus):
+            return
+        for name in sorted(os.listdir(cpus)):
+            if not re.fullmatch(r"cpu\d+", name):
+                continue
+            base = f"{cpus}/{name}"
+            package = read_text(f"{base}/topology/physical_package_id") or "0"
+            core = read_text(f"{base}/topology/core_id") or name[3:]
+            if (package, core) not in self.core_throttle:
+                self.open(
+                    self.core_throttle,
+                    (package, core),
+                    f"{base}/thermal_throttle/core_throttle_count",
+                )
+            if package not in self.package_throttle:
+                self.open(
+                    self.package_throttle,
+                    package,
+                    f"{base}/thermal_throttle/package_throttle_count",
+                )
+
+    def value(self, sensor):
+        """
+        Returns the current reading of sensor, None if it cannot be read.
+        A sensor whose device is gone schedules a new discovery.
+        """
+        try:
+            size = os.preadv(sensor.fd, [self.buffer], 0)
+            raw = int(self.buffer[:size])
+        except OSError as e:
+            if e.errno in GONE:
+                self.stale = True
+            return None
+        except ValueError:
+            return None
+        return raw / sensor.scale if sensor.scale != 1 else raw
+
+    def read(self):
+        """
+        Returns the temperatures in degrees Celsius, per package with its
+        cores, per thermal zone and per other hwmon chip, and the thermal
+        throttle counters with the events since the previous read.
+        """
+        with self.lock:
+            generation = self.devices.poll()
+            if generation != self.generation or self.stale:
+                self.generation = generation
+                self.discover()
+            packages = {}
+            for package in sorted(set(self.packages) | set(self.cores), key=int):
+                cores = self.cores.get(package, {})
+                sensor = self.packages.get(package)
+                packages[package] = {
+                    "temperature": self.value(sensor) if sensor else None,
+                    "cores": {
+                        core: self.value(cores[core]) for core in sorted(cores, key=int)
+                    },
+                }
+            zones = {
+                name: {
+                    "type": sensor.kind,
+                    "temperature": self.value(sensor),
+                }
+                for name, sensor in self.zones.items()
+            }
+            chips = {
+                name: {
+                    "name": chip["name"],
+                    "temperatures": {
+                        label: self.value(s) for label, s in chip["inputs"].items()
+                    },
+                }
+                for name, chip in self.chips.items()
+            }
+            return {
+                "packages": packages,
+                "zones": zones,
+                "hwmon": chips,
+                "throttle": self.read_throttle(),
+            }
+
+    def read_throttle(self):
+        counts = {
+            "core": self.total(self.core_throttle.values()),
+            "package": self.total(self.package_throttle.values()),
+        }
+        previous = self.throttle_counts or counts
+        self.throttle_counts = counts
+        return {
+            "core_count": counts["core"],
+            "package_count": counts["package"],
+            "core_events": max(counts["core"] - previous["core"], 0),
+            "package_events": max(counts["package"] - previous["package"], 0),
+        }
+
+    def total(self, sensors):
+        values = [self.value(sensor) for sensor in sensors]
+        return sum(v for v in values if v is not None)
+
+    @staticmethod
+    def cpu_temperature(reading):
+        """
+        Returns the hottest package, or core, temperature of a read().
+        Without CPU sensors it falls back to thermal_zone0 like
+        CPU.get_cpu_temperature, then to 0.0.
+        """
+        values = []
+        for package in reading["packages"].values():
+            values.append(package["temperature"])
+            values.extend(package["cores"].values())
+        values = [v for v in values if v is not None]
+        if values:
+            return max(values)
+        zone = reading["zones"].get("thermal_zone0")
+        if zone is not None and zone["temperature"] is not None:
+            return zone["temperature"]
+        return 0.0
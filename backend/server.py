@@ -1,14 +1,24 @@
-from fastapi import FastAPI, HTTPException, WebSocket
-from .proccess_handler import Process
-from .cpu_handler import CPU
-from .mem_handler import Memory
-from .network_handler import Network
+import asyncio
+import uuid
+from fastapi import FastAPI, HTTPException, Query, Request, Response, WebSocket
+from fastapi.responses import JSONResponse
+from .proccess_handler import PROCESS_GROUP_KEYS, ProcessKiller, ProcessTable
+from .procfs import ProcfsScanner
 from .disk_handler import Disk
 from .nvidia_gpu_handler import GPU
 from fastapi.middleware.cors import CORSMiddleware
 from .notify_res import NotificationService
 from .database import Database
 from .UserSettings import UserSettings
+from .KillRequest import KillRequest
+from .WatchRequest import WatchRequest
+from .sampler import Sampler
+from .timeseries import TimeSeriesStore
+from .metric_store import MetricStore
+from .stream import ProcessStreamHub, StreamHub
+from .projection import ProjectionCache
+from .host_info import HostInfo
+from .sensors import SensorCollector
 
 app = FastAPI()
 
@@ -25,15 +35,125 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
-notification_service = NotificationService()
+host_info = HostInfo()
+sampler = Sampler(interval=1.0, host_info=host_info, sensors=SensorCollector())
+history = TimeSeriesStore(retention=3600, interval=sampler.interval)
+archive = MetricStore("metrics")
+history.warm_load(archive)
+sampler.add_listener(history.on_snapshot)
+sampler.add_listener(archive.on_snapshot)
+stream_hub = StreamHub(interval=sampler.interval)
+sampler.add_listener(stream_hub.on_snapshot)
+projections = ProjectionCache()
+sampler.add_listener(projections.on_snapshot)
+process_table = ProcessTable(ProcfsScanner() if ProcfsScanner.available() else None)
+sampler.add_listener(process_table.on_snapshot)
+process_stream_hub = ProcessStreamHub(process_table)
+process_killer = ProcessKiller()
+process_table.add_listener(process_stream_hub.on_delta)
+
+# GET routes served purely from the sampler snapshot. They carry an ETag
+# derived from the tick sequence and support If-None-Match and ?after_seq=.
+SNAPSHOT_ROUTES = {
+    "/snapshot",
+    "/realtime",
+    "/cpu/all",
+    "/cpu/usage",
+    "/cpu/per_cpu_usage",
+    "/cpu/frequency",
+    "/cpu/count",
+    "/cpu/load_average",
+    "/cpu/core_utilization",
+    "/cpu/temperature",
+    "/sensors",
+    "/pressure",
+    "/cpu/times",
+    "/memory/all",
+    "/memory/virtual",
+    "/memory/swap",
+    "/memory/percent",
+    "/memory/usage",
+    "/memory/available",
+    "/memory/total",
+    "/network/bandwidth",
+}
+# Longest an ?after_seq= request waits for a newer tick.
+LONG_POLL_TIMEOUT = 30
+# Part of every ETag, the tick sequence starts over when the server restarts.
+BOOT_ID = uuid.uuid4().hex[:8]
+
+notification_service = NotificationService(sampler)
 th = db.get_thresholds()
 notification_service.cpu_threshold = th.cpu_threshold
 notification_service.memory_threshold = th.memory_threshold
 notification_service.disk_threshold = th.disk_threshold
 notification_service.network_threshold = th.network_threshold
 notification_service.gpu_threshold = th.gpu_threshold
+notification_service.steal_threshold = th.steal_threshold
+notification_service.iowait_threshold = th.iowait_threshold
+notification_service.pressure_threshold = th.pressure_threshold
+notification_service.major_fault_threshold = th.major_fault_threshold
 notification_service.check_interval = th.check_interval
-notification_service.start()
+
+
+def reading(path):
+    """
+    Returns a reading of the current snapshot, None where the sampler could
+    not take it.
+    """
+    return sampler.current().reading(path)
+
+
+def etag_matches(header, etag):
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in (etag, "*"):
+            return True
+    return False
+
+
+@app.middleware("http")
+async def snapshot_conditional_get(request: Request, call_next):
+    """
+    Adds conditional GET to snapshot routes: 304 when If-None-Match already
+    names the current tick, and long-polling until a tick newer than
+    ?after_seq= exists.
+    """
+    if request.method != "GET" or request.url.path not in SNAPSHOT_ROUTES:
+        return await call_next(request)
+    after_seq = request.query_params.get("after_seq")
+    if after_seq is not None:
+        try:
+            after_seq = int(after_seq)
+        except ValueError:
+            return JSONResponse(
+                status_code=400, content={"detail": "after_seq must be an integer"}
+            )
+        snapshot = await sampler.wait_for(after_seq, LONG_POLL_TIMEOUT)
+    else:
+        snapshot = sampler.current()
+    # Taken before the handler runs, so the tag is never newer than the data.
+    etag = f'"{BOOT_ID}-{snapshot.seq}"'
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response = await call_next(request)
+    response.headers["ETag"] = etag
+    return response
+
+
+@app.on_event("startup")
+async def start_background_tasks():
+    host_info.start()
+    sampler.start()
+    notification_service.start()
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    notification_service.stop()
+    sampler.stop()
 
 
 @app.websocket("/notification")
@@ -57,148 +177,434 @@ async def websocket_endpoint(websocket: WebSocket):
         notification_service.listeners.remove(on_event)
 
 
+@app.websocket("/stream")
+async def stream_endpoint(websocket: WebSocket):
+    """
+    Pushes sampler ticks to the client. The client sends
+    {"metrics": [...], "interval": seconds, "encoding": "json"|"delta"|"binary"}
+    to (re)subscribe and {"ack": seq} after applying a delta frame.
+    """
+    await websocket.accept()
+    try:
+        while True:
+            message = await websocket.receive_json()
+            if "ack" in message:
+                stream_hub.ack(websocket, message["ack"])
+                continue
+            try:
+                subscription = stream_hub.subscribe(
+                    websocket,
+                    message.get("metrics"),
+                    message.get("interval"),
+                    message.get("encoding"),
+                    sampler.current(),
+                )
+            except ValueError as e:
+                await websocket.send_json({"error": str(e)})
+                continue
+            reply = {
+                "subscribed": list(subscription.metrics),
+                "interval": subscription.every * sampler.interval,
+                "encoding": subscription.encoding,
+            }
+            if subscription.dictionary is not None:
+                reply["dictionary"] = list(subscription.dictionary)
+                reply["format"] = subscription.packer.format
+            await websocket.send_json(reply)
+    except Exception:
+        print("Stream connection closed")
+    finally:
+        stream_hub.unsubscribe(websocket)
+
+
+@app.websocket("/processes/stream")
+async def process_stream_endpoint(websocket: WebSocket):
+    """
+    Sends the full process table, then the processes added, removed and
+    changed on every refresh, keyed by [pid, start_time]. The client sends
+    {"resync": true} to get the full table again.
+    """
+    await websocket.accept()
+    try:
+        await process_stream_hub.subscribe(websocket)
+        while True:
+            message = await websocket.receive_json()
+            if message.get("resync"):
+                await process_stream_hub.subscribe(websocket)
+    except Exception:
+        print("Process stream connection closed")
+    finally:
+        process_stream_hub.unsubscribe(websocket)
+
+
 @app.get("/processes", response_model=list)
-def get_all_processes():
+def get_all_processes(
+    sort: str = None,
+    order: str = "desc",
+    limit: int = Query(None, ge=0),
+    offset: int = Query(0, ge=0),
+    name: str = None,
+    human: bool = False,
+    fields: str = None,
+):
+    """
+    Endpoint to get running processes, e.g.
+    /processes?sort=cpu&order=desc&limit=50&offset=0&name=python. Memory is
+    returned in bytes and the start time in epoch seconds unless human=true.
+    fields selects the columns, e.g. fields=pid,name,rss,cmdline; cmdline,
+    username, num_fds, io_counters and num_threads are only read on request.
+    """
+    try:
+        return process_table.list(sort, order, limit, offset, name, human, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/processes/groups", response_model=list)
+def get_process_groups(by: str = "name", limit: int = Query(None, ge=0)):
+    """
+    Endpoint to get process count, CPU%, RSS and thread totals per
+    application, grouped by name, user, cgroup or ppid.
+    """
+    process_table.ready()
+    try:
+        groups = process_table.groups.totals(by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return groups[:limit]
+
+
+@app.get("/processes/search", response_model=list)
+def search_processes(
+    name: str = None,
+    cmdline: str = None,
+    limit: int = Query(None, ge=0),
+    human: bool = False,
+    fields: str = None,
+):
     """
-    Endpoint to get all running processes.
+    Endpoint to find processes by name prefix and/or command line
+    substring, e.g. /processes/search?name=gunic&cmdline=--workers.
     """
-    processes = Process.list_all_processes()
-    return processes
+    try:
+        return process_table.search(name, cmdline, limit, human, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/processes/top", response_model=list)
+def get_top_processes(by: str = "cpu", window: str = "5m", k: int = Query(10, ge=1)):
+    """
+    Endpoint to get the processes that used the most CPU seconds (cpu),
+    grew their RSS the most (rss_growth, bytes) or did the most disk I/O
+    (io, bytes) over the last 5m, 1h or 24h. Values are estimates that may
+    be too high by at most error.
+    """
+    try:
+        return process_table.heavy_hitters.top(by, window, k)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/processes/watch")
+def get_watch_list():
+    """
+    Endpoint to get the watched pids and name patterns and the processes
+    that have history.
+    """
+    return process_table.watch.to_dict()
+
+
+@app.post("/processes/watch")
+def post_watch(request: WatchRequest):
+    """
+    Endpoint to start recording the history of a pid or of every process
+    whose name matches a glob pattern, e.g. {"pattern": "gunicorn*"}.
+    """
+    if request.pid is None and not request.pattern:
+        raise HTTPException(status_code=400, detail="pid or pattern is required")
+    process_table.watch.watch(request.pid, request.pattern or None)
+    return process_table.watch.to_dict()
+
+
+@app.delete("/processes/watch")
+def delete_watch(pid: int = None, pattern: str = None):
+    """
+    Endpoint to stop watching a pid or name pattern, discarding its history.
+    """
+    process_table.watch.unwatch(pid, pattern)
+    return process_table.watch.to_dict()
+
+
+@app.get("/processes/{pid}/history")
+def get_process_history(pid: int, since: float = None, until: float = None):
+    """
+    Endpoint to get the recorded CPU%, RSS, fd count and I/O bytes of a
+    watched process, optionally limited to the epoch range [since, until].
+    """
+    result = process_table.watch.history(pid, since, until)
+    if result is None:
+        raise HTTPException(
+            status_code=404, detail=f"Process with PID {pid} is not watched"
+        )
+    return result
 
 
 @app.get("/processes/{pid}", response_model=dict)
-def get_process_by_pid(pid: int):
+def get_process_by_pid(pid: int, human: bool = False, fields: str = None):
     """
     Endpoint to get a process by its PID.
     """
-    process = Process.get_process_info(pid)
+    try:
+        process = process_table.get(pid, human, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if process:
         return process
     else:
         raise HTTPException(status_code=404, detail=f"Process with PID {pid} not found")
 
 
+@app.post("/killprocess")
+async def post_kill_processes(request: KillRequest):
+    """
+    Endpoint to terminate processes in bulk, either a list of pids or every
+    process of a group, e.g. {"group_by": "name", "group": "gunicorn"}.
+    Processes get SIGTERM, then SIGKILL after grace seconds. Returns a job
+    to poll at /killprocess/jobs/{job} or stream from .../stream.
+    """
+    pids = list(request.pids)
+    create_times = {}
+    if request.group_by is not None:
+        if request.group_by not in PROCESS_GROUP_KEYS:
+            raise HTTPException(
+                status_code=400, detail=f"Unknown grouping: {request.group_by}"
+            )
+        await asyncio.get_running_loop().run_in_executor(None, process_table.ready)
+        # Members are pinned to the process the table saw, a pid recycled
+        # since the last refresh is not signalled.
+        create_times = process_table.groups.pids(request.group_by, request.group)
+        pids.extend(create_times)
+    if not pids:
+        raise HTTPException(status_code=400, detail="No processes to kill")
+    try:
+        job = process_killer.start(pids, request.grace, create_times)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return job.to_dict()
+
+
+@app.get("/killprocess/jobs/{job_id}")
+def get_kill_job(job_id: str):
+    job = process_killer.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Kill job {job_id} not found")
+    return job.to_dict()
+
+
+@app.websocket("/killprocess/jobs/{job_id}/stream")
+async def kill_job_stream(websocket: WebSocket, job_id: str):
+    """
+    Sends the state of a kill job every time it changes until it is done.
+    """
+    await websocket.accept()
+    job = process_killer.get(job_id)
+    if job is None:
+        await websocket.send_json({"error": f"Kill job {job_id} not found"})
+        await websocket.close()
+        return
+    try:
+        while True:
+            await websocket.send_json(job.to_dict())
+            if job.done:
+                break
+            await job.wait()
+        await websocket.close()
+    except Exception:
+        print("Kill job stream closed")
+
+
 @app.post("/killprocess/{pid}")
-def post_kill_process(pid: int):
-    result_string = Process.kill_process(pid)
+async def post_kill_process(pid: int):
+    job = process_killer.start([pid])
+    while not job.done:
+        await job.wait()
+    result = job.results[pid]
+    if result == "terminated":
+        result_string = "Process terminated"
+    elif result == "killed":
+        result_string = f"Process {pid} was killed after ignoring SIGTERM."
+    elif result == "not_found":
+        result_string = "No process found"
+    else:
+        result_string = f"Error terminating process {pid}: {result}"
     res = {"res": result_string}
     return res
 
 
+@app.get("/snapshot")
+def get_snapshot(fields: str = None):
+    """
+    Endpoint to get any set of readings from one sampler snapshot, e.g.
+    /snapshot?fields=cpu.usage,memory.percent,net.bytes_sent. Without fields
+    the whole snapshot is returned.
+    """
+    snapshot = sampler.current()
+    if not fields:
+        return {"seq": snapshot.seq, "time": snapshot.time, "values": snapshot.data}
+    try:
+        projection = projections.get(fields, snapshot)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "seq": snapshot.seq,
+        "time": snapshot.time,
+        "values": projection.apply(snapshot),
+    }
+
+
 # CPU
 @app.get("/cpu/all")
 def get_all_cpu_data():
+    # Usage, per-core usage, breakdown and core utilization all come from
+    # the same per-core cpu_times delta taken by the sampler.
+    snapshot = sampler.current()
     cpu_data = {
-        "cpu_usage": CPU.get_cpu_usage(),
-        "per_cpu_usage": CPU.get_per_cpu_usage(),
-        "cpu_frequency": CPU.get_cpu_frequency(),
-        "cpu_count": CPU.get_cpu_count(),
-        "load_average": CPU.get_load_average(),
-        "core_utilization": CPU.get_core_utilization(),
-        "cpu_temperature": CPU.get_cpu_temperature(),
-        "cpu_times": CPU.get_cpu_times(),
+        "cpu_usage": snapshot.reading("cpu.usage"),
+        "per_cpu_usage": snapshot.reading("cpu.per_cpu_usage"),
+        "cpu_frequency": snapshot.reading("cpu.frequency"),
+        "cpu_count": snapshot.reading("cpu.count"),
+        "load_average": snapshot.reading("cpu.load_average"),
+        "core_utilization": snapshot.reading("cpu.core_utilization"),
+        "cpu_temperature": snapshot.reading("cpu.temperature"),
+        "cpu_times": snapshot.reading("cpu.times"),
+        "cpu_breakdown": snapshot.reading("cpu.breakdown"),
+        "per_cpu_breakdown": snapshot.reading("cpu.per_cpu_breakdown"),
     }
     return cpu_data
 
 
 @app.get("/cpu/usage")
 def cpu_usage():
-    return {"cpu_usage": CPU.get_cpu_usage()}
+    return {"cpu_usage": reading("cpu.usage")}
 
 
 @app.get("/cpu/per_cpu_usage")
 def per_cpu_usage():
-    return {"per_cpu_usage": CPU.get_per_cpu_usage()}
+    return {"per_cpu_usage": reading("cpu.per_cpu_usage")}
 
 
 @app.get("/cpu/frequency")
 def cpu_frequency():
-    return {"cpu_frequency": CPU.get_cpu_frequency()}
+    return {"cpu_frequency": reading("cpu.frequency")}
 
 
 @app.get("/cpu/count")
 def cpu_count():
-    return {"cpu_count": CPU.get_cpu_count()}
+    return {"cpu_count": reading("cpu.count")}
 
 
 @app.get("/cpu/load_average")
 def load_average():
-    return {"load_average": CPU.get_load_average()}
+    return {"load_average": reading("cpu.load_average")}
 
 
 @app.get("/cpu/core_utilization")
 def core_utilization():
-    return {"core_utilization": CPU.get_core_utilization()}
+    return {"core_utilization": reading("cpu.core_utilization")}
 
 
 @app.get("/cpu/temperature")
 def cpu_temperature():
-    return {"cpu_temperature": CPU.get_cpu_temperature()}
+    return {"cpu_temperature": reading("cpu.temperature")}
+
+
+@app.get("/sensors")
+def sensors():
+    """
+    Endpoint to get every temperature sensor and the thermal throttle
+    counters.
+    """
+    return reading("sensors")
+
+
+@app.get("/pressure")
+def pressure():
+    """
+    Endpoint to get the pressure stall information, None without kernel
+    support, and the vmstat fault, swap and reclaim rates.
+    """
+    snapshot = sampler.current()
+    return {
+        "pressure": snapshot.reading("pressure"),
+        "vmstat": snapshot.reading("vmstat"),
+    }
 
 
 @app.get("/cpu/times")
 def cpu_times():
-    return {"cpu_times": CPU.get_cpu_times()}
+    return {"cpu_times": reading("cpu.times")}
 
 
 # MEMORY
 @app.get("/memory/all")
 def get_all_memory_data():
+    snapshot = sampler.current()
     memory_data = {
-        "virtual_memory": Memory.get_virtual_memory(),
-        "swap_memory": Memory.get_swap_memory(),
-        "memory_percent": Memory.get_memory_percent(),
-        "memory_usage": Memory.get_memory_usage(),
-        "memory_available": Memory.get_memory_available(),
-        "memory_total": Memory.get_memory_total(),
+        "virtual_memory": snapshot.reading("memory"),
+        "swap_memory": snapshot.reading("swap"),
+        "memory_percent": snapshot.reading("memory.percent"),
+        "memory_usage": snapshot.reading("memory.used"),
+        "memory_available": snapshot.reading("memory.available"),
+        "memory_total": snapshot.reading("memory.total"),
     }
     return memory_data
 
 
 @app.get("/memory/virtual")
 def virtual_memory():
-    return {"virtual_memory": Memory.get_virtual_memory()}
+    return {"virtual_memory": reading("memory")}
 
 
 @app.get("/memory/swap")
 def swap_memory():
-    return {"swap_memory": Memory.get_swap_memory()}
+    return {"swap_memory": reading("swap")}
 
 
 @app.get("/memory/percent")
 def memory_percent():
-    return {"memory_percent": Memory.get_memory_percent()}
+    return {"memory_percent": reading("memory.percent")}
 
 
 @app.get("/memory/usage")
 def memory_usage():
-    return {"memory_usage": Memory.get_memory_usage()}
+    return {"memory_usage": reading("memory.used")}
 
 
 @app.get("/memory/available")
 def memory_available():
-    return {"memory_available": Memory.get_memory_available()}
+    return {"memory_available": reading("memory.available")}
 
 
 @app.get("/memory/total")
 def memory_total():
-    return {"memory_total": Memory.get_memory_total()}
+    return {"memory_total": reading("memory.total")}
 
 
 # NETWORK HANDLER
 @app.get("/network/all")
 def get_bandwidth_usage():
     return {
-        "bandwidth_usage": Network.get_bandwidth_usage(),
-        "ipv4": Network.get_primary_ipv4(),
-        "ipv6": Network.get_primary_ipv6(),
-        "type": Network.get_primary_connection_type(),
+        "bandwidth_usage": reading("net"),
+        "ipv4": host_info.ipv4.get(),
+        "ipv6": host_info.ipv6.get(),
+        "type": host_info.connection_type.get(),
     }
 
 
 @app.get("/network/bandwidth")
 def get_single_bandwidth_usage():
-    return {"bandwidth_usage": Network.get_bandwidth_usage()}
+    return {"bandwidth_usage": reading("net")}
 
 
 @app.get("/disk/all")
@@ -207,12 +613,13 @@ def get_all_disk_data(path: str = "/"):
     Endpoint to get all disk-related information, including partitions, usage,
     and I/O statistics.
     """
+    snapshot = sampler.current()
     disk_data = {
-        "partitions": Disk.get_disk_partitions(),
+        "partitions": host_info.disk_partitions.get(),
         "usage": Disk.get_disk_usage(path),
-        "io_counters": Disk.get_disk_io_counters(),
+        "io_counters": snapshot.reading("disk.io_counters"),
         "io_counters_per_disk": Disk.get_disk_io_counters_per_disk(),
-        "active_time": Disk.get_disk_active_time_percentage(),
+        "active_time": snapshot.reading("disk.active_time"),
     }
     return disk_data
 
@@ -232,22 +639,63 @@ def get_all_gpu_data():
 
 @app.get("/realtime")
 def get_all_realtime_data():
+    # Rates come from counter deltas between sampler ticks, nothing here
+    # sleeps.
+    # A section the sampler could not read is reported as None.
+    snapshot = sampler.current()
     realtime_tracking_data = {
-        "throughput": Network.monitor_total_traffic(),
-        "cpu_usage": CPU.get_cpu_usage(),
-        "cpu_frequency": CPU.get_cpu_frequency(),
-        "uptime": CPU.get_uptime(),
-        "memory_usage": Memory.get_memory_usage(),
-        "memory_total": Memory.get_memory_total(),
-        "memory_percent": Memory.get_memory_percent(),
-        "memory_available": Memory.get_memory_available(),
-        "memory_swap": Memory.get_swap_memory(),
-        "disk_active_time": Disk.get_disk_active_time_percentage(),
+        "throughput": snapshot.reading("net.throughput"),
+        "cpu_usage": snapshot.reading("cpu.usage"),
+        "cpu_frequency": snapshot.reading("cpu.frequency"),
+        "uptime": snapshot.reading("cpu.uptime"),
+        "memory_usage": snapshot.reading("memory.used"),
+        "memory_total": snapshot.reading("memory.total"),
+        "memory_percent": snapshot.reading("memory.percent"),
+        "memory_available": snapshot.reading("memory.available"),
+        "memory_swap": snapshot.reading("swap"),
+        "disk_active_time": snapshot.reading("disk.active_time"),
         # "gpu_usage": GPU.get_gpu_usage()
     }
     return realtime_tracking_data
 
 
+@app.get("/history")
+def get_history(
+    metric: str, since: float = None, until: float = None, max_points: int = None
+):
+    """
+    Endpoint to get the recorded samples of a metric, optionally limited to
+    the epoch range [since, until]. With max_points the finest rollup tier
+    that fits the range within that many points is used.
+    """
+    try:
+        return history.query(metric, since, until, max_points)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Metric {metric} not found")
+
+
+@app.get("/history/archive")
+def get_history_archive(
+    metric: str, since: float = None, until: float = None, max_points: int = None
+):
+    """
+    Endpoint to get the samples of a metric persisted on disk, including
+    ranges older than the in-memory history.
+    """
+    try:
+        return archive.query(metric, since, until, max_points)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Metric {metric} not found")
+
+
+@app.get("/history/metrics", response_model=list)
+def get_history_metrics():
+    """
+    Endpoint to list every metric with recorded history.
+    """
+    return history.metrics()
+
+
 @app.get("/settings", response_model=UserSettings)
 def get_user_settings():
     """
@@ -272,6 +720,10 @@ def save_user_settings(settings: UserSettings):
         notification_service.disk_threshold = settings.disk_threshold
         notification_service.network_threshold = settings.network_threshold
         notification_service.gpu_threshold = settings.gpu_threshold
+        notification_service.steal_threshold = settings.steal_threshold
+        notification_service.iowait_threshold = settings.iowait_threshold
+        notification_service.pressure_threshold = settings.pressure_threshold
+        notification_service.major_fault_threshold = settings.major_fault_threshold
         notification_service.check_interval = settings.check_interval
 
         return settings
@@ -0,0 +1,295 @@
+import asyncio
+import json
+import math
+import struct
+
+# Top-level snapshot sections a /stream client can subscribe to.
+STREAM_METRICS = ("cpu", "memory", "swap", "disk", "net")
+# json sends whole frames, delta only the fields changed since the last
+# acknowledged frame, binary struct-packed floats in dictionary order.
+STREAM_ENCODINGS = ("json", "delta", "binary")
+# How many past ticks a delta client can acknowledge against.
+DELTA_HISTORY = 64
+# Header of every binary frame: seq and epoch time.
+BINARY_HEADER = "<Qd"
+
+
+def flatten(data, expand_lists=False, prefix=""):
+    """
+    Returns the leaves of nested snapshot data keyed by dotted path. Lists
+    are leaves unless expand_lists is set.
+    """
+    flat = {}
+    for key, value in data.items():
+        path = prefix + key
+        if isinstance(value, dict):
+            flat.update(flatten(value, expand_lists, path + "."))
+        elif expand_lists and isinstance(value, (list, tuple)):
+            flat.update(
+                flatten(
+                    {str(i): v for i, v in enumerate(value)}, expand_lists, path + "."
+                )
+            )
+        else:
+            flat[path] = value
+    return flat
+
+
+class Subscription:
+    def __init__(self, metrics, every, encoding="json", dictionary=None) -> None:
+        self.metrics = metrics
+        self.every = every
+        self.encoding = encoding
+        self.dictionary = dictionary
+        self.packer = None
+        if dictionary is not None:
+            self.packer = struct.Struct(BINARY_HEADER + "d" * len(dictionary))
+        # seq of the last frame the client acknowledged, delta only.
+        self.acked = None
+        # Task sending the latest frame to the client.
+        self.sending = None
+
+
+class StreamHub:
+    """
+    Pushes sampler ticks to every /stream subscriber.
+
+    Each tick is encoded once per distinct frame (metric selection,
+    encoding and delta base) and the same frame is shared by all
+    subscribers that need it.
+    """
+
+    def __init__(self, interval=1.0) -> None:
+        self.interval = interval
+        self.subscribers = {}
+        self.snapshots = {}
+        self.flattened = {}
+
+    def subscribe(
+        self, websocket, metrics=None, interval=None, encoding="json", snapshot=None
+    ):
+        """
+        Registers or updates the subscription of a websocket. Binary
+        subscriptions negotiate their field dictionary from snapshot. Raises
+        ValueError for unknown metrics or encodings.
+        """
+        metrics = tuple(metrics) if metrics else STREAM_METRICS
+        unknown = [m for m in metrics if m not in STREAM_METRICS]
+        if unknown:
+            raise ValueError(f"Unknown metrics: {', '.join(unknown)}")
+        encoding = encoding or "json"
+        if encoding not in STREAM_ENCODINGS:
+            raise ValueError(f"Unknown encoding: {encoding}")
+        every = 1
+        if interval:
+            every = max(1, round(float(interval) / self.interval))
+        metrics = tuple(sorted(set(metrics)))
+        dictionary = None
+        if encoding == "binary":
+            if snapshot is None:
+                raise ValueError("Binary encoding needs a snapshot to negotiate fields")
+            flat = flatten({m: snapshot.data[m] for m in metrics}, expand_lists=True)
+            dictionary = tuple(
+                sorted(
+                    path
+                    for path, value in flat.items()
+                    if isinstance(value, (int, float)) and not isinstance(value, bool)
+                )
+            )
+        subscription = Subscription(metrics, every, encoding, dictionary)
+        self.subscribers[websocket] = subscription
+        return subscription
+
+    def unsubscribe(self, websocket):
+        self.subscribers.pop(websocket, None)
+
+    def ack(self, websocket, seq):
+        """
+        Records that a delta client has applied frame seq.
+        """
+        subscription = self.subscribers.get(websocket)
+        if subscription is not None and seq in self.snapshots:
+            subscription.acked = seq
+
+    def flat(self, snapshot, metrics, expand_lists=False):
+        key = (snapshot.seq, metrics, expand_lists)
+        values = self.flattened.get(key)
+        if values is None:
+            values = self.flattened[key] = flatten(
+                {m: snapshot.data[m] for m in metrics}, expand_lists
+            )
+        return values
+
+    @staticmethod
+    def serialize(snapshot, metrics):
+        return json.dumps(
+            {
+                "seq": snapshot.seq,
+                "time": snapshot.time,
+                "data": {m: snapshot.data[m] for m in metrics},
+            }
+        )
+
+    def serialize_delta(self, snapshot, metrics, base_seq):
+        current = self.flat(snapshot, metrics)
+        base = self.snapshots.get(base_seq)
+        if base is None:
+            # Nothing acknowledged yet (or too long ago), send every field.
+            changed = current
+            removed = []
+            base_seq = None
+        else:
+            previous = self.flat(base, metrics)
+            changed = {
+                path: value
+                for path, value in current.items()
+                if path not in previous or previous[path] != value
+            }
+            removed = [path for path in previous if path not in current]
+        return json.dumps(
+            {
+                "seq": snapshot.seq,
+                "time": snapshot.time,
+                "base": base_seq,
+                "changed": changed,
+                "removed": removed,
+            }
+        )
+
+    def serialize_binary(self, snapshot, subscription):
+        flat = self.flat(snapshot, subscription.metrics, expand_lists=True)
+        values = []
+        for path in subscription.dictionary:
+            value = flat.get(path)
+            values.append(float(value) if value is not None else math.nan)
+        return subscription.packer.pack(snapshot.seq, snapshot.time, *values)
+
+    def encode(self, snapshot, subscription):
+        if subscription.encoding == "delta":
+            return self.serialize_delta(
+                snapshot, subscription.metrics, subscription.acked
+            )
+        if subscription.encoding == "binary":
+            return self.serialize_binary(snapshot, subscription)
+        return self.serialize(snapshot, subscription.metrics)
+
+    @staticmethod
+    def frame_key(subscription):
+        if subscription.encoding == "delta":
+            return ("delta", subscription.metrics, subscription.acked)
+        if subscription.encoding == "binary":
+            return ("binary", subscription.dictionary)
+        return ("json", subscription.metrics)
+
+    async def send(self, websocket, frame):
+        try:
+            if isinstance(frame, bytes):
+                await websocket.send_bytes(frame)
+            else:
+                await websocket.send_text(frame)
+        except Exception:
+            self.unsubscribe(websocket)
+
+    def remember(self, snapshot):
+        self.snapshots[snapshot.seq] = snapshot
+        oldest = snapshot.seq - DELTA_HISTORY
+        for seq in [seq for seq in self.snapshots if seq <= oldest]:
+            del self.snapshots[seq]
+        for key in [key for key in self.flattened if key[0] <= oldest]:
+            del self.flattened[key]
+
+    async def on_snapshot(self, snapshot):
+        self.remember(snapshot)
+        frames = {}
+        for websocket, subscription in list(self.subscribers.items()):
+            if snapshot.seq % subscription.every:
+                continue
+            if subscription.sending is not None and not subscription.sending.done():
+                # Still sending an earlier frame: a slow client skips ticks
+                # instead of queueing them.
+                continue
+            if subscription.acked not in self.snapshots:
+                subscription.acked = None
+            key = self.frame_key(subscription)
+            frame = frames.get(key)
+            if frame is None:
+                frame = frames[key] = self.encode(snapshot, subscription)
+            # Not awaited, a slow client must not hold up the others or the
+            # sampler.
+            subscription.sending = asyncio.create_task(self.send(websocket, frame))
+
+
+class ProcessStreamHub:
+    """
+    Pushes process table changes to every /processes/stream subscriber.
+
+    A new subscriber first gets the full table, then one delta frame per
+    refresh. A subscriber whose last frame is not the base of a delta (it
+    missed one, or asked to resync) gets the full table again instead.
+    Subscribers still sending an earlier frame skip deltas, and are
+    resynced once they catch up.
+    """
+
+    def __init__(self, table) -> None:
+        self.table = table
+        # websocket -> seq of the last table version sent to it.
+        self.subscribers = {}
+        # websocket -> task sending the latest frame to it.
+        self.sending = {}
+        self.full_frame = (None, None)
+
+    def serialize_full(self):
+        seq, records = self.table.published
+        cached_seq, frame = self.full_frame
+        if cached_seq != seq:
+            frame = json.dumps(
+                {"type": "snapshot", "seq": seq, "processes": list(records.values())}
+            )
+            self.full_frame = (seq, frame)
+        return seq, frame
+
+    @staticmethod
+    def serialize_delta(delta):
+        return json.dumps(dict(delta, type="delta"))
+
+    async def send(self, websocket, frame):
+        try:
+            await websocket.send_text(frame)
+        except Exception:
+            self.unsubscribe(websocket)
+
+    async def subscribe(self, websocket):
+        """
+        Registers a websocket and sends it the full table. Also used to
+        resync a subscriber that fell behind.
+        """
+        seq, frame = self.serialize_full()
+        self.subscribers[websocket] = seq
+        await self.send(websocket, frame)
+
+    def unsubscribe(self, websocket):
+        self.subscribers.pop(websocket, None)
+        self.sending.pop(websocket, None)
+
+    async def on_delta(self, delta):
+        frame = None
+        for websocket, seq in list(self.subscribers.items()):
+            if seq >= delta["seq"]:
+                # Subscribed after this version was published.
+                continue
+            sending = self.sending.get(websocket)
+            if sending is not None and not sending.done():
+                # Still sending an earlier frame: skip the delta, the full
+                # table is sent once the client caught up.
+                continue
+            if seq == delta["base"]:
+                if frame is None:
+                    frame = self.serialize_delta(delta)
+                self.subscribers[websocket] = delta["seq"]
+                send = self.send(websocket, frame)
+            else:
+                full_seq, full = self.serialize_full()
+                self.subscribers[websocket] = full_seq
+                send = self.send(websocket, full)
+            # Not awaited, a slow client must not hold up the table updates.
+            self.sending[websocket] = asyncio.create_task(send)
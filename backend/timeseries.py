@@ -0,0 +1,331 @@
+import math
+import threading
+import time
+import numpy as np
+
+# (bucket seconds, bucket count) of the rollup tiers kept next to the raw
+# samples: 10s for 6 hours, 1m for 3 days and 1h for 8 weeks.
+ROLLUP_TIERS = ((10, 2160), (60, 4320), (3600, 1344))
+
+
+class RingBuffer:
+    """
+    Fixed-capacity buffer of (timestamp, value) samples backed by
+    preallocated float64 arrays. Once full, the oldest sample is overwritten.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.head = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, timestamp, value):
+        """
+        Stores one sample. Timestamps must not go backwards.
+        """
+        self.timestamps[self.head] = timestamp
+        self.values[self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def load(self, timestamps, values):
+        """
+        Fills an empty buffer with time-ordered samples, keeping the newest
+        ones that fit.
+        """
+        n = min(len(timestamps), self.capacity)
+        if n:
+            self.timestamps[:n] = timestamps[-n:]
+            self.values[:n] = values[-n:]
+        self.head = n % self.capacity
+        self.count = n
+
+    def oldest(self):
+        """
+        Returns the timestamp of the oldest stored sample, None when empty.
+        """
+        if self.count == 0:
+            return None
+        return self.timestamps[self.head if self.count == self.capacity else 0]
+
+    def select(self, since=None, until=None):
+        """
+        Returns the slices of the backing arrays holding since <= t <= until,
+        oldest first.
+        """
+        if self.count < self.capacity:
+            parts = [slice(0, self.count)]
+        else:
+            parts = [slice(self.head, self.capacity), slice(0, self.head)]
+        selected = []
+        for part in parts:
+            ts = self.timestamps[part]
+            lo = 0 if since is None else np.searchsorted(ts, since, side="left")
+            hi = len(ts) if until is None else np.searchsorted(ts, until, side="right")
+            selected.append(slice(part.start + lo, part.start + hi))
+        return selected
+
+    def size(self, since=None, until=None):
+        """
+        Returns the number of samples with since <= t <= until.
+        """
+        return sum(part.stop - part.start for part in self.select(since, until))
+
+    def gather(self, array, selected):
+        return np.concatenate([array[part] for part in selected])
+
+    def query(self, since=None, until=None):
+        """
+        Returns copies of the timestamps and values with since <= t <= until.
+        """
+        selected = self.select(since, until)
+        return self.gather(self.timestamps, selected), self.gather(self.values, selected)
+
+
+class RollupTier(RingBuffer):
+    """
+    Ring of fixed-width buckets holding the min, max, sum and count of the
+    samples that fell into them. The bucket being filled is updated in place,
+    so the tier is maintained incrementally as samples arrive.
+
+    timestamps holds bucket starts and values the running average.
+    """
+
+    def __init__(self, resolution, capacity, origin=0.0):
+        super().__init__(capacity)
+        self.resolution = resolution
+        # Shifts bucket boundaries so they line up with the wall clock.
+        self.origin = origin
+        self.mins = np.zeros(capacity, dtype=np.float64)
+        self.maxs = np.zeros(capacity, dtype=np.float64)
+        self.sums = np.zeros(capacity, dtype=np.float64)
+        self.counts = np.zeros(capacity, dtype=np.float64)
+
+    def append(self, timestamp, value):
+        start = (
+            math.floor((timestamp + self.origin) / self.resolution) * self.resolution
+            - self.origin
+        )
+        last = (self.head - 1) % self.capacity
+        if self.count and self.timestamps[last] == start:
+            self.mins[last] = min(self.mins[last], value)
+            self.maxs[last] = max(self.maxs[last], value)
+            self.sums[last] += value
+            self.counts[last] += 1
+            self.values[last] = self.sums[last] / self.counts[last]
+            return
+        i = self.head
+        self.mins[i] = self.maxs[i] = self.sums[i] = value
+        self.counts[i] = 1
+        super().append(start, value)
+
+    def load(self, timestamps, values, weights=None):
+        """
+        Fills an empty tier from time-ordered samples in one pass. weights
+        gives the number of samples each value stands for, one by default.
+        """
+        if len(timestamps) == 0:
+            return
+        if weights is None:
+            weights = np.ones(len(values))
+        starts = (
+            np.floor((timestamps + self.origin) / self.resolution) * self.resolution
+            - self.origin
+        )
+        starts, index = np.unique(starts, return_index=True)
+        sums = np.add.reduceat(values * weights, index)
+        counts = np.add.reduceat(weights, index)
+        n = min(len(starts), self.capacity)
+        self.mins[:n] = np.minimum.reduceat(values, index)[-n:]
+        self.maxs[:n] = np.maximum.reduceat(values, index)[-n:]
+        self.sums[:n] = sums[-n:]
+        self.counts[:n] = counts[-n:]
+        super().load(starts, sums / counts)
+
+
+class TimeSeries:
+    """
+    Raw samples of one metric plus its rollup tiers.
+    """
+
+    def __init__(self, capacity, interval, tiers=ROLLUP_TIERS, origin=0.0):
+        self.interval = interval
+        self.raw = RingBuffer(capacity)
+        self.tiers = [
+            RollupTier(resolution, size, origin) for resolution, size in tiers
+        ]
+
+    def append(self, timestamp, value):
+        self.raw.append(timestamp, value)
+        for tier in self.tiers:
+            tier.append(timestamp, value)
+
+    def load(self, timestamps, values, averages=None):
+        """
+        Fills the empty buffers from time-ordered samples. averages,
+        (resolution, timestamps, values), optionally holds older averages
+        over resolution seconds. They only go into the tiers at least that
+        coarse, each weighted as the samples of one such bucket.
+        """
+        self.raw.load(timestamps, values)
+        for tier in self.tiers:
+            if averages is None or tier.resolution < averages[0]:
+                tier.load(timestamps, values)
+                continue
+            resolution, older_timestamps, older_values = averages
+            tier.load(
+                np.concatenate([older_timestamps, timestamps]),
+                np.concatenate([older_values, values]),
+                np.concatenate(
+                    [
+                        np.full(len(older_values), resolution / self.interval),
+                        np.ones(len(values)),
+                    ]
+                ),
+            )
+
+    def pick(self, since=None, until=None, max_points=None):
+        """
+        Returns the finest buffer that still reaches back to since and, when
+        max_points is given, fits the range within that many points.
+        """
+        buffers = [self.raw] + self.tiers
+        for buffer in buffers:
+            oldest = buffer.oldest()
+            if since is not None and oldest is not None and oldest > since:
+                if buffer is not buffers[-1] and buffer.count == buffer.capacity:
+                    # Older samples were already dropped from this buffer.
+                    continue
+            if max_points is None or buffer.size(since, until) <= max_points:
+                return buffer
+        return buffers[-1]
+
+    def query(self, since=None, until=None, max_points=None):
+        buffer = self.pick(since, until, max_points)
+        if since is not None and buffer is not self.raw:
+            # Keep the bucket that since falls into.
+            since = np.nextafter(since - buffer.resolution, np.inf)
+        selected = buffer.select(since, until)
+        timestamps = buffer.gather(buffer.timestamps, selected)
+        values = buffer.gather(buffer.values, selected)
+        if buffer is self.raw:
+            return {
+                "resolution": self.interval,
+                "timestamps": timestamps,
+                "values": values,
+                "min": values,
+                "max": values,
+                "count": np.ones(len(values)),
+            }
+        return {
+            "resolution": buffer.resolution,
+            "timestamps": timestamps,
+            "values": values,
+            "min": buffer.gather(buffer.mins, selected),
+            "max": buffer.gather(buffer.maxs, selected),
+            "count": buffer.gather(buffer.counts, selected),
+        }
+
+
+class TimeSeriesStore:
+    """
+    One ring buffer per metric plus its rollup tiers, fed from sampler
+    snapshots.
+
+    Samples are stored against monotonic timestamps so wall clock jumps
+    cannot reorder a series. Queries take and return epoch seconds.
+    """
+
+    def __init__(self, retention=3600, interval=1.0, tiers=ROLLUP_TIERS) -> None:
+        self.capacity = max(int(retention / interval), 1)
+        self.interval = interval
+        self.tiers = tiers
+        self.series = {}
+        self.lock = threading.Lock()
+        self.clock_offset = time.time() - time.monotonic()
+
+    def record(self, snapshot):
+        """
+        Appends every numeric reading of a snapshot to its series.
+        """
+        with self.lock:
+            for metric, value in snapshot.metrics().items():
+                series = self.series.get(metric)
+                if series is None:
+                    series = self.series[metric] = TimeSeries(
+                        self.capacity, self.interval, self.tiers, self.clock_offset
+                    )
+                series.append(snapshot.timestamp, value)
+
+    async def on_snapshot(self, snapshot):
+        self.record(snapshot)
+
+    def warm_load(self, archive):
+        """
+        Rebuilds the in-memory series from a MetricStore, typically right
+        after startup and before the sampler begins recording.
+        """
+        horizon = max(
+            [self.capacity * self.interval]
+            + [resolution * size for resolution, size in self.tiers]
+        )
+        since = time.time() - horizon
+        for metric in archive.metrics():
+            compacted, raw = archive.read_logs(metric, since=since)
+            if not compacted and not raw:
+                continue
+            averages = None
+            if compacted:
+                # Averages of archive.resolution seconds, loaded only into
+                # the tiers that coarse and weighted as a whole bucket.
+                older = np.concatenate(compacted)
+                averages = (
+                    archive.resolution,
+                    older["time"] - self.clock_offset,
+                    older["value"],
+                )
+            timestamps = values = np.empty(0)
+            if raw:
+                records = np.concatenate(raw)
+                timestamps = records["time"] - self.clock_offset
+                values = records["value"]
+            series = TimeSeries(
+                self.capacity, self.interval, self.tiers, self.clock_offset
+            )
+            series.load(timestamps, values, averages)
+            with self.lock:
+                self.series[metric] = series
+
+    def metrics(self):
+        """
+        Returns the names of every recorded metric.
+        """
+        with self.lock:
+            return sorted(self.series)
+
+    def query(self, metric, since=None, until=None, max_points=None):
+        """
+        Returns the samples of a metric between two epoch timestamps from
+        the finest tier that fits within max_points.
+        """
+        if since is not None:
+            since -= self.clock_offset
+        if until is not None:
+            until -= self.clock_offset
+        with self.lock:
+            result = self.series[metric].query(since, until, max_points)
+        return {
+            "metric": metric,
+            "resolution": result["resolution"],
+            "timestamps": (result["timestamps"] + self.clock_offset).tolist(),
+            "values": result["values"].tolist(),
+            "min": result["min"].tolist(),
+            "max": result["max"].tolist(),
+            "count": result["count"].astype(int).tolist(),
+        }
@@ -30,12 +30,12 @@ export function ProcessListView() {
     let intervalId: NodeJS.Timeout;
 
     let asyncBridge = async () => {
-      let ret = await fetch("http://127.0.0.1:8000/processes");
+      let ret = await fetch("http://127.0.0.1:8000/processes?human=true");
       let retJson = await ret.json();
 
       setData(retJson);
       intervalId = setInterval(async () => {
-        let ret = await fetch("http://127.0.0.1:8000/processes");
+        let ret = await fetch("http://127.0.0.1:8000/processes?human=true");
         let retJson = await ret.json();
 
         setData(retJson);
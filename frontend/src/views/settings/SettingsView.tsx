@@ -38,6 +38,10 @@ const formSchema = z.object({
   disk_threshold: z.coerce.number().min(0).max(100).default(80),
   network_threshold: z.coerce.number().min(0).max(10000000).default(1000000),
   gpu_threshold: z.coerce.number().min(0).max(100).default(80),
+  steal_threshold: z.coerce.number().min(0).max(100).default(10),
+  iowait_threshold: z.coerce.number().min(0).max(100).default(20),
+  pressure_threshold: z.coerce.number().min(0).max(100).default(10),
+  major_fault_threshold: z.coerce.number().min(0).max(1000000).default(1000),
   check_interval: z.coerce.number().min(0).max(100).default(10),
 });
 
@@ -54,6 +58,10 @@ export function SettingsView() {
       disk_threshold: settings.disk_threshold,
       network_threshold: settings.network_threshold,
       gpu_threshold: settings.gpu_threshold,
+      steal_threshold: settings.steal_threshold,
+      iowait_threshold: settings.iowait_threshold,
+      pressure_threshold: settings.pressure_threshold,
+      major_fault_threshold: settings.major_fault_threshold,
       check_interval: settings.check_interval,
     },
   });
@@ -191,6 +199,74 @@ export function SettingsView() {
                     )}
                   />
 
+                  <FormField
+                    control={form.control}
+                    name="steal_threshold"
+                    render={({ field }) => (
+                      <FormItem className="w-1/3">
+                        <FormLabel>CPU Steal Threshold</FormLabel>
+                        <FormControl>
+                          <Input type="number" min={0} max={100} {...field} />
+                        </FormControl>
+                        <FormDescription>
+                          The CPU steal time % to notify at
+                        </FormDescription>
+                        <FormMessage />
+                      </FormItem>
+                    )}
+                  />
+
+                  <FormField
+                    control={form.control}
+                    name="iowait_threshold"
+                    render={({ field }) => (
+                      <FormItem className="w-1/3">
+                        <FormLabel>CPU IOWait Threshold</FormLabel>
+                        <FormControl>
+                          <Input type="number" min={0} max={100} {...field} />
+                        </FormControl>
+                        <FormDescription>
+                          The CPU iowait % to notify at
+                        </FormDescription>
+                        <FormMessage />
+                      </FormItem>
+                    )}
+                  />
+
+                  <FormField
+                    control={form.control}
+                    name="pressure_threshold"
+                    render={({ field }) => (
+                      <FormItem className="w-1/3">
+                        <FormLabel>Pressure Threshold</FormLabel>
+                        <FormControl>
+                          <Input type="number" min={0} max={100} {...field} />
+                        </FormControl>
+                        <FormDescription>
+                          The % of time tasks stall on CPU, memory or I/O to notify at
+                        </FormDescription>
+                        <FormMessage />
+                      </FormItem>
+                    )}
+                  />
+
+                  <FormField
+                    control={form.control}
+                    name="major_fault_threshold"
+                    render={({ field }) => (
+                      <FormItem className="w-1/3">
+                        <FormLabel>Major Fault Threshold</FormLabel>
+                        <FormControl>
+                          <Input type="number" min={0} max={1000000} {...field} />
+                        </FormControl>
+                        <FormDescription>
+                          The major page faults per second to notify at
+                        </FormDescription>
+                        <FormMessage />
+                      </FormItem>
+                    )}
+                  />
+
                   <FormField
                     control={form.control}
                     name="check_interval"
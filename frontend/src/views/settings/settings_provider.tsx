@@ -11,6 +11,10 @@ export function SettingsProvider({ children }: { children: ReactNode }) {
     disk_threshold: 80,
     network_threshold: 1000000,
     gpu_threshold: 80,
+    steal_threshold: 10,
+    iowait_threshold: 20,
+    pressure_threshold: 10,
+    major_fault_threshold: 1000,
     check_interval: 10,
     theme: "Catpuccin",
   });
@@ -8,6 +8,7 @@ from .notification_api_handler import (
     fetch_cpu_usage,
     fetch_memory_percent,
     fetch_network_bandwidth,
+    fetch_snapshot,
 )
 from collections import deque
 
@@ -96,8 +97,9 @@ def send_alert(alert_type, message):
     connection.close()
 
 
-def check_cpu():
-    cpu_usage = fetch_cpu_usage()
+def check_cpu(cpu_usage=None):
+    if cpu_usage is None:
+        cpu_usage = fetch_cpu_usage()
     cpu_usage_history.append(cpu_usage)
     if len(cpu_usage_history) == cpu_usage_history.maxlen and all(
         usage > settings["high_cpu_threshold"] for usage in cpu_usage_history
@@ -110,8 +112,9 @@ def check_cpu():
         print("Sent high CPU alert")
 
 
-def check_ram():
-    ram_usage = fetch_memory_percent()
+def check_ram(ram_usage=None):
+    if ram_usage is None:
+        ram_usage = fetch_memory_percent()
     ram_usage_history.append(ram_usage)
     if len(ram_usage_history) == ram_usage_history.maxlen and all(
         usage > settings["high_ram_threshold"] for usage in ram_usage_history
@@ -123,9 +126,10 @@ def check_ram():
         print(f"Sent high RAM alert {ram_usage}")
 
 
-def check_network():
+def check_network(bandwidth_usage=None):
     global prev_bytes_sent, prev_bytes_recv
-    bandwidth_usage = fetch_network_bandwidth()
+    if bandwidth_usage is None:
+        bandwidth_usage = fetch_network_bandwidth()
     if bandwidth_usage is not None:
         sent_in_interval = bandwidth_usage["bytes_sent"] - prev_bytes_sent
         recv_in_interval = bandwidth_usage["bytes_received"] - prev_bytes_recv
@@ -144,13 +148,33 @@ def check_network():
         print("Error: Unable to fetch network stats for this interval")
 
 
+def check_all():
+    # One round trip for every reading checked this interval.
+    values = fetch_snapshot(
+        ["cpu.usage", "memory.percent", "net.bytes_sent", "net.bytes_received"]
+    )
+    if values is None:
+        print("Error: Unable to fetch snapshot for this interval")
+        return
+    # A reading the server could not take is None, skip its check.
+    if values["cpu.usage"] is not None:
+        check_cpu(values["cpu.usage"])
+    if values["memory.percent"] is not None:
+        check_ram(values["memory.percent"])
+    if values["net.bytes_sent"] is not None and values["net.bytes_received"] is not None:
+        check_network(
+            {
+                "bytes_sent": values["net.bytes_sent"],
+                "bytes_received": values["net.bytes_received"],
+            }
+        )
+
+
 def start_monitoring():
 
     fetch_settings()
 
-    schedule.every(settings["check_interval"]).seconds.do(check_cpu)
-    schedule.every(settings["check_interval"]).seconds.do(check_ram)
-    schedule.every(settings["check_interval"]).seconds.do(check_network)
+    schedule.every(settings["check_interval"]).seconds.do(check_all)
 
     # Periodically refresh settings from the API
     schedule.every(60).seconds.do(fetch_settings)
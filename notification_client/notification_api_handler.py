@@ -31,3 +31,15 @@ def fetch_network_bandwidth():
     except Exception as e:
         print(f"Error fetching network bandwidth: {e}")
         return None
+
+
+def fetch_snapshot(fields):
+    try:
+        response = requests.get(
+            f"{BASE_URL}/snapshot", params={"fields": ",".join(fields)}
+        )
+        response.raise_for_status()
+        return response.json()["values"]
+    except Exception as e:
+        print(f"Error fetching snapshot: {e}")
+        return None
@@ -2,6 +2,7 @@ import pytest
 import psutil
 import os
 import io
+import numpy as np
 from collections import namedtuple
 from backend.cpu_handler import CPU
 
@@ -177,5 +178,72 @@ def test_get_uptime(mock_uptime):
     assert result == 3600.0
 
 
+def test_compute_cpu_stats():
+    """Test compute_cpu_stats derives every figure from one delta."""
+    fields = ("user", "system", "idle", "iowait", "steal")
+    previous = np.zeros((2, 5))
+    current = np.array(
+        [
+            [10.0, 10.0, 70.0, 5.0, 5.0],
+            [50.0, 20.0, 30.0, 0.0, 0.0],
+        ]
+    )
+    result = CPU.compute_cpu_stats(previous, current, fields)
+    assert result["per_cpu_usage"] == [25.0, 70.0]
+    assert result["core_utilization"] == [25.0, 70.0]
+    assert result["usage"] == 47.5
+    assert result["breakdown"] == {
+        "user": 30.0,
+        "nice": 0.0,
+        "system": 15.0,
+        "idle": 50.0,
+        "iowait": 2.5,
+        "irq": 0.0,
+        "softirq": 0.0,
+        "steal": 2.5,
+        "guest": 0.0,
+    }
+    assert result["per_cpu_breakdown"]["user"] == [10.0, 50.0]
+    assert result["per_cpu_breakdown"]["steal"] == [5.0, 0.0]
+    assert result["per_cpu_breakdown"]["idle"] == [70.0, 30.0]
+
+
+def test_compute_cpu_stats_ignores_guest():
+    """Test compute_cpu_stats does not count guest time twice."""
+    fields = ("user", "idle", "guest", "guest_nice")
+    previous = np.zeros((1, 4))
+    current = np.array([[50.0, 50.0, 50.0, 0.0]])
+    result = CPU.compute_cpu_stats(previous, current, fields)
+    assert result["usage"] == 50.0
+    # Guest time is reported, as the share of the time it took.
+    assert result["breakdown"]["guest"] == 50.0
+    # Fields missing on this platform are reported as zero.
+    assert result["breakdown"]["iowait"] == 0.0
+
+
+def test_compute_cpu_stats_without_baseline():
+    """Test compute_cpu_stats on the first reading or after CPU hotplug."""
+    fields = ("user", "idle")
+    current = np.array([[10.0, 90.0], [20.0, 80.0]])
+    for previous in (None, np.zeros((1, 2))):
+        result = CPU.compute_cpu_stats(previous, current, fields)
+        assert result["usage"] == 0.0
+        assert result["per_cpu_usage"] == [0.0, 0.0]
+
+
+def test_get_per_cpu_times(monkeypatch):
+    """Test get_per_cpu_times returns one row per core."""
+    CpuTimes = namedtuple("CpuTimes", ["user", "idle"])
+    monkeypatch.setattr(
+        psutil,
+        "cpu_times",
+        lambda percpu=False: [CpuTimes(1.0, 2.0), CpuTimes(3.0, 4.0)],
+    )
+    times, fields = CPU.get_per_cpu_times()
+    assert fields == ("user", "idle")
+    assert times.shape == (2, 2)
+    assert times[1, 0] == 3.0
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -261,5 +261,19 @@ def test_get_disk_io_counters_no_io(mock_disk_io_counters_no_io):
     assert result == expected
 
 
+def test_compute_active_time_percentage():
+    """Test compute_active_time_percentage from two counter readings."""
+    previous = {"read_time": 100, "write_time": 200}
+    current = {"read_time": 150, "write_time": 450}
+    result = Disk.compute_active_time_percentage(previous, current, 1.0)
+    assert result == 30.0
+
+
+def test_compute_active_time_percentage_no_elapsed():
+    """Test compute_active_time_percentage when no time has passed."""
+    counters = {"read_time": 100, "write_time": 200}
+    assert Disk.compute_active_time_percentage(counters, counters, 0) == 0.0
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -0,0 +1,77 @@
+import random
+from types import SimpleNamespace
+import pytest
+from backend.heavy_hitters import HeavyHitters, SpaceSaving
+
+
+def entry(pid, cpu=0.0, rss=0, io=0):
+    return SimpleNamespace(
+        pid=pid,
+        create_time=100.0,
+        name=f"p{pid}",
+        cpu_delta=cpu,
+        rss_growth=rss,
+        io_delta=io,
+    )
+
+
+# Test cases
+def test_space_saving_exact_under_capacity():
+    """Test that counts are exact while there is room for every key."""
+    summary = SpaceSaving(capacity=4)
+    for key, weight in [("a", 1), ("b", 2), ("a", 3)]:
+        summary.add(key, weight)
+    assert summary.top(2) == [("a", [4, 0.0]), ("b", [2, 0.0])]
+
+
+def test_space_saving_keeps_heavy_hitters():
+    """Test that heavy keys survive a long tail within the error bound."""
+    random.seed(1)
+    summary = SpaceSaving(capacity=16)
+    truth = {}
+    stream = [("heavy1", 50.0), ("heavy2", 30.0)] * 20
+    stream += [(f"tail{i}", random.random()) for i in range(2000)]
+    random.shuffle(stream)
+    for key, weight in stream:
+        truth[key] = truth.get(key, 0) + weight
+        summary.add(key, weight)
+    (first, (count1, error1)), (second, _) = summary.top(2)
+    assert (first, second) == ("heavy1", "heavy2")
+    assert count1 - error1 <= truth["heavy1"] <= count1
+    assert len(summary.counters) == 16
+
+
+def test_windows():
+    """Test that each window only covers its own time span."""
+    top = HeavyHitters(capacity=8)
+    top.observe(0, [entry(1, cpu=5.0, io=100)])
+    # Ten minutes later: pid 1 has left the 5 minute window.
+    top.observe(600, [entry(2, cpu=1.0, rss=4096)])
+    assert [p["pid"] for p in top.top("cpu", "5m")] == [2]
+    assert [p["pid"] for p in top.top("cpu", "1h")] == [1, 2]
+    assert top.top("cpu", "1h")[0]["value"] == 5.0
+    assert [p["pid"] for p in top.top("io", "24h")] == [1]
+    assert top.top("rss_growth", "5m")[0] == {
+        "pid": 2,
+        "name": "p2",
+        "start_time": 100.0,
+        "value": 4096,
+        "error": 0.0,
+    }
+    # Two hours later only the day window remembers them.
+    top.observe(7800, [entry(3, cpu=0.5)])
+    assert [p["pid"] for p in top.top("cpu", "1h")] == [3]
+    assert [p["pid"] for p in top.top("cpu", "24h")] == [1, 2, 3]
+
+
+def test_unknown_metric_or_window():
+    """Test that unknown metrics and windows are refused."""
+    top = HeavyHitters()
+    with pytest.raises(ValueError):
+        top.top("gpu", "5m")
+    with pytest.raises(ValueError):
+        top.top("cpu", "1w")
+
+
+if __name__ == "__main__":
+    pytest.main()
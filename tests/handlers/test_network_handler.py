@@ -154,5 +154,22 @@ def test_get_primary_connection_type_ethernet(
     assert result == "Ethernet"
 
 
+def test_compute_throughput():
+    """Test compute_throughput from two bandwidth readings."""
+    previous = {"bytes_sent": 1000, "bytes_received": 2000}
+    current = {"bytes_sent": 3000, "bytes_received": 6000}
+    result = Network.compute_throughput(previous, current, 2.0)
+    assert result == {"sent": 1000.0, "recv": 2000.0}
+
+
+def test_compute_throughput_no_elapsed():
+    """Test compute_throughput when no time has passed."""
+    counters = {"bytes_sent": 1000, "bytes_received": 2000}
+    assert Network.compute_throughput(counters, counters, 0) == {
+        "sent": 0.0,
+        "recv": 0.0,
+    }
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -0,0 +1,96 @@
+import pytest
+from backend.pressure_handler import Pressure
+
+PSI = (
+    "some avg10=1.50 avg60=0.75 avg300=0.10 total=123456\n"
+    "full avg10=0.50 avg60=0.25 avg300=0.00 total=45678\n"
+)
+
+
+@pytest.fixture
+def proc(tmp_path):
+    """Fixture to build a /proc with pressure files and a vmstat."""
+    (tmp_path / "pressure").mkdir()
+    for resource in ("cpu", "memory", "io"):
+        (tmp_path / "pressure" / resource).write_text(PSI)
+    (tmp_path / "vmstat").write_text(
+        "nr_free_pages 1000\n"
+        "pswpin 10\n"
+        "pswpout 20\n"
+        "pgfault 5000\n"
+        "pgmajfault 30\n"
+        "pgscan_kswapd 100\n"
+        "pgscan_direct 40\n"
+        "pgscan_direct_throttle 7\n"
+    )
+    return tmp_path
+
+
+def test_parse_pressure():
+    """Test parse_pressure reads both lines of a pressure file."""
+    result = Pressure.parse_pressure(PSI)
+    assert result["some"] == {
+        "avg10": 1.5,
+        "avg60": 0.75,
+        "avg300": 0.1,
+        "total": 123456,
+    }
+    assert result["full"]["total"] == 45678
+
+
+def test_get_pressure(proc):
+    """Test get_pressure reads cpu, memory and io."""
+    result = Pressure.get_pressure(root=str(proc))
+    assert set(result) == {"cpu", "memory", "io"}
+    assert result["memory"]["some"]["avg10"] == 1.5
+
+
+def test_get_pressure_unavailable(tmp_path):
+    """Test get_pressure without PSI support."""
+    assert Pressure.get_pressure(root=str(tmp_path)) is None
+
+
+def test_get_vmstat_counters(proc):
+    """Test get_vmstat_counters picks the fault, swap and scan counters."""
+    assert Pressure.get_vmstat_counters(root=str(proc)) == {
+        "pgfault": 5000,
+        "pgmajfault": 30,
+        "pswpin": 10,
+        "pswpout": 20,
+        "pgscan_kswapd": 100,
+        "pgscan_direct": 40,
+    }
+    assert Pressure.get_vmstat_counters(root=str(proc / "missing")) is None
+
+
+def test_get_vmstat_counters_per_zone(tmp_path):
+    """Test the per-zone scan counters of older kernels are summed."""
+    (tmp_path / "vmstat").write_text(
+        "pgscan_kswapd_dma 1\n"
+        "pgscan_kswapd_normal 10\n"
+        "pgscan_kswapd_movable 100\n"
+        "pgscan_direct_normal 5\n"
+    )
+    counters = Pressure.get_vmstat_counters(root=str(tmp_path))
+    assert counters["pgscan_kswapd"] == 111
+    assert counters["pgscan_direct"] == 5
+
+
+def test_compute_vmstat_rates():
+    """Test compute_vmstat_rates converts counter deltas to rates."""
+    previous = dict.fromkeys(
+        ("pgfault", "pgmajfault", "pswpin", "pswpout", "pgscan_kswapd", "pgscan_direct"),
+        100,
+    )
+    current = dict(previous, pgfault=300, pgmajfault=110)
+    rates = Pressure.compute_vmstat_rates(previous, current, 2.0)
+    assert rates["pgfault"] == 100.0
+    assert rates["pgmajfault"] == 5.0
+    assert rates["pswpout"] == 0.0
+    # No baseline or no elapsed time yields zero rates.
+    assert Pressure.compute_vmstat_rates(None, current, 2.0)["pgfault"] == 0.0
+    assert Pressure.compute_vmstat_rates(previous, current, 0)["pgfault"] == 0.0
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,542 @@
+import asyncio
+import contextlib
+import os
+import subprocess
+import sys
+import time
+import pytest
+import psutil
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from backend.proccess_handler import (
+    MAX_KILL_GRACE,
+    MemoryDetails,
+    Process,
+    ProcessEntry,
+    ProcessKiller,
+    ProcessTable,
+)
+from backend.procfs import ProcfsScanner
+
+pcputimes = namedtuple("pcputimes", ["user", "system"])
+pmem = namedtuple("pmem", ["rss"])
+puids = namedtuple("puids", ["real", "effective", "saved"])
+pio = namedtuple("pio", ["read_count", "write_count", "read_bytes", "write_bytes"])
+
+
+class FakeProcess:
+    """Stands in for psutil.Process, reading from the fake process list."""
+
+    def __init__(self, processes, pid):
+        if pid not in processes:
+            raise psutil.NoSuchProcess(pid)
+        self.processes = processes
+        self.pid = pid
+        self.started = processes[pid]["create_time"]
+
+    def info(self):
+        # Like /proc, a recycled pid silently reads the new process.
+        info = self.processes.get(self.pid)
+        if info is None:
+            raise psutil.NoSuchProcess(self.pid)
+        return info
+
+    def create_time(self):
+        return self.started
+
+    def oneshot(self):
+        return contextlib.nullcontext()
+
+    def cpu_times(self):
+        return pcputimes(self.info()["cpu"], 0.0)
+
+    def name(self):
+        return self.info()["name"]
+
+    def status(self):
+        return "running"
+
+    def memory_info(self):
+        return pmem(2048)
+
+    def cmdline(self):
+        return self.info().get("cmdline", [self.info()["name"]])
+
+    def ppid(self):
+        return self.info().get("ppid", 1)
+
+    def num_threads(self):
+        return self.info().get("threads", 1)
+
+    def uids(self):
+        return puids(0, 0, 0)
+
+    def io_counters(self):
+        return pio(0, 0, self.info().get("io", 0), 0)
+
+    def num_fds(self):
+        self.info()["reads"] = self.info().get("reads", 0) + 1
+        return 4
+
+
+@pytest.fixture
+def processes(monkeypatch):
+    """Fixture replacing the process list with a mutable fake one."""
+    processes = {
+        1: {"name": "init", "create_time": 100.0, "cpu": 10.0},
+        2: {"name": "worker", "create_time": 200.0, "cpu": 5.0},
+    }
+    clock = [0.0]
+    monkeypatch.setattr(psutil, "pids", lambda: list(processes))
+    monkeypatch.setattr(psutil, "Process", lambda pid: FakeProcess(processes, pid))
+    monkeypatch.setattr("backend.proccess_handler.time.monotonic", lambda: clock[0])
+    return processes, clock
+
+
+# Test cases
+def test_cpu_usage_from_time_deltas(processes):
+    """Test that CPU% is derived from CPU time used between refreshes."""
+    procs, clock = processes
+    table = ProcessTable()
+    table.refresh()
+    assert {p["pid"]: p["cpu_usage"] for p in table.list()} == {1: 0.0, 2: 0.0}
+    clock[0] = 2.0
+    procs[1]["cpu"] += 1.0
+    procs[2]["cpu"] += 0.5
+    table.refresh()
+    assert {p["pid"]: p["cpu_usage"] for p in table.list()} == {1: 50.0, 2: 25.0}
+
+
+def test_handles_kept_between_refreshes(processes):
+    """Test that process handles are created once per process."""
+    procs, clock = processes
+    table = ProcessTable()
+    table.refresh()
+    entry = table.entries[1]
+    clock[0] = 1.0
+    table.refresh()
+    assert table.entries[1] is entry
+    assert entry.key == (1, 100.0)
+
+
+def test_exited_processes_are_evicted(processes):
+    """Test that processes that exited disappear from the table."""
+    procs, clock = processes
+    table = ProcessTable()
+    table.refresh()
+    del procs[2]
+    procs[3] = {"name": "new", "create_time": 300.0, "cpu": 0.0}
+    clock[0] = 1.0
+    table.refresh()
+    assert sorted(table.entries) == [1, 3]
+    assert sorted(p["pid"] for p in table.list()) == [1, 3]
+
+
+def test_recycled_pid_is_a_new_process(processes):
+    """Test that a pid reused by another process gets a fresh entry."""
+    procs, clock = processes
+    table = ProcessTable()
+    table.refresh()
+    procs[2] = {"name": "other", "create_time": 500.0, "cpu": 0.1}
+    clock[0] = 1.0
+    table.refresh()
+    assert table.entries[2].key == (2, 500.0)
+    assert table.get(2)["name"] == "other"
+    assert table.get(2)["cpu_usage"] == 0.0
+
+
+def test_get_process(processes):
+    """Test looking up single processes without blocking."""
+    procs, clock = processes
+    table = ProcessTable()
+    table.refresh()
+    process = table.get(1)
+    assert process["name"] == "init"
+    assert process["memory_usage"] == 2048
+    assert process["start_time"] == 100.0
+    assert table.get(1, human=True)["memory_usage"] == "2.00 KB"
+    procs[7] = {"name": "late", "create_time": 700.0, "cpu": 1.0}
+    assert table.get(7)["cpu_usage"] == 0.0
+    assert table.get(99) is None
+
+
+def test_list_top_n(processes, monkeypatch):
+    """Test sorting, filtering and pagination of the process list."""
+    procs, clock = processes
+    for pid in range(3, 11):
+        procs[pid] = {"name": f"job{pid}", "create_time": 300.0, "cpu": 0.0}
+    table = ProcessTable()
+    table.refresh()
+    for pid, entry in table.entries.items():
+        entry.cpu_usage = float(pid)
+    sorted_calls = []
+    monkeypatch.setattr(
+        "backend.proccess_handler.heapq.nlargest",
+        lambda n, *args, **kwargs: sorted_calls.append(n)
+        or sorted(*args, reverse=True, **kwargs)[:n],
+    )
+    rows = table.list(sort="cpu", limit=3, offset=1)
+    assert [row["pid"] for row in rows] == [9, 8, 7]
+    assert sorted_calls == [4]
+    rows = table.list(sort="pid", order="asc", name="JOB")
+    assert [row["pid"] for row in rows] == list(range(3, 11))
+    assert table.list(name="init", human=True)[0]["memory_usage"] == "2.00 KB"
+    with pytest.raises(ValueError):
+        table.list(sort="colour")
+    with pytest.raises(ValueError):
+        table.list(order="sideways")
+
+
+def test_bytes_to_human():
+    """Test the human-readable size formatting."""
+    assert Process.bytes_to_human(512) == "512.00 B"
+    assert Process.bytes_to_human(3 * 1024 ** 3) == "3.00 GB"
+
+
+def test_refresh_publishes_delta(processes):
+    """Test that each refresh reports added, removed and changed records."""
+    procs, clock = processes
+    table = ProcessTable()
+    first = table.refresh()
+    assert first["seq"] == 1 and first["base"] == 0
+    assert sorted(r["pid"] for r in first["added"]) == [1, 2]
+    del procs[2]
+    procs[3] = {"name": "new", "create_time": 300.0, "cpu": 0.0}
+    procs[1]["cpu"] += 1.0
+    clock[0] = 1.0
+    delta = table.refresh()
+    assert delta["base"] == 1
+    assert [r["pid"] for r in delta["added"]] == [3]
+    assert delta["removed"] == [[2, 200.0]]
+    assert [(r["pid"], r["cpu_usage"]) for r in delta["changed"]] == [(1, 100.0)]
+    clock[0] = 2.0
+    procs[1]["cpu"] += 1.0
+    assert table.refresh()["changed"] == []
+
+
+def test_on_snapshot_refreshes_in_the_background(processes):
+    """Test that the sampler listener schedules the refresh, skipping ticks
+    while one is still running."""
+    table = ProcessTable()
+    deltas = []
+
+    async def on_delta(delta):
+        deltas.append(delta)
+
+    table.add_listener(on_delta)
+
+    async def run():
+        await table.on_snapshot(None)
+        assert deltas == []
+        first = table.update_task
+        await first
+        with table.refreshing:
+            await table.on_snapshot(None)
+            assert table.update_task is first
+
+    asyncio.run(run())
+    assert [delta["seq"] for delta in deltas] == [1]
+
+
+def make_proc_tree(root, count):
+    """Writes a synthetic /proc with count processes."""
+    (root / "stat").write_text("cpu  1 2 3 4\nbtime 1700000000\n")
+    for pid in range(1, count + 1):
+        name = "long-running-worker" if pid % 100 == 0 else f"job {pid}"
+        comm = name[:15]
+        fields = ["S", "1"] + ["0"] * 9 + [str(pid * 3), str(pid)] + ["0"] * 4
+        fields += ["3", "0", str(1000 + pid), "123456", "789"] + ["0"] * 30
+        path = root / str(pid)
+        path.mkdir()
+        uid = path.stat().st_uid
+        (path / "stat").write_text(f"{pid} ({comm}) {' '.join(fields)}\n")
+        (path / "statm").write_text(f"5000 {pid} 100 10 0 300 0\n")
+        (path / "status").write_text(
+            f"Name:\t{comm}\nUid:\t{uid}\t{uid}\t{uid}\t{uid}\nThreads:\t3\n"
+        )
+        (path / "io").write_text(
+            f"rchar: 1\nwchar: 2\nsyscr: 3\nsyscw: 4\n"
+            f"read_bytes: {pid * 512}\nwrite_bytes: 0\n"
+        )
+        (path / "cgroup").write_text(f"0::/app/{pid % 3}\n")
+        (path / "cmdline").write_bytes(f"/usr/bin/{name}\0--flag\0".encode())
+
+
+def test_procfs_scanner(tmp_path):
+    """Test parsing a synthetic /proc tree."""
+    make_proc_tree(tmp_path, 100)
+    (tmp_path / "self").mkdir()
+    scanner = ProcfsScanner(str(tmp_path))
+    samples = scanner.scan()
+    assert sorted(samples) == list(range(1, 101))
+    sample = samples[7]
+    assert sample.name == "job 7"
+    assert sample.status == "sleeping"
+    assert sample.cpu_time == 28 / scanner.clock_ticks
+    assert sample.rss == 7 * scanner.page_size
+    assert sample.create_time == 1007 / scanner.clock_ticks + 1700000000
+    assert (sample.ppid, sample.num_threads) == (1, 3)
+    assert sample.io == 7 * 512
+    assert samples[100].name == "long-running-worker"
+    (tmp_path / "5" / "statm").write_text("garbage")
+    assert scanner.scan()[5] is None
+
+
+def psutil_and_procfs_tables(root, monkeypatch):
+    """Returns a psutil and a procfs ProcessTable reading the same tree."""
+    monkeypatch.setattr(psutil, "PROCFS_PATH", str(root))
+    # psutil caches the boot time of the first procfs it reads.
+    monkeypatch.setattr(psutil._pslinux, "BOOT_TIME", None)
+    return {"psutil": ProcessTable(), "procfs": ProcessTable(ProcfsScanner(str(root)))}
+
+
+def test_scanner_matches_psutil(tmp_path, monkeypatch):
+    """Test that the procfs scanner builds the same table as psutil."""
+    make_proc_tree(tmp_path, 200)
+    rows = {}
+    for label, table in psutil_and_procfs_tables(tmp_path, monkeypatch).items():
+        table.refresh()
+        table.refresh()
+        rows[label] = table.list(
+            sort="pid",
+            order="asc",
+            fields="pid,name,status,cpu_usage,rss,start_time,ppid,num_threads,user",
+        )
+        # Groups tied on cpu_usage come in scan order, compare them by name.
+        groups = table.groups.totals("cgroup")
+        rows[label].append(sorted(groups, key=lambda g: g["group"]))
+    assert rows["procfs"] == rows["psutil"]
+
+
+@pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS=1")
+def test_scanner_is_faster(tmp_path, monkeypatch):
+    """Benchmark a refresh of 2000 processes with procfs and psutil."""
+    make_proc_tree(tmp_path, 2000)
+    timings = {}
+    for label, table in psutil_and_procfs_tables(tmp_path, monkeypatch).items():
+        table.refresh()
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            table.refresh()
+            best = min(best, time.perf_counter() - start)
+        timings[label] = best
+    assert timings["procfs"] < timings["psutil"]
+
+
+def test_list_selected_columns(processes):
+    """Test that only the requested columns are returned and read."""
+    procs, clock = processes
+    table = ProcessTable()
+    table.refresh()
+    assert "reads" not in procs[1]
+    rows = table.list(sort="pid", order="asc", fields="pid,rss,num_fds")
+    assert rows[0] == {"pid": 1, "rss": 2048, "num_fds": 4}
+    assert procs[1]["reads"] == 1
+    rows = table.list(sort="pid", limit=1, fields="pid,num_fds")
+    assert rows == [{"pid": 2, "num_fds": 4}]
+    assert procs[1]["reads"] == 1
+    assert table.get(1, fields="name") == {"name": "init"}
+    with pytest.raises(ValueError):
+        table.list(fields="pid,colour")
+
+
+def test_groups_follow_the_table(processes):
+    """Test that group membership is updated as processes come and go."""
+    procs, clock = processes
+    for pid in range(3, 6):
+        procs[pid] = {"name": "gunicorn", "create_time": 300.0, "cpu": 0.0}
+        procs[pid]["ppid"] = 3
+        procs[pid]["threads"] = 2
+    table = ProcessTable()
+    table.refresh()
+    for pid in range(3, 6):
+        procs[pid]["cpu"] += 0.5
+    clock[0] = 1.0
+    table.refresh()
+    groups = table.groups.totals("name")
+    assert groups[0] == {
+        "group": "gunicorn",
+        "count": 3,
+        "cpu_usage": 150.0,
+        "rss": 3 * 2048,
+        "num_threads": 6,
+        "pids": [3, 4, 5],
+    }
+    by_ppid = {g["group"]: g["pids"] for g in table.groups.totals("ppid")}
+    assert by_ppid == {1: [1, 2], 3: [3, 4, 5]}
+    filed = table.groups.members["name"]["gunicorn"]
+    del procs[4]
+    procs[5]["name"] = "celery"
+    clock[0] = 2.0
+    table.refresh()
+    assert table.groups.members["name"]["gunicorn"] is filed
+    assert sorted(filed) == [3]
+    assert table.groups.members["name"]["celery"].keys() == {5}
+    # Groups are named as text, ppid groups are matched as numbers.
+    assert table.groups.pids("ppid", "3") == {3: 300.0, 5: 300.0}
+    assert table.groups.pids("name", "celery") == {5: 300.0}
+    assert table.groups.pids("ppid", "init") == {}
+    with pytest.raises(ValueError):
+        table.groups.totals("colour")
+    with pytest.raises(ValueError):
+        table.groups.pids("colour", "red")
+
+
+def test_search_follows_the_table(processes):
+    """Test that the search index tracks starts, exits and execs."""
+    procs, clock = processes
+    procs[3] = {"name": "python3", "create_time": 300.0, "cpu": 0.0}
+    procs[3]["cmdline"] = ["python3", "-m", "http.server"]
+    table = ProcessTable()
+    table.refresh()
+    assert [r["pid"] for r in table.search(name="PY")] == [3]
+    assert [r["pid"] for r in table.search(cmdline="http.serv")] == [3]
+    procs[2]["name"] = "python3"
+    procs[2]["cmdline"] = ["python3", "worker.py"]
+    del procs[3]
+    clock[0] = 1.0
+    table.refresh()
+    assert table.search(cmdline="http") == []
+    rows = table.search(name="python", fields="pid,name")
+    assert rows == [{"pid": 2, "name": "python3"}]
+
+
+def spawn(ignore_term=False):
+    """Starts a sleeping child, optionally one that ignores SIGTERM."""
+    code = "import signal, time\n"
+    if ignore_term:
+        code += "signal.signal(signal.SIGTERM, signal.SIG_IGN)\n"
+    code += "print('ready', flush=True)\ntime.sleep(30)\n"
+    child = subprocess.Popen([sys.executable, "-c", code], stdout=subprocess.PIPE)
+    child.stdout.readline()
+    return child
+
+
+def test_bulk_kill_escalates():
+    """Test that a kill job terminates in bulk and escalates to SIGKILL."""
+    polite = [spawn() for _ in range(3)]
+    stubborn = spawn(ignore_term=True)
+    pids = [c.pid for c in polite] + [stubborn.pid, 2 ** 30, os.getpid()]
+
+    async def run():
+        killer = ProcessKiller()
+        job = killer.start(pids, grace=0.5)
+        assert killer.get(job.id) is job
+        start = time.perf_counter()
+        while not job.done:
+            await job.wait()
+        return job, time.perf_counter() - start
+
+    try:
+        job, elapsed = asyncio.run(run())
+    finally:
+        for child in polite + [stubborn]:
+            child.kill()
+            child.wait()
+    assert [job.results[c.pid] for c in polite] == ["terminated"] * 3
+    assert job.results[stubborn.pid] == "killed"
+    assert job.results[2 ** 30] == "not_found"
+    assert job.results[os.getpid()] == "refused"
+    # Exits are awaited together, not one grace period per process.
+    assert elapsed < 2.0
+
+
+def test_kill_jobs_leave_the_executor_free():
+    """Test that waiting out a grace period holds no executor thread."""
+    stubborn = [spawn(ignore_term=True) for _ in range(2)]
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=1))
+        killer = ProcessKiller()
+        jobs = [killer.start([c.pid], grace=2.0) for c in stubborn]
+        await asyncio.sleep(0.3)
+        start = time.perf_counter()
+        await loop.run_in_executor(None, time.sleep, 0)
+        waited = time.perf_counter() - start
+        for job in jobs:
+            while not job.done:
+                await job.wait()
+        return jobs, waited
+
+    try:
+        jobs, waited = asyncio.run(run())
+    finally:
+        for child in stubborn:
+            child.kill()
+            child.wait()
+    assert waited < 0.5
+    assert [job.results[c.pid] for job, c in zip(jobs, stubborn)] == ["killed"] * 2
+    with pytest.raises(ValueError):
+        ProcessKiller().start([1], grace=MAX_KILL_GRACE + 1)
+
+
+def test_heavy_hitters_fed_by_refresh(processes):
+    """Test that refreshes feed CPU, RSS growth and I/O deltas."""
+    procs, clock = processes
+    table = ProcessTable()
+    table.refresh()
+    procs[1]["cpu"] += 0.2
+    procs[2]["cpu"] += 0.7
+    procs[2]["io"] = 4096
+    clock[0] = 1.0
+    table.refresh()
+    top = table.heavy_hitters.top("cpu", "5m")
+    assert [(p["pid"], round(p["value"], 6)) for p in top] == [(2, 0.7), (1, 0.2)]
+    assert [p["pid"] for p in table.heavy_hitters.top("io", "5m")] == [2]
+    assert table.heavy_hitters.top("rss_growth", "5m") == []
+
+
+SMAPS_ROLLUP = """55d0-7ffe ---p 00000000 00:00 0  [rollup]
+Rss:                1320 kB
+Pss:                 458 kB
+Shared_Clean:       1172 kB
+Private_Clean:        44 kB
+Private_Dirty:       104 kB
+Private_Hugetlb:       0 kB
+Swap:                 12 kB
+"""
+
+
+def test_memory_details_cached_in_background(tmp_path):
+    """Test that USS/PSS/swap are collected off-thread and cached."""
+    (tmp_path / "42").mkdir()
+    (tmp_path / "42" / "smaps_rollup").write_text(SMAPS_ROLLUP)
+    memory = MemoryDetails(str(tmp_path), ttl=60)
+    entry = ProcessEntry(42, 100.0)
+    assert memory.lookup(entry) is None
+    memory.executor.shutdown(wait=True)
+    expected = {"uss": 148 * 1024, "pss": 458 * 1024, "swap": 12 * 1024}
+    assert memory.lookup(entry) == expected
+    # Fresh values are served from the cache without queueing a read.
+    assert not memory.pending
+    row = Process.format_row(entry, True, ("pid", "pss", "uss"), memory)
+    assert row == {"pid": 42, "pss": "458.00 KB", "uss": "148.00 KB"}
+    assert Process.format_row(entry, fields=("swap",)) == {"swap": None}
+
+
+def test_kill_refuses_recycled_pids():
+    """Test that a pid whose create time changed is not signalled."""
+    child = spawn()
+    try:
+        created = psutil.Process(child.pid).create_time()
+
+        async def run():
+            job = ProcessKiller().start(
+                [child.pid], grace=0.5, create_times={child.pid: created - 100}
+            )
+            while not job.done:
+                await job.wait()
+            return job
+
+        job = asyncio.run(run())
+        assert job.results[child.pid] == "recycled"
+        assert child.poll() is None
+    finally:
+        child.kill()
+        child.wait()
+
+
+if __name__ == "__main__":
+    pytest.main()
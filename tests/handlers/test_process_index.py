@@ -0,0 +1,80 @@
+import time
+import pytest
+from backend.process_index import NameTrie, NgramIndex, ProcessIndex
+
+
+# Test cases
+def test_name_trie_prefix():
+    """Test case-insensitive prefix lookups."""
+    trie = NameTrie()
+    trie.add(1, "gunicorn")
+    trie.add(2, "Gunicorn-worker")
+    trie.add(3, "gzip")
+    assert trie.find("gun") == {1, 2}
+    assert trie.find("G") == {1, 2, 3}
+    assert trie.find("gunicorn-") == {2}
+    assert trie.find("nginx") == set()
+
+
+def test_name_trie_remove_prunes():
+    """Test that removing the last name under a node prunes the branch."""
+    trie = NameTrie()
+    trie.add(1, "abc")
+    trie.add(2, "abd")
+    trie.remove(2, "abd")
+    assert trie.find("ab") == {1}
+    assert "d" not in trie.root[0]["a"][0]["b"][0]
+    trie.remove(1, "abc")
+    assert trie.root == ({}, set())
+
+
+def test_ngram_substring():
+    """Test substring lookups, including queries shorter than an n-gram."""
+    index = NgramIndex()
+    index.add(1, "/usr/bin/python3 -m http.server")
+    index.add(2, "/usr/sbin/nginx -g daemon off;")
+    index.add(3, "python3 manage.py runserver")
+    assert index.find("PYTHON3") == {1, 3}
+    assert index.find("server") == {1, 3}
+    assert index.find("http.server") == {1}
+    assert index.find("-g") == {2}
+    assert index.find("nothing here") == set()
+    index.remove(3)
+    assert index.find("python3") == {1}
+    assert "nag" not in index.grams
+
+
+def test_process_index_search():
+    """Test combining name and cmdline criteria."""
+    index = ProcessIndex()
+    index.add(10, "python3", "python3 -m http.server")
+    index.add(11, "python3", "python3 worker.py")
+    index.add(12, "bash", "bash -c python3")
+    assert index.search(name="py") == {10, 11}
+    assert index.search(cmdline="python3") == {10, 11, 12}
+    assert index.search(name="py", cmdline="worker") == {11}
+    assert index.search() == {10, 11, 12}
+    # Re-adding a pid (exec) replaces what it was indexed under.
+    index.add(11, "node", "node app.js")
+    assert index.search(name="py") == {10}
+    index.remove(10)
+    assert index.search(cmdline="http") == set()
+
+
+def test_lookup_on_10k_processes():
+    """Test that lookups on a 10k-process index stay under a millisecond."""
+    index = ProcessIndex()
+    for pid in range(10000):
+        name = f"worker-{pid % 50}"
+        index.add(pid, name, f"/opt/app/bin/{name} --shard={pid} --config=/etc/app.yml")
+    best = float("inf")
+    for _ in range(20):
+        start = time.perf_counter()
+        found = index.search(name="worker-1", cmdline="--shard=4217")
+        best = min(best, time.perf_counter() - start)
+    assert found == {4217}
+    assert best < 0.001
+
+
+if __name__ == "__main__":
+    pytest.main()
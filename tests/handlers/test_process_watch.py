@@ -0,0 +1,99 @@
+from types import SimpleNamespace
+import pytest
+from backend.process_watch import ProcessWatchList
+
+
+def entry(pid, name, cpu=1.0, rss=100, io=None, create_time=10.0):
+    return SimpleNamespace(
+        pid=pid,
+        name=name,
+        create_time=create_time,
+        key=(pid, create_time),
+        cpu_usage=cpu,
+        rss=rss,
+        io=io,
+    )
+
+
+def fds(entry):
+    return 3
+
+
+# Test cases
+def test_records_pinned_pids():
+    """Test that only pinned processes get a history."""
+    watch = ProcessWatchList()
+    watch.clock_offset = 0.0
+    rows = {1: entry(1, "init"), 2: entry(2, "worker", io=512)}
+    watch.record(1.0, rows, fds)
+    assert watch.histories == {}
+    watch.watch(pid=2)
+    watch.record(2.0, rows, fds)
+    rows[2].rss = 200
+    watch.record(3.0, rows, fds)
+    history = watch.history(2)
+    assert history["timestamps"] == [2.0, 3.0]
+    assert history["rss"] == [100.0, 200.0]
+    assert history["num_fds"] == [3.0, 3.0]
+    assert history["io_bytes"] == [512.0, 512.0]
+    assert watch.history(2, since=2.5)["rss"] == [200.0]
+    assert watch.history(1) is None
+
+
+def test_epoch_timestamps():
+    """Test that monotonic sample times are queried and returned as epoch."""
+    watch = ProcessWatchList()
+    watch.clock_offset = 1000.0
+    watch.watch(pid=1)
+    rows = {1: entry(1, "init")}
+    for t in (1.0, 2.0, 3.0):
+        watch.record(t, rows, fds)
+    history = watch.history(1, since=1001.5, until=1002.5)
+    assert history["timestamps"] == [1002.0]
+
+
+def test_pattern_and_exit():
+    """Test glob patterns, unreadable values and processes that exit."""
+    watch = ProcessWatchList()
+    watch.watch(pattern="gunicorn*")
+    rows = {3: entry(3, "gunicorn"), 4: entry(4, "gunicorn-w"), 5: entry(5, "bash")}
+    watch.record(1.0, rows, lambda e: None)
+    assert sorted(h.pid for h in watch.histories.values()) == [3, 4]
+    assert watch.history(3)["num_fds"] == [None]
+    del rows[4]
+    watch.record(2.0, rows, fds)
+    assert watch.history(4)["exited"] is True
+    assert watch.history(3)["exited"] is False
+    watch.unwatch(pattern="gunicorn*")
+    assert watch.histories == {}
+
+
+def test_limit_bounds_histories():
+    """Test that the cap recycles exited histories and drops the rest."""
+    watch = ProcessWatchList(limit=2, capacity=4)
+    watch.watch(pattern="*")
+    rows = {pid: entry(pid, f"p{pid}") for pid in (1, 2, 3)}
+    watch.record(1.0, rows, fds)
+    assert len(watch.histories) == 2
+    assert watch.dropped == 1
+    del rows[1]
+    watch.record(2.0, rows, fds)
+    assert sorted(h.pid for h in watch.histories.values()) == [2, 3]
+    for t in range(3, 10):
+        watch.record(float(t), rows, fds)
+    assert len(watch.history(2)["timestamps"]) == 4
+
+
+def test_recycled_pid_prefers_running_process():
+    """Test that a new process reusing a watched pid gets its own history."""
+    watch = ProcessWatchList()
+    watch.watch(pid=7)
+    watch.record(1.0, {7: entry(7, "old", create_time=1.0)}, fds)
+    watch.record(2.0, {7: entry(7, "new", create_time=2.0)}, fds)
+    assert watch.history(7)["name"] == "new"
+    assert watch.to_dict()["pids"] == [7]
+    assert len(watch.to_dict()["processes"]) == 2
+
+
+if __name__ == "__main__":
+    pytest.main()
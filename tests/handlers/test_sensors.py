@@ -0,0 +1,136 @@
+import os
+import shutil
+import pytest
+from backend.sensors import SensorCollector
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text + "\n")
+
+
+@pytest.fixture
+def sysfs(tmp_path):
+    """Fixture building a sysfs tree with one coretemp package of two cores,
+    an NVMe drive, a thermal zone and two hyperthreads per core."""
+    coretemp = tmp_path / "class/hwmon/hwmon2"
+    write(coretemp / "name", "coretemp")
+    write(coretemp / "temp1_label", "Package id 0")
+    write(coretemp / "temp1_input", "55000")
+    write(coretemp / "temp2_label", "Core 0")
+    write(coretemp / "temp2_input", "50000")
+    write(coretemp / "temp3_label", "Core 1")
+    write(coretemp / "temp3_input", "53500")
+    nvme = tmp_path / "class/hwmon/hwmon10"
+    write(nvme / "name", "nvme")
+    write(nvme / "temp1_label", "Composite")
+    write(nvme / "temp1_input", "38850")
+    write(nvme / "temp2_input", "41000")
+    zone = tmp_path / "class/thermal/thermal_zone0"
+    write(zone / "type", "x86_pkg_temp")
+    write(zone / "temp", "56000")
+    (tmp_path / "class/thermal/cooling_device0").mkdir()
+    cpus = tmp_path / "devices/system/cpu"
+    write(cpus / "online", "0-3")
+    for cpu in range(4):
+        base = cpus / f"cpu{cpu}"
+        write(base / "topology/physical_package_id", "0")
+        write(base / "topology/core_id", str(cpu % 2))
+        write(base / "thermal_throttle/core_throttle_count", "0")
+        write(base / "thermal_throttle/package_throttle_count", "0")
+    return tmp_path
+
+
+def test_read(sysfs):
+    """Test read reports packages with their cores, zones and other chips."""
+    collector = SensorCollector(root=str(sysfs))
+    reading = collector.read()
+    assert reading["packages"] == {
+        "0": {"temperature": 55.0, "cores": {"0": 50.0, "1": 53.5}}
+    }
+    assert reading["zones"] == {
+        "thermal_zone0": {"type": "x86_pkg_temp", "temperature": 56.0}
+    }
+    assert reading["hwmon"] == {
+        "hwmon10": {
+            "name": "nvme",
+            "temperatures": {"Composite": 38.85, "temp2": 41.0},
+        }
+    }
+    assert SensorCollector.cpu_temperature(reading) == 55.0
+
+
+def test_read_reuses_open_files(sysfs, monkeypatch):
+    """Test later reads only pread the files opened by the first one."""
+    collector = SensorCollector(root=str(sysfs))
+    collector.read()
+    opened = []
+    real_open = os.open
+    monkeypatch.setattr(
+        os, "open", lambda *args: opened.append(args) or real_open(*args)
+    )
+    write(sysfs / "class/hwmon/hwmon2/temp2_input", "61000")
+    reading = collector.read()
+    assert reading["packages"]["0"]["cores"]["0"] == 61.0
+    assert opened == []
+
+
+def test_throttle_events(sysfs):
+    """Test throttle counters are counted once per core and package and
+    reported as the events since the previous read."""
+    collector = SensorCollector(root=str(sysfs))
+    assert collector.read()["throttle"] == {
+        "core_count": 0,
+        "package_count": 0,
+        "core_events": 0,
+        "package_events": 0,
+    }
+    cpus = sysfs / "devices/system/cpu"
+    # cpu0 and cpu2 are the two threads of core 0 and share its counter.
+    for cpu in (0, 2):
+        write(cpus / f"cpu{cpu}/thermal_throttle/core_throttle_count", "3")
+    for cpu in range(4):
+        write(cpus / f"cpu{cpu}/thermal_throttle/package_throttle_count", "2")
+    throttle = collector.read()["throttle"]
+    assert throttle["core_count"] == 3
+    assert throttle["core_events"] == 3
+    assert throttle["package_count"] == 2
+    assert throttle["package_events"] == 2
+    assert collector.read()["throttle"]["core_events"] == 0
+
+
+def test_rediscovery(sysfs, monkeypatch):
+    """Test sensors are discovered again only when devices change."""
+    collector = SensorCollector(root=str(sysfs))
+    discoveries = []
+    real_discover = collector.discover
+    monkeypatch.setattr(
+        collector, "discover", lambda: discoveries.append(1) or real_discover()
+    )
+    collector.read()
+    collector.read()
+    assert len(discoveries) == 1
+    shutil.rmtree(sysfs / "class/hwmon/hwmon10")
+    assert collector.read()["hwmon"] == {}
+    assert len(discoveries) == 2
+    k10temp = sysfs / "class/hwmon/hwmon3"
+    write(k10temp / "name", "k10temp")
+    write(k10temp / "temp1_label", "Tctl")
+    write(k10temp / "temp1_input", "70000")
+    reading = collector.read()
+    assert len(discoveries) == 3
+    assert reading["packages"]["1"] == {"temperature": 70.0, "cores": {}}
+    assert SensorCollector.cpu_temperature(reading) == 70.0
+
+
+def test_cpu_temperature_fallback(tmp_path):
+    """Test the CPU temperature without CPU sensors."""
+    collector = SensorCollector(root=str(tmp_path))
+    assert SensorCollector.cpu_temperature(collector.read()) == 0.0
+    write(tmp_path / "class/thermal/thermal_zone0/type", "acpitz")
+    write(tmp_path / "class/thermal/thermal_zone0/temp", "42000")
+    assert SensorCollector.cpu_temperature(collector.read()) == 42.0
+
+
+if __name__ == "__main__":
+    pytest.main()
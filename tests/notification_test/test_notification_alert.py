@@ -6,6 +6,7 @@ from notification_client.notification_alert import (
     check_cpu,
     check_ram,
     check_network,
+    check_all,
     send_alert,
 )
 
@@ -134,3 +135,52 @@ def test_send_alert(mock_strftime, mock_blocking_connection):
         mock_print.assert_called_once_with(
             "Alert sent to queue: {'type': 'High CPU Usage', 'message': 'CPU usage exceeded 90% for 300s.', 'timestamp': '2024-11-25 12:00:00'}"
         )
+
+
+@patch("notification_client.notification_alert.check_network")
+@patch("notification_client.notification_alert.check_ram")
+@patch("notification_client.notification_alert.check_cpu")
+@patch("notification_client.notification_alert.fetch_snapshot")
+def test_check_all_uses_one_snapshot(
+    mock_fetch_snapshot, mock_check_cpu, mock_check_ram, mock_check_network
+):
+    # Mock a single snapshot carrying every checked reading
+    mock_fetch_snapshot.return_value = {
+        "cpu.usage": 90,
+        "memory.percent": 60,
+        "net.bytes_sent": 1000,
+        "net.bytes_received": 2000,
+    }
+
+    check_all()
+
+    # Assert every check reused the one snapshot
+    mock_fetch_snapshot.assert_called_once()
+    mock_check_cpu.assert_called_once_with(90)
+    mock_check_ram.assert_called_once_with(60)
+    mock_check_network.assert_called_once_with(
+        {"bytes_sent": 1000, "bytes_received": 2000}
+    )
+
+
+@patch("notification_client.notification_alert.check_network")
+@patch("notification_client.notification_alert.check_ram")
+@patch("notification_client.notification_alert.check_cpu")
+@patch("notification_client.notification_alert.fetch_snapshot")
+def test_check_all_skips_missing_readings(
+    mock_fetch_snapshot, mock_check_cpu, mock_check_ram, mock_check_network
+):
+    # Mock a snapshot whose memory and network sections failed to read
+    mock_fetch_snapshot.return_value = {
+        "cpu.usage": 90,
+        "memory.percent": None,
+        "net.bytes_sent": None,
+        "net.bytes_received": 2000,
+    }
+
+    check_all()
+
+    # Assert only the check with every input present ran
+    mock_check_cpu.assert_called_once_with(90)
+    mock_check_ram.assert_not_called()
+    mock_check_network.assert_not_called()
@@ -3,6 +3,7 @@ from notification_client.notification_api_handler import (
     fetch_cpu_usage,
     fetch_memory_percent,
     fetch_network_bandwidth,
+    fetch_snapshot,
 )
 
 
@@ -48,3 +49,22 @@ def test_fetch_network_bandwidth(mock_requests_get):
     # Assert the correct values are returned
     assert result["bytes_sent"] == 1000
     assert result["bytes_received"] == 2000
+
+
+@patch("requests.get")
+def test_fetch_snapshot(mock_requests_get):
+    # Mock API response
+    mock_requests_get.return_value = Mock(
+        status_code=200,
+        json=lambda: {"seq": 1, "values": {"cpu.usage": 50, "memory.percent": 60}},
+    )
+
+    # Call fetch_snapshot
+    result = fetch_snapshot(["cpu.usage", "memory.percent"])
+
+    # Assert the fields are requested in one call and returned
+    mock_requests_get.assert_called_once_with(
+        "http://127.0.0.1:8000/snapshot",
+        params={"fields": "cpu.usage,memory.percent"},
+    )
+    assert result == {"cpu.usage": 50, "memory.percent": 60}
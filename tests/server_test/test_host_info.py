@@ -0,0 +1,124 @@
+import os
+import threading
+import time
+import pytest
+from backend.host_info import (
+    CachedValue,
+    HostInfo,
+    MountWatcher,
+    SignatureWatcher,
+    Watcher,
+)
+
+
+class FlagWatcher(Watcher):
+    """Watcher whose source changes when the test says so."""
+
+    def __init__(self):
+        super().__init__()
+        self.flag = False
+
+    def changed(self):
+        changed, self.flag = self.flag, False
+        return changed
+
+
+# Test cases
+def test_cached_value_reloads_only_on_change():
+    """Test that the loader runs again only after its watcher fires."""
+    calls = []
+    watcher = FlagWatcher()
+    value = CachedValue(lambda: calls.append(1) or len(calls), (watcher,))
+    assert value.get() == 1
+    assert value.get() == 1
+    watcher.flag = True
+    assert value.get() == 2
+    assert len(calls) == 2
+
+
+def test_shared_watcher_invalidates_every_value():
+    """Test that one change reaches all values watching the same source."""
+    watcher = FlagWatcher()
+    first = CachedValue(iter(range(10)).__next__, (watcher,))
+    second = CachedValue(iter(range(10)).__next__, (watcher,))
+    first.get()
+    second.get()
+    watcher.flag = True
+    assert first.get() == 1
+    assert second.get() == 1
+
+
+def test_background_value_never_blocks():
+    """Test that a stalled loader does not block get()."""
+    release = threading.Event()
+
+    def slow_lookup():
+        release.wait(5)
+        return "10.0.0.1"
+
+    value = CachedValue(slow_lookup, background=True)
+    start = time.perf_counter()
+    assert value.get() is None
+    assert value.get() is None
+    assert time.perf_counter() - start < 0.1
+    release.set()
+    for _ in range(100):
+        if value.get() == "10.0.0.1":
+            break
+        time.sleep(0.01)
+    assert value.get() == "10.0.0.1"
+
+
+def test_failed_load_keeps_previous_value():
+    """Test that a loader error keeps serving the last good value."""
+    watcher = FlagWatcher()
+    results = iter(["a", OSError("lookup failed")])
+
+    def loader():
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    value = CachedValue(loader, (watcher,))
+    assert value.get() == "a"
+    watcher.flag = True
+    assert value.get() == "a"
+
+
+def test_signature_watcher(tmp_path):
+    """Test that signature changes bump the generation."""
+    path = tmp_path / "online"
+    path.write_text("0-3")
+    watcher = SignatureWatcher(path.read_text)
+    assert watcher.poll() == 0
+    path.write_text("0-7")
+    assert watcher.poll() == 1
+    assert watcher.poll() == 1
+
+
+def test_mount_watcher_without_notifications(tmp_path):
+    """Test that a missing mount table falls back to always reloading."""
+    watcher = MountWatcher(str(tmp_path / "missing"))
+    assert watcher.changed()
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/mounts"), reason="needs procfs")
+def test_mount_watcher_idle():
+    """Test that an unchanged mount table reports no change."""
+    assert not MountWatcher().changed()
+
+
+def test_host_info_values(monkeypatch):
+    """Test that HostInfo serves the handler values through the cache."""
+    monkeypatch.setattr("backend.host_info.CPU.get_cpu_count", lambda: 8)
+    monkeypatch.setattr(
+        "backend.host_info.Disk.get_disk_partitions", lambda: [{"mountpoint": "/"}]
+    )
+    host_info = HostInfo()
+    assert host_info.cpu_count.get() == 8
+    assert host_info.disk_partitions.get() == [{"mountpoint": "/"}]
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,209 @@
+import asyncio
+import os
+import threading
+import time
+import numpy as np
+import pytest
+from backend.metric_store import MetricStore, Segment, RECORD
+from backend.sampler import Snapshot
+from backend.timeseries import TimeSeriesStore
+
+
+def make_snapshot(seq, timestamp, usage):
+    return Snapshot(
+        seq=seq, timestamp=timestamp, time=timestamp, data={"cpu": {"usage": usage}}
+    )
+
+
+# Test cases
+def test_segment_round_trip(tmp_path):
+    """Test that records survive reopening the segment file."""
+    path = str(tmp_path / "a.seg")
+    segment = Segment(path, capacity=4)
+    segment.append(1.0, 10.0)
+    segment.append(2.0, 20.0)
+    reopened = Segment(path)
+    assert reopened.count == 2
+    assert reopened.capacity == 4
+    assert reopened.view()["value"].tolist() == [10.0, 20.0]
+
+
+def test_segment_view_is_zero_copy(tmp_path):
+    """Test that reads are slices of the mapped file, not copies."""
+    segment = Segment(str(tmp_path / "a.seg"), capacity=4)
+    for t in range(4):
+        segment.append(float(t), float(t))
+    view = segment.view(since=1.0, until=2.0)
+    assert view["time"].tolist() == [1.0, 2.0]
+    assert np.shares_memory(view, segment.records)
+
+
+def test_segment_rejects_foreign_files(tmp_path):
+    """Test that files without the segment header are refused."""
+    path = tmp_path / "bad.seg"
+    path.write_bytes(b"x" * 64)
+    with pytest.raises(ValueError):
+        Segment(str(path))
+
+
+def test_store_skips_unreadable_segments(tmp_path):
+    """Test that empty, truncated or foreign segments are set aside."""
+    store = MetricStore(str(tmp_path), capacity=4)
+    store.record(make_snapshot(1, 1.0, 5.0))
+    raw = tmp_path / "cpu.usage" / "raw"
+    # Left by a crash between creating a segment and writing its header.
+    (raw / "0000000000000000.seg").write_bytes(b"")
+    (raw / "0000000000000001.seg").write_bytes(b"SYSM")
+    (raw / "0000000000000002.seg").write_bytes(b"x" * 64)
+    reopened = MetricStore(str(tmp_path), capacity=4)
+    assert reopened.query("cpu.usage")["values"] == [5.0]
+    assert sorted(name for name in os.listdir(raw) if name.endswith(".bad")) == [
+        "0000000000000000.seg.bad",
+        "0000000000000001.seg.bad",
+        "0000000000000002.seg.bad",
+    ]
+
+
+def test_store_compacts_off_the_event_loop(tmp_path, monkeypatch):
+    """Test that on_snapshot hands compaction to an executor."""
+    store = MetricStore(str(tmp_path), capacity=2, compact_after=0)
+    threads = []
+    compact = store.compact
+    monkeypatch.setattr(
+        store,
+        "compact",
+        lambda metric, now=None: threads.append(threading.current_thread())
+        or compact(metric, now),
+    )
+
+    async def run():
+        for t in range(5):
+            await store.on_snapshot(make_snapshot(t, float(t), float(t)))
+
+    # asyncio.run waits for the default executor before returning.
+    asyncio.run(run())
+    assert threads
+    assert threading.main_thread() not in threads
+    assert store.query("cpu.usage")["values"][-1] == 4.0
+
+
+def test_store_rolls_over_segments(tmp_path):
+    """Test that full segments roll over to new files."""
+    store = MetricStore(str(tmp_path), capacity=2, compact_after=1e9)
+    for t in range(5):
+        store.record(make_snapshot(t, float(t), float(t)))
+    raw = tmp_path / "cpu.usage" / "raw"
+    assert len(os.listdir(raw)) == 3
+    result = store.query("cpu.usage")
+    assert result["values"] == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+
+def test_store_compacts_and_expires(tmp_path):
+    """Test that old raw segments are downsampled and expired ones dropped."""
+    store = MetricStore(
+        str(tmp_path), capacity=4, compact_after=10, resolution=2, retention=100
+    )
+    for t in range(9):
+        store.record(make_snapshot(t, float(t), float(t)))
+    store.compact("cpu.usage", now=50.0)
+    compacted, raw = store.logs["cpu.usage"]
+    assert len(raw.segments) == 1
+    records = np.concatenate(compacted.read())
+    assert records["time"].tolist() == [0.0, 2.0, 4.0, 6.0]
+    assert records["value"].tolist() == [0.5, 2.5, 4.5, 6.5]
+    assert store.query("cpu.usage")["values"][-1] == 8.0
+    store.compact("cpu.usage", now=1000.0)
+    assert len(compacted.segments) == 1
+
+
+def test_store_expires_compacted_history_after_retention(tmp_path):
+    """Test that compacted segments span compact_after, so at most that
+    much is kept past retention."""
+    store = MetricStore(
+        str(tmp_path), capacity=8, compact_after=8, resolution=2, retention=20
+    )
+    for t in range(60):
+        store.record(make_snapshot(t, float(t), 1.0))
+        store.compact("cpu.usage", now=float(t))
+    compacted, raw = store.logs["cpu.usage"]
+    assert {segment.capacity for segment in compacted.segments} == {4}
+    oldest = compacted.segments[0].first()
+    assert 59 - 20 - 8 <= oldest
+
+
+def test_store_rejects_path_like_metric_names(tmp_path):
+    """Test that metric names cannot escape the store directory."""
+    store = MetricStore(str(tmp_path / "store"), capacity=4)
+    snapshot = Snapshot(
+        seq=1, timestamp=1.0, time=1.0, data={"..": {"x": 1.0}, "cpu": {"usage": 2.0}}
+    )
+    store.record(snapshot)
+    assert store.metrics() == ["cpu.usage"]
+    for name in ("../escape", "a/b", "..", "."):
+        with pytest.raises(ValueError):
+            store.open(name)
+    assert os.listdir(tmp_path) == ["store"]
+
+
+def test_store_query_thins_to_max_points(tmp_path):
+    """Test that max_points strides over the stored records."""
+    store = MetricStore(str(tmp_path), capacity=100)
+    for t in range(10):
+        store.record(make_snapshot(t, float(t), float(t)))
+    result = store.query("cpu.usage", since=2.0, max_points=4)
+    assert result["timestamps"] == [2.0, 4.0, 6.0, 8.0]
+
+
+def test_store_reloads_from_disk(tmp_path):
+    """Test that a new store picks up the metrics written by an old one."""
+    store = MetricStore(str(tmp_path), capacity=4)
+    store.record(make_snapshot(1, 1.0, 5.0))
+    reopened = MetricStore(str(tmp_path), capacity=4)
+    assert reopened.metrics() == ["cpu.usage"]
+    reopened.record(make_snapshot(2, 2.0, 6.0))
+    assert reopened.query("cpu.usage")["values"] == [5.0, 6.0]
+
+
+def test_history_warm_load(tmp_path):
+    """Test that the in-memory history is rebuilt from the archive."""
+    archive = MetricStore(str(tmp_path), capacity=1000)
+    history = TimeSeriesStore(retention=100, interval=1.0, tiers=((10, 10),))
+    now = time.time()
+    records = np.zeros(50, dtype=RECORD)
+    records["time"] = now - 50 + np.arange(50)
+    records["value"] = np.arange(50)
+    archive.open("cpu.usage")[1].extend(records)
+    history.warm_load(archive)
+    result = history.query("cpu.usage")
+    assert result["values"] == list(map(float, range(50)))
+    result = history.query("cpu.usage", max_points=10)
+    assert result["resolution"] == 10
+    assert sum(result["count"]) == 50
+
+
+def test_history_warm_load_weights_compacted_averages(tmp_path):
+    """Test that compacted averages only fill the coarser tiers, each
+    counted as the samples it stands for."""
+    archive = MetricStore(str(tmp_path), capacity=1000, resolution=60)
+    history = TimeSeriesStore(retention=100, interval=1.0, tiers=((10, 10), (3600, 10)))
+    now = time.time()
+    hour = now - now % 3600
+    averages = np.zeros(2, dtype=RECORD)
+    averages["time"] = [hour - 120, hour - 60]
+    averages["value"] = [10.0, 20.0]
+    archive.open("cpu.usage")[0].extend(averages)
+    records = np.zeros(60, dtype=RECORD)
+    records["time"] = hour + np.arange(60)
+    records["value"] = 40.0
+    archive.logs["cpu.usage"][1].extend(records)
+    history.warm_load(archive)
+    series = history.series["cpu.usage"]
+    # The 10s tier only gets the raw samples.
+    assert sum(series.tiers[0].counts[: series.tiers[0].count]) == 60
+    hourly = series.tiers[1]
+    assert hourly.counts[: hourly.count].tolist() == [120.0, 60.0]
+    assert hourly.values[: hourly.count].tolist() == [15.0, 40.0]
+
+
+if __name__ == "__main__":
+    pytest.main()
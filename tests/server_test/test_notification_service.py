@@ -0,0 +1,104 @@
+import asyncio
+import pytest
+from backend.notify_res import NotificationService
+from backend.sampler import Snapshot
+
+
+class FakeSampler:
+    def __init__(self, steal=0.0, iowait=0.0, memory_stall=0.0, major_faults=0.0) -> None:
+        breakdown = {"user": 10.0, "system": 5.0, "steal": steal, "iowait": iowait}
+        pressure = {
+            resource: {"some": {"avg10": 0.0}, "full": {"avg10": 0.0}}
+            for resource in ("cpu", "memory", "io")
+        }
+        pressure["memory"]["some"]["avg10"] = memory_stall
+        self.snapshot = Snapshot(
+            seq=1,
+            timestamp=0.0,
+            time=0.0,
+            data={
+                "cpu": {"usage": 20.0, "breakdown": breakdown},
+                "memory": {"percent": 40.0},
+                "disk": {"usage": {"percent": 50.0}},
+                "net": {"bytes_sent": 0, "bytes_received": 0},
+                "pressure": pressure,
+                "vmstat": {"pgfault": 0.0, "pgmajfault": major_faults},
+            },
+        )
+
+    def current(self):
+        return self.snapshot
+
+
+def check(service):
+    alerts = []
+
+    async def on_alert(title, msg):
+        alerts.append((title, msg))
+
+    service.add_listener(on_alert)
+    asyncio.run(
+        service.check_system_resources(
+            service.cpu_threshold,
+            service.memory_threshold,
+            service.disk_threshold,
+            service.network_threshold,
+            service.gpu_threshold,
+            service.check_interval,
+            steal_threshold=service.steal_threshold,
+            iowait_threshold=service.iowait_threshold,
+            pressure_threshold=service.pressure_threshold,
+            major_fault_threshold=service.major_fault_threshold,
+        )
+    )
+    return alerts
+
+
+def test_steal_and_iowait_alerts():
+    """Test steal and iowait above their thresholds raise alerts."""
+    service = NotificationService(FakeSampler(steal=15.0, iowait=25.0))
+    alerts = check(service)
+    assert ("CPU Steal Alert", "CPU steal time is at 15.0%") in alerts
+    assert ("CPU IOWait Alert", "CPU iowait is at 25.0%") in alerts
+    assert len(alerts) == 2
+
+
+def test_steal_and_iowait_thresholds():
+    """Test the steal and iowait thresholds can be raised."""
+    service = NotificationService(FakeSampler(steal=15.0, iowait=25.0))
+    service.steal_threshold = 20
+    service.iowait_threshold = 30
+    assert check(service) == []
+
+
+def test_pressure_and_major_fault_alerts():
+    """Test stalls and major faults above their thresholds raise alerts."""
+    service = NotificationService(FakeSampler(memory_stall=12.5, major_faults=2500.0))
+    alerts = check(service)
+    assert alerts == [
+        ("Memory Pressure Alert", "Tasks stalled on memory 12.5% of the last 10s"),
+        ("Major Fault Alert", "Major page faults at 2500/s"),
+    ]
+
+
+def test_no_pressure_information():
+    """Test snapshots without PSI skip the pressure check."""
+    sampler = FakeSampler()
+    del sampler.snapshot.data["pressure"]
+    assert check(NotificationService(sampler)) == []
+
+
+def test_missing_readings_are_skipped():
+    """Test readings the sampler could not take are not checked."""
+    sampler = FakeSampler(memory_stall=50.0)
+    sampler.snapshot.data["cpu"] = {"frequency": None}
+    sampler.snapshot.data["memory"] = None
+    sampler.snapshot.data["vmstat"] = None
+    sampler.snapshot.data["net"] = {"throughput": None}
+    assert check(NotificationService(sampler)) == [
+        ("Memory Pressure Alert", "Tasks stalled on memory 50.0% of the last 10s"),
+    ]
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,92 @@
+import pytest
+from backend.projection import ProjectionCache, compile_path
+from backend.sampler import Snapshot
+
+
+def make_snapshot(seq=1, usage=10.0):
+    return Snapshot(
+        seq=seq,
+        timestamp=1.0,
+        time=1.0,
+        data={
+            "cpu": {"usage": usage, "per_cpu_usage": [usage, 5.0]},
+            "memory": {"percent": 50.0},
+            "net": {"bytes_sent": 100},
+        },
+    )
+
+
+# Test cases
+def test_compile_path_converts_indices():
+    """Test that list indices are resolved to ints at compile time."""
+    data = make_snapshot().data
+    assert compile_path(data, "cpu.per_cpu_usage.1") == ("cpu", "per_cpu_usage", 1)
+    with pytest.raises(KeyError):
+        compile_path(data, "cpu.per_cpu_usage.7")
+    with pytest.raises(KeyError):
+        compile_path(data, "cpu.usage.deeper")
+
+
+def test_projection_resolves_fields():
+    """Test that a projection picks every requested field in one pass."""
+    cache = ProjectionCache()
+    snapshot = make_snapshot()
+    projection = cache.get("cpu.usage, memory.percent,net.bytes_sent", snapshot)
+    assert projection.apply(snapshot) == {
+        "cpu.usage": 10.0,
+        "memory.percent": 50.0,
+        "net.bytes_sent": 100,
+    }
+
+
+def test_projection_rejects_unknown_fields():
+    """Test that unknown fields are reported together."""
+    with pytest.raises(ValueError) as e:
+        ProjectionCache().get("cpu.usage,gpu.usage,disk", make_snapshot())
+    assert "gpu.usage, disk" in str(e.value)
+
+
+def test_projection_of_a_section_that_failed():
+    """Test that a known field of a section missing on this tick is None."""
+    cache = ProjectionCache()
+    cache.learn(make_snapshot(1))
+    snapshot = make_snapshot(2)
+    snapshot.data["memory"] = None
+    projection = cache.get("memory.percent,cpu.usage", snapshot)
+    assert projection.apply(snapshot) == {"memory.percent": None, "cpu.usage": 10.0}
+    with pytest.raises(ValueError):
+        cache.get("memory.nope", snapshot)
+
+
+def test_projection_compiled_once():
+    """Test that the same field list reuses the compiled projection."""
+    cache = ProjectionCache()
+    first = cache.get("cpu.usage,memory.percent", make_snapshot(1))
+    second = cache.get("cpu.usage,,memory.percent,cpu.usage", make_snapshot(2))
+    assert first is second
+    assert second.apply(make_snapshot(2, usage=30.0))["cpu.usage"] == 30.0
+
+
+def test_projection_cache_is_bounded():
+    """Test that the least recently used projections are evicted."""
+    cache = ProjectionCache(size=2)
+    snapshot = make_snapshot()
+    cache.get("cpu.usage", snapshot)
+    cache.get("memory.percent", snapshot)
+    cache.get("cpu.usage", snapshot)
+    cache.get("net.bytes_sent", snapshot)
+    assert list(cache.projections) == [("cpu.usage",), ("net.bytes_sent",)]
+
+
+def test_projection_missing_field_resolves_to_none():
+    """Test that a field which later disappears resolves to None."""
+    cache = ProjectionCache()
+    projection = cache.get("cpu.per_cpu_usage.1", make_snapshot())
+    snapshot = Snapshot(
+        seq=2, timestamp=2.0, time=2.0, data={"cpu": {"per_cpu_usage": [1.0]}}
+    )
+    assert projection.apply(snapshot) == {"cpu.per_cpu_usage.1": None}
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,281 @@
+import asyncio
+import itertools
+import time
+import pytest
+import psutil
+from collections import namedtuple
+from backend.pressure_handler import VMSTAT_COUNTERS, Pressure
+from backend.sampler import Sampler, Snapshot
+from backend.sensors import SensorCollector
+
+
+# Fixtures for mocking
+@pytest.fixture
+def mock_psutil(monkeypatch):
+    """Fixture to mock every psutil call made during a sampler tick."""
+
+    def mock_cpu_percent(interval=1, percpu=False):
+        raise AssertionError("sampler must never block on cpu_percent")
+
+    CpuTimes = namedtuple("CpuTimes", ["user", "system", "idle", "iowait"])
+    ticks = itertools.count()
+
+    def mock_cpu_times(percpu=False):
+        # Every reading adds 10s per core: core 0 is 10% busy, core 1 30%.
+        n = next(ticks)
+        return [
+            CpuTimes(user=1.0 * n, system=0.0, idle=8.5 * n, iowait=0.5 * n),
+            CpuTimes(user=3.0 * n, system=0.0, idle=6.5 * n, iowait=0.5 * n),
+        ]
+
+    disk_reads = itertools.count()
+
+    def mock_disk_io_counters(perdisk=False):
+        n = next(disk_reads)
+        return psutil._common.sdiskio(10, 20, 1024, 2048, 5 * n, 7 * n)
+
+    net_reads = itertools.count()
+
+    def mock_net_io_counters():
+        n = next(net_reads)
+        return psutil._common.snetio(100 * n, 200 * n, 1, 2, 0, 0, 0, 0)
+
+    monkeypatch.setattr(psutil, "cpu_percent", mock_cpu_percent)
+    monkeypatch.setattr(psutil, "cpu_times", mock_cpu_times)
+    monkeypatch.setattr(
+        psutil, "cpu_freq", lambda: psutil._common.scpufreq(2400.0, 800.0, 3600.0)
+    )
+    monkeypatch.setattr(psutil, "cpu_count", lambda logical=True: 2)
+    monkeypatch.setattr("os.getloadavg", lambda: (0.5, 1.0, 1.5))
+    monkeypatch.setattr("uptime.uptime", lambda: 3600.0)
+    monkeypatch.setattr(
+        psutil,
+        "virtual_memory",
+        lambda: psutil._pslinux.svmem(
+            8000, 4000, 50.0, 4000, 2000, 0, 0, 0, 0, 0, 0
+        ),
+    )
+    monkeypatch.setattr(
+        psutil,
+        "swap_memory",
+        lambda: psutil._common.sswap(1000, 100, 900, 10.0, 5, 6),
+    )
+    monkeypatch.setattr(
+        psutil,
+        "disk_usage",
+        lambda path: psutil._common.sdiskusage(100, 40, 60, 40.0),
+    )
+    monkeypatch.setattr(psutil, "disk_io_counters", mock_disk_io_counters)
+    monkeypatch.setattr(psutil, "net_io_counters", mock_net_io_counters)
+
+
+# Test cases
+def test_tick_publishes_snapshot(mock_psutil):
+    """Test that a tick gathers every reading into one snapshot."""
+    sampler = Sampler()
+    snapshot = sampler.tick()
+    assert isinstance(snapshot, Snapshot)
+    assert snapshot.seq == 1
+    assert sampler.snapshot is snapshot
+    assert snapshot.get("cpu.usage") == 20.0
+    assert snapshot.get("cpu.per_cpu_usage.1") == 30.0
+    assert snapshot.get("memory.percent") == 50.0
+    assert snapshot.get("swap.total") == 1000
+    assert snapshot.get("disk.usage.percent") == 40.0
+    assert snapshot.get("net.bytes_sent") == 100
+
+
+def test_tick_computes_rates_from_deltas(mock_psutil, monkeypatch):
+    """Test that usage and throughput come from the previous tick's counters."""
+    clock = iter([100.0, 102.0, 104.0])
+    monkeypatch.setattr(time, "monotonic", lambda: next(clock))
+    sampler = Sampler()
+    snapshot = sampler.tick()
+    assert snapshot.get("cpu.usage") == 20.0
+    assert snapshot.get("cpu.times") == {
+        "user": 4.0,
+        "system": 0.0,
+        "idle": 15.0,
+        "iowait": 1.0,
+    }
+    assert snapshot.get("net.throughput") == {"sent": 50.0, "recv": 100.0}
+    # 12ms of read+write time over a 2000ms interval.
+    assert snapshot.get("disk.active_time") == 0.6
+
+
+def test_snapshot_metrics(mock_psutil):
+    """Test that metrics() flattens numeric readings to dotted paths."""
+    metrics = Sampler().tick().metrics()
+    assert metrics["cpu.usage"] == 20.0
+    assert metrics["memory.percent"] == 50.0
+    assert "net.throughput.sent" in metrics
+    assert "cpu.per_cpu_usage" not in metrics
+
+
+def test_tick_reads_sensors(mock_psutil, tmp_path):
+    """Test that a sensor collector supplies the temperatures."""
+    coretemp = tmp_path / "class/hwmon/hwmon0"
+    coretemp.mkdir(parents=True)
+    (coretemp / "name").write_text("coretemp\n")
+    (coretemp / "temp1_label").write_text("Core 0\n")
+    (coretemp / "temp1_input").write_text("47000\n")
+    snapshot = Sampler(sensors=SensorCollector(root=str(tmp_path))).tick()
+    assert snapshot.get("cpu.temperature") == 47.0
+    assert snapshot.get("sensors.packages.0.cores.0") == 47.0
+    assert snapshot.metrics()["sensors.throttle.core_events"] == 0.0
+
+
+def test_tick_converts_vmstat_counters(mock_psutil, monkeypatch):
+    """Test that vmstat counters are published as rates per second."""
+    clock = iter([100.0, 102.0, 104.0])
+    monkeypatch.setattr(time, "monotonic", lambda: next(clock))
+    faults = iter([1000, 1600])
+    monkeypatch.setattr(
+        Pressure,
+        "get_vmstat_counters",
+        lambda: dict.fromkeys(VMSTAT_COUNTERS, 0) | {"pgfault": next(faults)},
+    )
+    monkeypatch.setattr(Pressure, "get_pressure", lambda: None)
+    snapshot = Sampler().tick()
+    assert snapshot.get("vmstat.pgfault") == 300.0
+    assert snapshot.metrics()["vmstat.pgmajfault"] == 0.0
+    assert "pressure" not in snapshot.data
+
+
+def test_failing_reading_only_loses_its_section(mock_psutil, monkeypatch):
+    """Test that a reading that raises leaves the rest of the snapshot."""
+    sampler = Sampler()
+    first = sampler.tick()
+    assert first.get("cpu.frequency.current") == 2400.0
+    # psutil.cpu_freq() returns None on some VMs and ARM boards.
+    monkeypatch.setattr(psutil, "cpu_freq", lambda: None)
+    snapshot = sampler.tick()
+    assert snapshot.get("memory.percent") == 50.0
+    assert snapshot.get("cpu.usage") == 20.0
+    # The last good value is served while the reading fails.
+    assert snapshot.get("cpu.frequency.current") == 2400.0
+    assert Sampler().tick().get("cpu.frequency") is None
+
+
+def test_missing_counters_skip_rates(mock_psutil, monkeypatch):
+    """Test that counters that cannot be read yield no rate, and that rates
+    resume once two readings are available again."""
+    monkeypatch.setattr(psutil, "disk_io_counters", lambda perdisk=False: None)
+    sampler = Sampler()
+    snapshot = sampler.tick()
+    assert snapshot.get("disk.io_counters") is None
+    assert snapshot.get("disk.active_time") is None
+    assert snapshot.get("net.throughput.sent") > 0
+    assert snapshot.get("memory.percent") == 50.0
+    monkeypatch.setattr(
+        psutil,
+        "disk_io_counters",
+        lambda perdisk=False: psutil._common.sdiskio(10, 20, 1024, 2048, 5, 7),
+    )
+    assert sampler.tick().get("disk.active_time") is None
+    assert sampler.tick().get("disk.active_time") == 0.0
+
+
+def test_tick_does_not_block(mock_psutil):
+    """Test that collecting a snapshot never sleeps."""
+    sampler = Sampler()
+    start = time.perf_counter()
+    sampler.tick()
+    assert time.perf_counter() - start < 0.5
+
+
+def test_snapshot_is_immutable(mock_psutil):
+    """Test that published snapshots cannot be reassigned."""
+    snapshot = Sampler().tick()
+    with pytest.raises(AttributeError):
+        snapshot.seq = 5
+
+
+def test_snapshot_get_unknown_path(mock_psutil):
+    """Test that unknown paths raise KeyError."""
+    snapshot = Sampler().tick()
+    with pytest.raises(KeyError):
+        snapshot.get("cpu.nope")
+    with pytest.raises(KeyError):
+        snapshot.get("cpu.usage.deeper")
+
+
+def test_current_reuses_snapshot(mock_psutil):
+    """Test that current() only samples when no snapshot exists yet."""
+    sampler = Sampler()
+    first = sampler.current()
+    assert sampler.current() is first
+    sampler.tick()
+    assert sampler.current().seq == 2
+
+
+def test_event_loop_notifies_listeners(mock_psutil):
+    """Test that the background loop pushes each tick to listeners."""
+    received = []
+
+    async def on_tick(snapshot):
+        received.append(snapshot.seq)
+
+    async def broken(snapshot):
+        raise RuntimeError("listener failure")
+
+    async def run():
+        sampler = Sampler(interval=0.01)
+        sampler.add_listener(broken)
+        sampler.add_listener(on_tick)
+        sampler.start()
+        await asyncio.sleep(0.1)
+        sampler.stop()
+
+    asyncio.run(run())
+    assert len(received) >= 2
+    assert received == sorted(received)
+
+
+def test_wait_for_newer_tick(mock_psutil):
+    """Test that wait_for returns once a newer snapshot is published."""
+
+    async def run():
+        sampler = Sampler(interval=0.01)
+        seq = sampler.tick().seq
+        sampler.start()
+        snapshot = await sampler.wait_for(seq, timeout=1)
+        sampler.stop()
+        return seq, snapshot
+
+    seq, snapshot = asyncio.run(run())
+    assert snapshot.seq > seq
+
+
+def test_wait_for_times_out(mock_psutil):
+    """Test that wait_for gives up after the timeout without a new tick."""
+
+    async def run():
+        sampler = Sampler()
+        seq = sampler.tick().seq
+        start = time.perf_counter()
+        snapshot = await sampler.wait_for(seq, timeout=0.05)
+        return seq, snapshot, time.perf_counter() - start
+
+    seq, snapshot, elapsed = asyncio.run(run())
+    assert snapshot.seq == seq
+    assert 0.04 < elapsed < 0.5
+
+
+def test_wait_for_seq_from_before_a_restart(mock_psutil):
+    """Test that a seq past the latest snapshot returns without waiting."""
+
+    async def run():
+        sampler = Sampler()
+        seq = sampler.tick().seq
+        start = time.perf_counter()
+        snapshot = await sampler.wait_for(seq + 100, timeout=1)
+        return seq, snapshot, time.perf_counter() - start
+
+    seq, snapshot, elapsed = asyncio.run(run())
+    assert snapshot.seq == seq
+    assert elapsed < 0.5
+
+
+if __name__ == "__main__":
+    pytest.main()
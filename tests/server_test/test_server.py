@@ -0,0 +1,479 @@
+import os
+import statistics
+import struct
+import subprocess
+import sys
+import time
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    """Fixture to run the app against a throwaway settings database."""
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("server"))
+    try:
+        from backend.server import app
+
+        with TestClient(app) as test_client:
+            yield test_client
+    finally:
+        os.chdir(cwd)
+
+
+def test_realtime_payload(client):
+    """Test /realtime returns every field the frontend reads."""
+    response = client.get("/realtime")
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data["throughput"]) == {"sent", "recv"}
+    for key in (
+        "cpu_usage",
+        "cpu_frequency",
+        "uptime",
+        "memory_usage",
+        "memory_total",
+        "memory_percent",
+        "memory_available",
+        "memory_swap",
+        "disk_active_time",
+    ):
+        assert key in data
+
+
+def test_realtime_latency(client):
+    """Test /realtime answers in under 10ms instead of sleeping for rates."""
+    client.get("/realtime")
+    durations = []
+    for _ in range(20):
+        start = time.perf_counter()
+        response = client.get("/realtime")
+        durations.append(time.perf_counter() - start)
+        assert response.status_code == 200
+    assert statistics.median(durations) < 0.01
+
+
+def test_disk_all_does_not_sleep(client):
+    """Test /disk/all reads its active time from the sampler."""
+    start = time.perf_counter()
+    response = client.get("/disk/all")
+    assert response.status_code == 200
+    assert time.perf_counter() - start < 0.5
+    assert "active_time" in response.json()
+
+
+def test_history(client):
+    """Test /history serves recorded samples of the shared sampler."""
+    from backend.server import history, sampler
+
+    history.record(sampler.tick())
+    assert "cpu.usage" in client.get("/history/metrics").json()
+    response = client.get("/history", params={"metric": "cpu.usage"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["metric"] == "cpu.usage"
+    assert len(data["timestamps"]) == len(data["values"]) >= 1
+    response = client.get(
+        "/history", params={"metric": "cpu.usage", "since": data["timestamps"][-1] + 1}
+    )
+    assert response.json()["values"] == []
+
+
+def test_history_unknown_metric(client):
+    """Test /history returns 404 for metrics that were never recorded."""
+    response = client.get("/history", params={"metric": "cpu.nope"})
+    assert response.status_code == 404
+
+
+def test_stream(client):
+    """Test /stream acknowledges a subscription and pushes sampler ticks."""
+    with client.websocket_connect("/stream") as websocket:
+        websocket.send_json({"metrics": ["nope"]})
+        assert "error" in websocket.receive_json()
+        websocket.send_json({"metrics": ["cpu", "memory"], "interval": 1})
+        assert websocket.receive_json() == {
+            "subscribed": ["cpu", "memory"],
+            "interval": 1.0,
+            "encoding": "json",
+        }
+        frame = websocket.receive_json()
+        assert set(frame["data"]) == {"cpu", "memory"}
+        assert "usage" in frame["data"]["cpu"]
+
+
+def test_stream_binary(client):
+    """Test /stream negotiates a field dictionary for binary frames."""
+    with client.websocket_connect("/stream") as websocket:
+        websocket.send_json({"metrics": ["memory"], "encoding": "binary"})
+        reply = websocket.receive_json()
+        assert "memory.percent" in reply["dictionary"]
+        frame = websocket.receive_bytes()
+        assert len(frame) == struct.calcsize(reply["format"])
+
+
+def test_snapshot_fields(client):
+    """Test /snapshot resolves a field list from one snapshot."""
+    response = client.get(
+        "/snapshot", params={"fields": "cpu.usage,memory.percent,net.bytes_sent"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data["values"]) == {"cpu.usage", "memory.percent", "net.bytes_sent"}
+    assert data["seq"] >= 1
+
+
+def test_snapshot_unknown_field(client):
+    """Test /snapshot rejects unknown fields with 400."""
+    response = client.get("/snapshot", params={"fields": "cpu.nope"})
+    assert response.status_code == 400
+
+
+def test_snapshot_field_of_a_failed_section(client, monkeypatch):
+    """Test /snapshot returns None for a known field its section lacks."""
+    from backend import server
+    from backend.sampler import Snapshot
+
+    current = server.sampler.current()
+    data = dict(current.data, memory=None)
+    snapshot = Snapshot(current.seq, current.timestamp, current.time, data)
+    monkeypatch.setattr(server.sampler, "current", lambda: snapshot)
+    response = client.get("/snapshot", params={"fields": "memory.percent,cpu.count"})
+    assert response.status_code == 200
+    assert response.json()["values"]["memory.percent"] is None
+
+
+def test_network_all_uses_host_info(client):
+    """Test /network/all answers from the host info cache."""
+    start = time.perf_counter()
+    response = client.get("/network/all")
+    assert response.status_code == 200
+    assert time.perf_counter() - start < 0.5
+    assert set(response.json()) == {"bandwidth_usage", "ipv4", "ipv6", "type"}
+
+
+def test_snapshot_routes_carry_etag(client):
+    """Test If-None-Match answers 304 while the tick has not changed."""
+    for _ in range(5):
+        response = client.get("/cpu/usage")
+        etag = response.headers["etag"]
+        again = client.get("/cpu/usage", headers={"If-None-Match": etag})
+        if again.status_code == 304:
+            break
+        # A sampler tick happened in between, the tag must have moved on.
+        assert again.headers["etag"] != etag
+    assert again.status_code == 304
+    assert again.content == b""
+
+
+def tag_seq(response):
+    """Returns the boot id and tick sequence of a snapshot route's ETag."""
+    boot, _, seq = response.headers["etag"].strip('"').rpartition("-")
+    return boot, int(seq)
+
+
+def test_after_seq_long_polls(client):
+    """Test ?after_seq= waits for a newer tick."""
+    boot, seq = tag_seq(client.get("/realtime"))
+    response = client.get("/realtime", params={"after_seq": seq})
+    assert response.status_code == 200
+    new_boot, new_seq = tag_seq(response)
+    assert new_boot == boot and new_seq > seq
+    assert client.get("/realtime", params={"after_seq": "x"}).status_code == 400
+
+
+def test_etag_from_before_a_restart(client):
+    """Test tags and sequences of an earlier server process are not matched."""
+    from backend import server
+
+    boot, seq = tag_seq(client.get("/cpu/usage"))
+    assert boot == server.BOOT_ID
+    response = client.get("/cpu/usage", headers={"If-None-Match": f'"other-{seq}"'})
+    assert response.status_code == 200
+    start = time.perf_counter()
+    response = client.get("/cpu/usage", params={"after_seq": seq + 1000})
+    assert response.status_code == 200
+    assert time.perf_counter() - start < 1
+
+
+def test_non_snapshot_routes_have_no_etag(client):
+    """Test routes with live readings are not tagged."""
+    assert "etag" not in client.get("/disk/all").headers
+
+
+def test_processes_top_n(client):
+    """Test server-side sorting and paging of /processes."""
+    rows = client.get("/processes", params={"sort": "memory", "limit": 5}).json()
+    assert len(rows) <= 5
+    memory = [row["memory_usage"] for row in rows]
+    assert memory == sorted(memory, reverse=True)
+    assert all(isinstance(m, int) for m in memory)
+    human = client.get("/processes", params={"limit": 1, "human": "true"}).json()
+    assert isinstance(human[0]["memory_usage"], str)
+    assert client.get("/processes", params={"sort": "colour"}).status_code == 400
+    assert client.get("/processes", params={"limit": -1}).status_code == 422
+
+
+def test_process_stream(client):
+    """Test /processes/stream sends the full table, then deltas."""
+    with client.websocket_connect("/processes/stream") as websocket:
+        first = websocket.receive_json()
+        assert first["type"] == "snapshot"
+        assert any(p["pid"] == os.getpid() for p in first["processes"])
+        websocket.send_json({"resync": True})
+        frame = websocket.receive_json()
+        while frame["type"] == "delta":
+            frame = websocket.receive_json()
+        assert frame["type"] == "snapshot"
+        delta = websocket.receive_json()
+        assert delta["type"] == "delta"
+        assert delta["base"] == frame["seq"]
+
+
+def test_process_fields(client):
+    """Test /processes column selection including expensive columns."""
+    pid = os.getpid()
+    rows = client.get(
+        "/processes", params={"name": "python", "fields": "pid,rss,cmdline"}
+    ).json()
+    row = next(row for row in rows if row["pid"] == pid)
+    assert set(row) == {"pid", "rss", "cmdline"}
+    assert isinstance(row["cmdline"], list)
+    response = client.get(f"/processes/{pid}", params={"fields": "num_threads"})
+    assert response.json()["num_threads"] >= 1
+    assert client.get("/processes", params={"fields": "colour"}).status_code == 400
+
+
+def test_process_groups(client):
+    """Test /processes/groups aggregates the process table."""
+    groups = client.get("/processes/groups", params={"by": "user"}).json()
+    pids = [pid for g in groups for pid in g["pids"]]
+    assert os.getpid() in pids
+    assert len(pids) == len(set(pids)) == sum(g["count"] for g in groups)
+    assert len(client.get("/processes/groups", params={"limit": 1}).json()) == 1
+    assert client.get("/processes/groups", params={"by": "x"}).status_code == 400
+
+
+def test_process_search(client):
+    """Test /processes/search finds this test process."""
+    pid = os.getpid()
+    name = client.get(f"/processes/{pid}").json()["name"]
+    rows = client.get(
+        "/processes/search", params={"name": name[:3], "cmdline": "pytest"}
+    ).json()
+    assert pid in [row["pid"] for row in rows]
+    rows = client.get("/processes/search", params={"cmdline": "no such cmdline x"})
+    assert rows.json() == []
+
+
+def test_bulk_kill_job(client):
+    """Test /killprocess returns a job that can be polled and streamed."""
+    children = [
+        subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        for _ in range(2)
+    ]
+    try:
+        response = client.post(
+            "/killprocess", json={"pids": [c.pid for c in children], "grace": 2}
+        )
+        job = response.json()
+        assert set(job["results"]) == {str(c.pid) for c in children}
+        with client.websocket_connect(f"/killprocess/jobs/{job['job']}/stream") as ws:
+            state = ws.receive_json()
+            while not state["done"]:
+                state = ws.receive_json()
+        assert set(state["results"].values()) == {"terminated"}
+        polled = client.get(f"/killprocess/jobs/{job['job']}").json()
+        assert polled == state
+    finally:
+        for child in children:
+            child.kill()
+            child.wait()
+    assert client.get("/killprocess/jobs/nope").status_code == 404
+    assert client.post("/killprocess", json={}).status_code == 400
+    assert client.post("/killprocess", json={"group_by": "x"}).status_code == 400
+    for grace in (-1, 3600):
+        response = client.post("/killprocess", json={"pids": [1], "grace": grace})
+        assert response.status_code == 422
+
+
+def test_kill_group(client):
+    """Test killing a group named as text, here the children of one parent."""
+    from backend.server import process_table
+
+    code = (
+        "import signal, subprocess, sys, time\n"
+        # Reap the children as they exit so they do not linger as zombies.
+        "signal.signal(signal.SIGCHLD, signal.SIG_IGN)\n"
+        "kids = [subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])"
+        " for _ in range(2)]\n"
+        "print(' '.join(str(k.pid) for k in kids), flush=True)\n"
+        "time.sleep(30)\n"
+    )
+    parent = subprocess.Popen(
+        [sys.executable, "-c", code], stdout=subprocess.PIPE, text=True
+    )
+    try:
+        kids = {int(pid) for pid in parent.stdout.readline().split()}
+        deadline = time.monotonic() + 5
+        while not kids <= set(process_table.rows) and time.monotonic() < deadline:
+            process_table.refresh()
+            time.sleep(0.05)
+        response = client.post(
+            "/killprocess",
+            json={"group_by": "ppid", "group": str(parent.pid), "grace": 2},
+        )
+        job = response.json()
+        assert {int(pid) for pid in job["results"]} == kids
+        while not job["done"]:
+            time.sleep(0.05)
+            job = client.get(f"/killprocess/jobs/{job['job']}").json()
+        assert set(job["results"].values()) == {"terminated"}
+    finally:
+        parent.kill()
+        parent.wait()
+
+
+def test_kill_single_process(client):
+    """Test the single-pid endpoint waits for the kill job."""
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        response = client.post(f"/killprocess/{child.pid}")
+    finally:
+        child.kill()
+        child.wait()
+    assert response.json() == {"res": "Process terminated"}
+
+
+def test_top_processes(client):
+    """Test /processes/top validates its arguments."""
+    response = client.get("/processes/top", params={"by": "cpu", "window": "1h"})
+    assert response.status_code == 200
+    assert len(response.json()) <= 10
+    assert client.get("/processes/top", params={"by": "x"}).status_code == 400
+    assert client.get("/processes/top", params={"window": "1w"}).status_code == 400
+
+
+def test_process_memory_details(client):
+    """Test USS/PSS are filled in once the background read has run."""
+    url = f"/processes/{os.getpid()}"
+    for _ in range(50):
+        row = client.get(url, params={"fields": "rss,uss,pss,swap"}).json()
+        if row["pss"] is not None:
+            break
+        time.sleep(0.05)
+    assert 0 < row["uss"] <= row["pss"] <= row["rss"]
+
+
+def test_process_watch(client):
+    """Test pinning a pid records its history on the sampler cadence."""
+    pid = os.getpid()
+    assert client.get(f"/processes/{pid}/history").status_code == 404
+    assert client.post("/processes/watch", json={}).status_code == 400
+    watch = client.post("/processes/watch", json={"pid": pid}).json()
+    assert watch["pids"] == [pid]
+    for _ in range(40):
+        response = client.get(f"/processes/{pid}/history")
+        if response.status_code == 200 and len(response.json()["timestamps"]) >= 2:
+            break
+        time.sleep(0.1)
+    history = response.json()
+    assert history["rss"][-1] > 0
+    assert history["num_fds"][-1] > 0
+    watch = client.delete("/processes/watch", params={"pid": pid}).json()
+    assert watch["processes"] == []
+
+
+def test_settings_steal_and_iowait_thresholds(client):
+    """Test the steal and iowait thresholds are saved and applied."""
+    from backend.server import notification_service
+
+    settings = client.get("/settings").json()
+    assert settings["steal_threshold"] == 10
+    assert settings["iowait_threshold"] == 20
+    settings.update(steal_threshold=5, iowait_threshold=15)
+    assert client.post("/settings", json=settings).status_code == 200
+    assert client.get("/settings").json()["steal_threshold"] == 5
+    assert notification_service.steal_threshold == 5
+    assert notification_service.iowait_threshold == 15
+
+
+def test_settings_database_upgrade(tmp_path):
+    """Test a settings database created before the steal, iowait, pressure
+    and major fault thresholds existed gains them with their defaults."""
+    import sqlite3
+    from backend.database import Database
+
+    path = str(tmp_path / "old.db")
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE user_settings (id INTEGER PRIMARY KEY, cpu_threshold INTEGER, memory_threshold INTEGER, disk_threshold INTEGER, network_threshold INTEGER, gpu_threshold INTEGER, check_interval INTEGER, theme TEXT)"
+    )
+    connection.execute(
+        "INSERT INTO user_settings VALUES (1, 90, 80, 80, 1000000, 80, 10, 'Dark')"
+    )
+    connection.commit()
+    connection.close()
+    with Database(path) as db:
+        settings = db.get_thresholds()
+    assert settings.cpu_threshold == 90
+    assert settings.theme == "Dark"
+    assert settings.steal_threshold == 10
+    assert settings.iowait_threshold == 20
+    assert settings.pressure_threshold == 10
+    assert settings.major_fault_threshold == 1000
+
+
+def test_sensors(client):
+    """Test /sensors serves the sampler's sensor readings."""
+    response = client.get("/sensors")
+    assert response.status_code == 200
+    assert set(response.json()) == {"packages", "zones", "hwmon", "throttle"}
+    assert "etag" in response.headers
+
+
+def test_pressure(client):
+    """Test /pressure serves the stall information and vmstat rates."""
+    response = client.get("/pressure")
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data["vmstat"]) >= {"pgfault", "pgmajfault", "pswpin", "pswpout"}
+    if data["pressure"] is not None:
+        assert set(data["pressure"]) == {"cpu", "memory", "io"}
+
+
+@pytest.mark.parametrize(
+    "route",
+    [
+        "/cpu/all",
+        "/cpu/usage",
+        "/memory/all",
+        "/memory/percent",
+        "/realtime",
+        "/sensors",
+        "/pressure",
+        "/disk/all",
+    ],
+)
+def test_snapshot_routes_without_a_section(client, monkeypatch, route):
+    """Test snapshot routes report readings the sampler could not take as None."""
+    from backend import server
+    from backend.sampler import Snapshot
+
+    current = server.sampler.current()
+    data = dict(current.data, memory=None, sensors=None, vmstat=None)
+    data["cpu"] = {"frequency": None}
+    snapshot = Snapshot(current.seq, current.timestamp, current.time, data)
+    monkeypatch.setattr(server.sampler, "current", lambda: snapshot)
+    response = client.get(route)
+    assert response.status_code == 200
+    if route == "/cpu/all":
+        assert response.json()["cpu_usage"] is None
+    elif route == "/memory/percent":
+        assert response.json() == {"memory_percent": None}
+    elif route == "/sensors":
+        assert response.json() is None
+
+
+if __name__ == "__main__":
+    pytest.main()
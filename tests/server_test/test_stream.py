@@ -0,0 +1,317 @@
+import asyncio
+import json
+import struct
+import pytest
+from backend.sampler import Snapshot
+from backend.stream import ProcessStreamHub, StreamHub
+
+
+class FakeWebSocket:
+    """Records the frames pushed to it."""
+
+    def __init__(self, fail=False):
+        self.frames = []
+        self.fail = fail
+
+    async def send_text(self, text):
+        if self.fail:
+            raise RuntimeError("connection closed")
+        self.frames.append(text)
+
+    async def send_bytes(self, data):
+        self.frames.append(data)
+
+
+def make_snapshot(seq, usage=10.0):
+    return Snapshot(
+        seq=seq,
+        timestamp=float(seq),
+        time=1000.0 + seq,
+        data={
+            "cpu": {"usage": usage, "per_cpu_usage": [usage, 1.0], "name": "x86"},
+            "memory": {"percent": 50.0, "total": 8000},
+            "swap": {},
+            "disk": {},
+            "net": {},
+        },
+    )
+
+
+async def publish(hub, snapshot):
+    """Publishes snapshot and lets the sends it started run."""
+    await hub.on_snapshot(snapshot)
+    await asyncio.sleep(0)
+
+
+# Test cases
+def test_subscribe_rejects_unknown_metrics():
+    """Test that unknown metric names are refused."""
+    hub = StreamHub()
+    with pytest.raises(ValueError):
+        hub.subscribe(FakeWebSocket(), ["cpu", "gpu"])
+
+
+def test_push_selected_metrics():
+    """Test that subscribers only receive the metrics they asked for."""
+    hub = StreamHub()
+    websocket = FakeWebSocket()
+    hub.subscribe(websocket, ["cpu"])
+    asyncio.run(publish(hub, make_snapshot(1)))
+    frame = json.loads(websocket.frames[0])
+    assert frame["seq"] == 1
+    assert frame["data"] == {
+        "cpu": {"usage": 10.0, "per_cpu_usage": [10.0, 1.0], "name": "x86"}
+    }
+
+
+def test_payload_shared_between_subscribers(monkeypatch):
+    """Test that a tick is serialized once per distinct selection."""
+    hub = StreamHub()
+    calls = []
+    serialize = StreamHub.serialize
+
+    def counting_serialize(snapshot, metrics):
+        calls.append(metrics)
+        return serialize(snapshot, metrics)
+
+    monkeypatch.setattr(hub, "serialize", counting_serialize)
+    sockets = [FakeWebSocket() for _ in range(5)]
+    for websocket in sockets:
+        hub.subscribe(websocket, ["memory", "cpu"])
+    other = FakeWebSocket()
+    hub.subscribe(other, ["net"])
+    asyncio.run(publish(hub, make_snapshot(1)))
+    assert sorted(calls) == [("cpu", "memory"), ("net",)]
+    assert all(ws.frames[0] is sockets[0].frames[0] for ws in sockets)
+
+
+def test_subscription_cadence():
+    """Test that the interval is honoured in sampler ticks."""
+    hub = StreamHub(interval=1.0)
+    websocket = FakeWebSocket()
+    hub.subscribe(websocket, interval=2)
+
+    async def run():
+        for seq in range(1, 7):
+            await publish(hub, make_snapshot(seq))
+
+    asyncio.run(run())
+    assert [json.loads(f)["seq"] for f in websocket.frames] == [2, 4, 6]
+
+
+def test_failed_subscriber_is_dropped():
+    """Test that a closed connection is removed without affecting others."""
+    hub = StreamHub()
+    broken = FakeWebSocket(fail=True)
+    healthy = FakeWebSocket()
+    hub.subscribe(broken)
+    hub.subscribe(healthy)
+    asyncio.run(publish(hub, make_snapshot(1)))
+    assert broken not in hub.subscribers
+    assert len(healthy.frames) == 1
+
+
+def test_slow_subscriber_skips_ticks():
+    """Test that a client still sending a frame holds up neither the
+    sampler nor the others, and skips ticks until it is done."""
+    hub = StreamHub()
+    slow = FakeWebSocket()
+    healthy = FakeWebSocket()
+    hub.subscribe(slow)
+    hub.subscribe(healthy)
+
+    async def run():
+        release = asyncio.Event()
+        sent = slow.send_text
+
+        async def send_text(text):
+            await release.wait()
+            await sent(text)
+
+        slow.send_text = send_text
+        for seq in range(1, 4):
+            await publish(hub, make_snapshot(seq))
+        assert slow.frames == []
+        release.set()
+        await asyncio.sleep(0)
+        await publish(hub, make_snapshot(4))
+
+    asyncio.run(run())
+    assert [json.loads(f)["seq"] for f in healthy.frames] == [1, 2, 3, 4]
+    assert [json.loads(f)["seq"] for f in slow.frames] == [1, 4]
+
+
+def test_subscribe_rejects_unknown_encoding():
+    """Test that unknown encodings are refused."""
+    with pytest.raises(ValueError):
+        StreamHub().subscribe(FakeWebSocket(), encoding="xml")
+
+
+def test_delta_frames_after_ack():
+    """Test that delta clients only get fields changed since their ack."""
+    hub = StreamHub()
+    websocket = FakeWebSocket()
+    hub.subscribe(websocket, ["cpu", "memory"], encoding="delta")
+
+    async def run():
+        await publish(hub, make_snapshot(1, usage=10.0))
+        hub.ack(websocket, 1)
+        await publish(hub, make_snapshot(2, usage=20.0))
+        await publish(hub, make_snapshot(3, usage=10.0))
+
+    asyncio.run(run())
+    first, second, third = [json.loads(f) for f in websocket.frames]
+    assert first["base"] is None
+    assert first["changed"]["memory.total"] == 8000
+    assert second["base"] == 1
+    assert second["changed"] == {
+        "cpu.usage": 20.0,
+        "cpu.per_cpu_usage": [20.0, 1.0],
+    }
+    # Still relative to the last acknowledged frame, not the last one sent.
+    assert third["base"] == 1
+    assert third["changed"] == {}
+
+
+def test_delta_ack_expires():
+    """Test that an ack older than the kept history falls back to a full frame."""
+    hub = StreamHub()
+    websocket = FakeWebSocket()
+    hub.subscribe(websocket, ["cpu"], encoding="delta")
+
+    async def run():
+        await publish(hub, make_snapshot(1))
+        hub.ack(websocket, 1)
+        for seq in range(2, 100):
+            await publish(hub, make_snapshot(seq))
+
+    asyncio.run(run())
+    assert json.loads(websocket.frames[-1])["base"] is None
+
+
+def test_binary_frames():
+    """Test that binary frames pack numeric fields in dictionary order."""
+    hub = StreamHub()
+    websocket = FakeWebSocket()
+    subscription = hub.subscribe(
+        websocket, ["cpu"], encoding="binary", snapshot=make_snapshot(1)
+    )
+    assert subscription.dictionary == (
+        "cpu.per_cpu_usage.0",
+        "cpu.per_cpu_usage.1",
+        "cpu.usage",
+    )
+    asyncio.run(publish(hub, make_snapshot(2, usage=42.0)))
+    frame = websocket.frames[0]
+    assert isinstance(frame, bytes)
+    assert len(frame) == 8 + 8 + 3 * 8
+    assert struct.unpack(subscription.packer.format, frame) == (
+        2,
+        1002.0,
+        42.0,
+        1.0,
+        42.0,
+    )
+
+
+class FakeTable:
+    def __init__(self):
+        self.published = (1, {(1, 10.0): {"pid": 1, "start_time": 10.0}})
+
+
+def test_process_stream_full_then_delta():
+    """Test that process subscribers get the table once, then deltas."""
+    table = FakeTable()
+    hub = ProcessStreamHub(table)
+    websocket = FakeWebSocket()
+    late = FakeWebSocket()
+    delta = {
+        "seq": 2,
+        "base": 1,
+        "added": [{"pid": 2, "start_time": 20.0}],
+        "removed": [],
+        "changed": [],
+    }
+
+    async def run():
+        await hub.subscribe(websocket)
+        table.published = (2, {})
+        await hub.subscribe(late)
+        await hub.on_delta(delta)
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    first, second = [json.loads(f) for f in websocket.frames]
+    assert first["type"] == "snapshot"
+    assert first["processes"] == [{"pid": 1, "start_time": 10.0}]
+    assert second["type"] == "delta"
+    assert second["added"] == delta["added"]
+    # Already has version 2 from its full snapshot.
+    assert len(late.frames) == 1
+
+
+def test_process_stream_resyncs_lagging_subscriber():
+    """Test that a subscriber that missed a delta gets the full table."""
+    table = FakeTable()
+    hub = ProcessStreamHub(table)
+    websocket = FakeWebSocket()
+
+    async def run():
+        await hub.subscribe(websocket)
+        table.published = (3, {})
+        await hub.on_delta(
+            {"seq": 3, "base": 2, "added": [], "removed": [], "changed": []}
+        )
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    frame = json.loads(websocket.frames[-1])
+    assert frame == {"type": "snapshot", "seq": 3, "processes": []}
+    assert hub.subscribers[websocket] == 3
+
+
+def test_process_stream_skips_slow_subscriber():
+    """Test that a subscriber still sending holds up no one, skips deltas
+    and is resynced with the full table once it caught up."""
+    table = FakeTable()
+    hub = ProcessStreamHub(table)
+    slow = FakeWebSocket()
+    healthy = FakeWebSocket()
+
+    def delta(seq):
+        return {"seq": seq, "base": seq - 1, "added": [], "removed": [], "changed": []}
+
+    async def run():
+        await hub.subscribe(slow)
+        await hub.subscribe(healthy)
+        release = asyncio.Event()
+        sent = slow.send_text
+
+        async def send_text(text):
+            await release.wait()
+            await sent(text)
+
+        slow.send_text = send_text
+        for seq in (2, 3):
+            table.published = (seq, {})
+            await hub.on_delta(delta(seq))
+            await asyncio.sleep(0)
+        release.set()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        table.published = (4, {})
+        await hub.on_delta(delta(4))
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert [json.loads(f)["seq"] for f in healthy.frames] == [1, 2, 3, 4]
+    frames = [json.loads(f) for f in slow.frames]
+    assert [(f["type"], f["seq"]) for f in frames] == [
+        ("snapshot", 1),
+        ("delta", 2),
+        ("snapshot", 4),
+    ]
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,133 @@
+import pytest
+from backend.sampler import Snapshot
+from backend.timeseries import RingBuffer, RollupTier, TimeSeries, TimeSeriesStore
+
+
+def make_snapshot(seq, timestamp, usage):
+    return Snapshot(
+        seq=seq,
+        timestamp=timestamp,
+        time=timestamp,
+        data={"cpu": {"usage": usage, "per_cpu_usage": [usage]}, "name": "host"},
+    )
+
+
+# Test cases
+def test_ring_buffer_query_in_order():
+    """Test that samples come back oldest first."""
+    buffer = RingBuffer(4)
+    for t in range(3):
+        buffer.append(float(t), t * 10.0)
+    timestamps, values = buffer.query()
+    assert timestamps.tolist() == [0.0, 1.0, 2.0]
+    assert values.tolist() == [0.0, 10.0, 20.0]
+
+
+def test_ring_buffer_overwrites_oldest():
+    """Test that a full buffer drops its oldest samples."""
+    buffer = RingBuffer(3)
+    for t in range(5):
+        buffer.append(float(t), float(t))
+    assert len(buffer) == 3
+    timestamps, values = buffer.query()
+    assert timestamps.tolist() == [2.0, 3.0, 4.0]
+
+
+def test_ring_buffer_query_range_across_wrap():
+    """Test since/until bounds on a wrapped buffer."""
+    buffer = RingBuffer(4)
+    for t in range(6):
+        buffer.append(float(t), float(t))
+    timestamps, _ = buffer.query(since=3.0, until=4.5)
+    assert timestamps.tolist() == [3.0, 4.0]
+    timestamps, _ = buffer.query(since=10.0)
+    assert timestamps.tolist() == []
+
+
+def test_store_records_numeric_metrics():
+    """Test that the store keeps one series per numeric reading."""
+    store = TimeSeriesStore(retention=10, interval=1.0)
+    store.record(make_snapshot(1, 100.0, 5.0))
+    store.record(make_snapshot(2, 101.0, 7.0))
+    assert store.metrics() == ["cpu.usage"]
+    result = store.query("cpu.usage")
+    assert result["values"] == [5.0, 7.0]
+
+
+def test_store_query_uses_epoch_timestamps():
+    """Test that query bounds and results are in epoch seconds."""
+    store = TimeSeriesStore(retention=10, interval=1.0)
+    store.clock_offset = 1000.0
+    store.record(make_snapshot(1, 1.0, 5.0))
+    store.record(make_snapshot(2, 2.0, 7.0))
+    result = store.query("cpu.usage", since=1001.5)
+    assert result["timestamps"] == [1002.0]
+    assert result["values"] == [7.0]
+
+
+def test_store_unknown_metric():
+    """Test that unknown metrics raise KeyError."""
+    store = TimeSeriesStore()
+    with pytest.raises(KeyError):
+        store.query("cpu.nope")
+
+
+def test_rollup_tier_aggregates_buckets():
+    """Test that a tier keeps min/max/avg/count per bucket."""
+    tier = RollupTier(resolution=10, capacity=4)
+    for t, value in [(0.0, 1.0), (5.0, 3.0), (9.0, 2.0), (12.0, 8.0)]:
+        tier.append(t, value)
+    assert len(tier) == 2
+    assert tier.timestamps[:2].tolist() == [0.0, 10.0]
+    assert tier.mins[:2].tolist() == [1.0, 8.0]
+    assert tier.maxs[:2].tolist() == [3.0, 8.0]
+    assert tier.values[:2].tolist() == [2.0, 8.0]
+    assert tier.counts[:2].tolist() == [3.0, 1.0]
+
+
+def test_rollup_tier_is_bounded():
+    """Test that a tier drops its oldest buckets once full."""
+    tier = RollupTier(resolution=1, capacity=3)
+    for t in range(10):
+        tier.append(float(t), float(t))
+    timestamps, values = tier.query()
+    assert timestamps.tolist() == [7.0, 8.0, 9.0]
+
+
+def test_series_picks_tier_for_point_budget():
+    """Test that queries fall back to coarser tiers to meet max_points."""
+    series = TimeSeries(capacity=1000, interval=1.0, tiers=((10, 100), (60, 100)))
+    for t in range(600):
+        series.append(float(t), float(t % 20))
+    assert series.query()["resolution"] == 1.0
+    result = series.query(max_points=100)
+    assert result["resolution"] == 10
+    assert len(result["values"]) == 60
+    assert result["min"][0] == 0.0
+    assert result["max"][0] == 9.0
+    assert result["count"][0] == 10
+    assert series.query(max_points=20)["resolution"] == 60
+
+
+def test_series_picks_tier_covering_since():
+    """Test that a full raw buffer is skipped for ranges it no longer holds."""
+    series = TimeSeries(capacity=100, interval=1.0, tiers=((10, 100),))
+    for t in range(500):
+        series.append(float(t), 1.0)
+    result = series.query(since=50.0)
+    assert result["resolution"] == 10
+    assert result["timestamps"][0] == 50.0
+
+
+def test_store_query_includes_rollup_fields():
+    """Test that store results carry resolution and min/max/count."""
+    store = TimeSeriesStore(retention=10, interval=1.0)
+    store.record(make_snapshot(1, 1.0, 5.0))
+    result = store.query("cpu.usage")
+    assert result["resolution"] == 1.0
+    assert result["min"] == result["max"] == [5.0]
+    assert result["count"] == [1]
+
+
+if __name__ == "__main__":
+    pytest.main()